@@ -1,59 +1,146 @@
 from flask import (
     Flask,
+    Response,
+    abort,
     current_app,
+    has_app_context,
     jsonify,
     render_template,
     request,
     redirect,
+    stream_with_context,
     url_for,
 )
 from flask_wtf.csrf import CSRFProtect
-import requests
+from sqlalchemy import text
+from werkzeug.local import LocalProxy
 from forms.add_movie_form import AddMovieForm
-from models.data_manager import SQLiteDataManager as DataManager
+from models.data_manager import MOVIE_FILTERS, USERS_SCOPE, user_scope
 from models import db
-from models.db_models import Movie, User
+from models.db_models import User
 import logging
 from forms.add_user_from import AddUserForm
+from models import library_io
+from models.recommendations import RECOMMENDATIONS_SCOPE
+from models.sqlite_tuning import apply_pragmas
+from omdb.ratelimit import SUGGEST
+from instrumentation import Instrumentation
+from logging_setup import configure_logging, dropped_records
+from services import EXTENSION, Services
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,  # Log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.FileHandler("app.log"),  # Log to file 'app.log'
-        logging.StreamHandler(),  # Continue logging to the terminal
-    ],
-)
-logging.basicConfig(
-    level=logging.ERROR,  # Log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.FileHandler("app.log"),  # Log to file 'app.log'
-        logging.StreamHandler(),  # Continue logging to the terminal
-    ],
-)
+csrf = CSRFProtect()
 
-app = Flask(__name__)
-app.debug = True
-app.config.from_object("config.Config")
-csrf = CSRFProtect(app)
+# Views and error handlers, registered on every app create_app builds
+ROUTES = []
+ERROR_HANDLERS = []
 
-# Initialize the data manager and the database
-db.init_app(app)
-data_manager = DataManager(app)
 
+def route(rule, **options):
+    """Like app.route, for the apps create_app builds."""
 
-def fetch_movie_details_from_omdb(title):
-    """Fetch movie details from the OMDb API by movie title."""
-    api_key = current_app.config.get("OMDB_API_KEY")  # Get the API key from the config
-    url = f"http://www.omdbapi.com/?t={title}&plot=full&apikey={api_key}"
+    def decorator(view):
+        ROUTES.append((rule, view, options))
+        return view
+
+    return decorator
+
+
+def error_handler(code):
+    """Like app.errorhandler, for the apps create_app builds."""
+
+    def decorator(handler):
+        ERROR_HANDLERS.append((code, handler))
+        return handler
+
+    return decorator
+
+
+def create_app(config="config.Config"):
+    """Build an app from a config object or import path, or from config.Config
+    updated with a dict of overrides.
+
+    Nothing touches the database or the OMDb cache here: the services in
+    app.extensions["movieweb"] are built on first use.
+    """
+    app = Flask(__name__)
+    if isinstance(config, dict):
+        app.config.from_object("config.Config")
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+
+    # Set up logging: request threads only enqueue records
+    configure_logging(app)
+    csrf.init_app(app)
+    instrumentation = Instrumentation(app)
+    db.init_app(app)
+    with app.app_context():
+        # Creating the engine does not connect; its first connection gets the PRAGMAs
+        apply_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS"))
+
+    services = app.extensions[EXTENSION] = Services(app, instrumentation)
+    instrumentation.add_gauge(
+        "app_omdb_budget_remaining",
+        "OMDb calls left in today's budget (shared by all processes).",
+        lambda: services.omdb_limiter.stats()["remaining_today"],
+    )
+    instrumentation.add_gauge(
+        "app_omdb_tokens",
+        "Tokens currently in the shared OMDb rate-limit bucket.",
+        lambda: services.omdb_limiter.stats()["tokens"],
+    )
+    instrumentation.add_gauge(
+        "app_log_records_dropped",
+        "Log records below WARNING dropped because the log queue was full.",
+        dropped_records,
+    )
+
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    for code, handler in ERROR_HANDLERS:
+        app.register_error_handler(code, handler)
+    return app
+
+
+def _service(name):
+    """Proxy to a service of the current app, or of the default app outside one."""
+
+    def resolve():
+        target = current_app if has_app_context() else app
+        return getattr(target.extensions[EXTENSION], name)
+
+    return LocalProxy(resolve)
+
+
+data_manager = _service("data_manager")
+title_index = _service("title_index")
+catalog = _service("catalog")
+page_cache = _service("page_cache")
+jobs = _service("jobs")
+omdb_cache = _service("omdb_cache")
+omdb_limiter = _service("omdb_limiter")
+omdb_client = _service("omdb_client")
+instrumentation = _service("instrumentation")
+
+
+def lookup_movie(catalog_payload, fetch_upstream):
+    """Prefer the offline catalog, going to OMDb only for incomplete entries."""
+    if catalog_payload is not None and catalog.is_complete(catalog_payload):
+        return catalog_payload
+    data = fetch_upstream()
+    if data is None or data.get("Response") != "True":
+        # Fall back to a partial catalog entry if OMDb has nothing better
+        return catalog_payload or data
+    return data
 
-    response = requests.get(url)
 
-    if response.status_code == 200:
-        data = response.json()
+def fetch_movie_details_from_omdb(title):
+    """Fetch movie details from the OMDb API by movie title."""
+    data = lookup_movie(
+        catalog.find_by_title(title), lambda: omdb_client.get_by_title(title)
+    )
 
+    if data is not None:
         if data["Response"] == "True":
             # Extract the necessary details
             movie_details = {
@@ -66,9 +153,49 @@ def fetch_movie_details_from_omdb(title):
         else:
             return None  # Movie not found
     else:
-        raise Exception(
-            f"OMDb API request failed with status code {response.status_code}"
-        )
+        raise Exception("OMDb API request failed")
+
+
+def suggestions_response(data, local, limit):
+    """Merge an OMDb search answer with local matches; return (body, status)."""
+    if data is not None:
+        if data.get("Response") == "True":
+            # Extract only titles, years, and imdbIDs from the search results
+            movies = [
+                {
+                    "title": item["Title"],
+                    "year": item["Year"],
+                    "imdbID": item["imdbID"]
+                }
+                for item in data.get("Search", [])
+            ]
+            seen = {movie["imdbID"] for movie in movies}
+            movies += [movie for movie in local if movie["imdbID"] not in seen]
+            return movies[:limit], 200
+        else:
+            return local, 200  # No upstream matches found
+    elif local:
+        return local, 200  # Upstream failed, serve what we have locally
+    else:
+        return [], 500  # Internal server error if the request fails
+
+
+def details_response(data):
+    """Shape an OMDb detail answer for /movie_details; return (body, status)."""
+    if data is not None:
+        if data.get("Response") == "True":
+            # Extract the necessary details
+            movie_details = {
+                'title': data.get('Title', "N/A"),
+                'director': data.get('Director', "N/A"),
+                'year': data.get('Year', "N/A"),
+                'rating': data.get('imdbRating', "N/A")
+            }
+            return movie_details, 200
+        else:
+            return {}, 200  # Movie not found
+    else:
+        return {}, 500  # Internal server error if the request fails
 
 
 # ----------- Routes -----------
@@ -77,25 +204,42 @@ def fetch_movie_details_from_omdb(title):
 ERROR_TEMPLATE = "error.html"
 
 
-@app.route("/", methods=["GET", "POST"])
+@route("/", methods=["GET", "POST"])
 def home():
 
     return render_template("home.html")
 
 
-@app.route("/users")
+def page_args(default_per_page):
+    """Read the page size and cursor query parameters."""
+    per_page = request.args.get("per_page", default_per_page, type=int)
+    per_page = max(1, min(per_page, current_app.config["MAX_PER_PAGE"]))
+    return per_page, request.args.get("cursor")
+
+
+@route("/users")
 def list_users():
     """Route to display the list of users."""
+    per_page, cursor = page_args(current_app.config["USERS_PER_PAGE"])
+
+    def render():
+        page = data_manager.get_users_page(per_page, cursor)
+        logging.info(f"Retrieved {len(page)} users.")
+        return render_template(
+            "users.html", users=page.items, page=page, per_page=per_page
+        )
+
     try:
-        users = data_manager.get_all_users()
-        logging.info(f"Retrieved {len(users)} users.")
-        return render_template("users.html", users=users)
+        return page_cache.respond(data_manager.get_data_versions(USERS_SCOPE), render)
+    except ValueError as e:
+        logging.warning(f"Bad users page request: {e}")
+        return render_template(ERROR_TEMPLATE, message="Invalid page cursor."), 400
     except Exception as e:
         logging.error(f"Error retrieving users: {e}")
         return render_template(ERROR_TEMPLATE, message="Error loading users."), 500
 
 
-@app.route("/add_user", methods=["GET", "POST"])
+@route("/add_user", methods=["GET", "POST"])
 def add_user():
     """Route to handle adding a new user."""
     logging.info("Handling add_user request.")
@@ -117,29 +261,81 @@ def add_user():
     return render_template("add_user.html", form=form)
 
 
-@app.route("/user/<int:user_id>")
+@route("/user/<int:user_id>")
 def user_movies(user_id):
     """Route to display a user's movies."""
     logging.info(f"Fetching movies for user ID {user_id}.")
     form = AddMovieForm()
-    try:
-        movies = data_manager.get_user_movies(user_id)
-        print(movies)
-        if movies:
-            logging.info(f"Found {len(movies)} movies for user ID {user_id}.")
-            return render_template(
-                "movies.html", movies=movies, user_id=user_id, form=form
-            )
+    per_page, cursor = page_args(current_app.config["MOVIES_PER_PAGE"])
+    sort = request.args.get("sort", "added")
+    # Filtering and sorting run in SQL, so large libraries never ship whole
+    filters = {name: request.args[name] for name in MOVIE_FILTERS if request.args.get(name)}
+
+    def render():
+        page = data_manager.get_user_movies_page(user_id, per_page, cursor, sort, filters)
+        if page.items:
+            logging.info(f"Found {len(page)} movies for user ID {user_id}.")
         else:
             logging.warning(f"No movies found for user ID {user_id}.")
-            return render_template("movies.html", movies=[], user_id=user_id, form=form)
+        return render_template(
+            "movies.html",
+            movies=page.items,
+            page=page,
+            per_page=per_page,
+            sort=sort,
+            filters=filters,
+            user_id=user_id,
+            form=form,
+        )
+
+    try:
+        versions = data_manager.get_data_versions(user_scope(user_id))
+        return page_cache.respond(versions, render)
+    except ValueError as e:
+        logging.warning(f"Bad movies page request for user ID {user_id}: {e}")
+        return render_template(ERROR_TEMPLATE, message="Invalid page, sort or filter."), 400
     except Exception as e:
-        print(e)
         logging.error(f"Error fetching movies for user ID {user_id}: {e}")
         return render_template("movies.html", movies=[], user_id=user_id, form=form)
 
 
-@app.route("/users/<int:user_id>/add_movie", methods=["GET", "POST"])
+@route("/user/<int:user_id>/stats")
+def user_stats(user_id):
+    """Route to display a user's library statistics."""
+    if data_manager.get_user(user_id) is None:
+        abort(404)
+
+    def render():
+        stats = data_manager.get_user_stats(user_id)
+        return render_template("stats.html", stats=stats, user_id=user_id)
+
+    try:
+        return page_cache.respond(data_manager.get_data_versions(user_scope(user_id)), render)
+    except Exception as e:
+        logging.error(f"Error fetching stats for user ID {user_id}: {e}")
+        return render_template(ERROR_TEMPLATE, message="Error loading statistics."), 500
+
+
+@route("/user/<int:user_id>/recommendations")
+def user_recommendations(user_id):
+    """Route to display films saved by users with similar libraries."""
+    if data_manager.get_user(user_id) is None:
+        abort(404)
+
+    def render():
+        movies = data_manager.get_recommendations(user_id, current_app.config["RECOMMEND_LIMIT"])
+        return render_template("recommendations.html", movies=movies, user_id=user_id)
+
+    try:
+        # Neighbours are precomputed, so the page changes only with a rebuild or the library
+        versions = data_manager.get_data_versions(RECOMMENDATIONS_SCOPE, user_scope(user_id))
+        return page_cache.respond(versions, render)
+    except Exception as e:
+        logging.error(f"Error fetching recommendations for user ID {user_id}: {e}")
+        return render_template(ERROR_TEMPLATE, message="Error loading recommendations."), 500
+
+
+@route("/users/<int:user_id>/add_movie", methods=["GET", "POST"])
 def add_movie(user_id):
     """Route to handle adding a new movie for a user."""
     logging.info(f"Handling add_movie for user ID {user_id}.")
@@ -150,16 +346,17 @@ def add_movie(user_id):
         # Fetch data from OMDb if the user is submitting the form
         if form.validate_on_submit():
             try:
-                # Add the movie to the database
-                new_movie = Movie(
-                    name=form.name.data,
-                    director=form.director.data,
-                    year=form.year.data,
-                    rating=form.rating.data,
-                    user_id=user_id,
+                # Add the movie through the data manager so indexes stay current
+                new_movie = data_manager.add_movie(
+                    user_id,
+                    form.name.data,
+                    form.director.data,
+                    form.year.data,
+                    form.rating.data,
+                    imdb_id=form.imdb_id.data,
                 )
-                db.session.add(new_movie)
-                db.session.commit()
+                if new_movie is None:
+                    raise ValueError(f"User ID {user_id} could not be given the movie")
 
                 logging.info(
                     f"Movie '{form.name.data}' added successfully for user ID {user_id}."
@@ -173,7 +370,7 @@ def add_movie(user_id):
     return render_template("add_movie.html", user_id=user_id, form=form)
 
 
-@app.route("/users/<int:user_id>/update_movie/<int:movie_id>", methods=["GET", "POST"])
+@route("/users/<int:user_id>/update_movie/<int:movie_id>", methods=["GET", "POST"])
 def update_movie(user_id, movie_id):
     """Route to handle updating an existing movie."""
     logging.info(f"Handling update_movie for movie ID {movie_id}.")
@@ -204,7 +401,7 @@ def update_movie(user_id, movie_id):
     return render_template("update_movie.html", movie=movie, user_id=user_id, form=form)
 
 
-@app.route("/users/<int:user_id>/delete_movie/<int:movie_id>", methods=["POST"])
+@route("/users/<int:user_id>/delete_movie/<int:movie_id>", methods=["POST"])
 def delete_movie(user_id, movie_id):
     """Route to delete a movie."""
     logging.info(f"Handling delete_movie for movie ID {movie_id}.")
@@ -219,84 +416,147 @@ def delete_movie(user_id, movie_id):
         return render_template("error.html", message="Error deleting movie."), 500
 
 
-@app.route("/movie_suggestions", methods=["GET"])
+@route("/users/<int:user_id>/import", methods=["GET", "POST"])
+def import_movies(user_id):
+    """Route to bulk-import movies from a CSV, JSON or NDJSON upload."""
+    if data_manager.get_user(user_id) is None:
+        abort(404)
+    if request.method == "GET":
+        return render_template("import_movies.html", user_id=user_id)
+
+    upload = request.files.get("file")
+    if upload is None:
+        error = {"row": None, "errors": {"file": ["No file uploaded."]}}
+        return jsonify({"imported": 0, "errors": [error]}), 400
+    fmt = request.form.get("format") or library_io.detect_format(upload.filename)
+    logging.info(f"Importing {fmt} library for user ID {user_id}.")
+    report = library_io.import_library(
+        data_manager,
+        user_id,
+        library_io.read_rows(upload.stream, fmt),
+        batch_size=current_app.config["IMPORT_BATCH_SIZE"],
+    )
+    return jsonify(report), 200 if report["imported"] or not report["errors"] else 400
+
+
+@route("/users/<int:user_id>/movies/batch", methods=["POST"])
+def batch_movies(user_id):
+    """JSON route applying a batch of add/update/delete operations in one transaction.
+
+    Expects {"operations": [{"op": "add", "name": ..., ...},
+    {"op": "update", "id": 7, "rating": 9}, {"op": "delete", "id": 8}]}.
+    Like every form, it is CSRF-protected: clients keep the session cookie
+    and send the csrf_token of any form page (e.g. the import page) in an
+    X-CSRFToken header.
+    """
+    if data_manager.get_user(user_id) is None:
+        abort(404)
+    payload = request.get_json(silent=True)
+    operations = payload.get("operations") if isinstance(payload, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({"error": 'Expected a JSON object with an "operations" list.'}), 400
+    if len(operations) > current_app.config["BATCH_MAX_OPERATIONS"]:
+        return jsonify({"error": "Too many operations in one batch."}), 413
+
+    try:
+        report, status = library_io.apply_batch(data_manager, user_id, operations)
+    except Exception as e:
+        logging.error(f"Error applying batch for user ID {user_id}: {e}")
+        return jsonify({"error": "Error applying batch."}), 500
+    return jsonify(report), status
+
+
+@route("/users/<int:user_id>/export.<fmt>")
+def export_movies(user_id, fmt):
+    """Route to stream a user's library as CSV or NDJSON."""
+    writers = {
+        "csv": (library_io.export_csv, "text/csv"),
+        "ndjson": (library_io.export_ndjson, "application/x-ndjson"),
+    }
+    if fmt not in writers or data_manager.get_user(user_id) is None:
+        abort(404)
+    write, mimetype = writers[fmt]
+    movies = library_io.iter_library(data_manager, user_id, current_app.config["EXPORT_PAGE_SIZE"])
+    return Response(
+        stream_with_context(write(movies)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=user-{user_id}-movies.{fmt}"},
+    )
+
+
+@route("/movie_suggestions", methods=["GET"])
 def movie_suggestions():
     """AJAX route to get movie suggestions based on partial title."""
     query = request.args.get("query")
-    api_key = current_app.config.get("OMDB_API_KEY")
 
     if not query:
         return jsonify([])  # No query, return an empty list
 
-    url = f"http://www.omdbapi.com/?s={query}&apikey={api_key}"
-    response = requests.get(url)
+    limit = current_app.config["SUGGESTIONS_LIMIT"]
+    local = title_index.search(query, limit=limit, require_id=True)
+    if len(local) >= current_app.config["SUGGESTIONS_MIN_LOCAL"]:
+        return jsonify(local)  # Enough local matches, skip the network
+    if not omdb_client.available(SUGGEST):
+        logging.info("OMDb quota reserved for detail lookups; serving local suggestions.")
+        return jsonify(local)
+
+    data = omdb_client.search(query)
+    if data is not None and data.get("Response") == "True":
+        title_index.add_search_results(data)
+    body, status = suggestions_response(data, local, limit)
+    return jsonify(body), status
 
-    if response.status_code == 200:
-        data = response.json()
-        if data.get("Response") == "True":
-            # Extract only titles, years, and imdbIDs from the search results
-            movies = [
-                {
-                    "title": item["Title"],
-                    "year": item["Year"],
-                    "imdbID": item["imdbID"]
-                }
-                for item in data.get("Search", [])
-            ]
-            return jsonify(movies)
-        else:
-            return jsonify([])  # No matches found
-    else:
-        return jsonify([]), 500  # Internal server error if the request fails
 
-@app.route("/movie_details", methods=["GET"])
+@route("/movie_details", methods=["GET"])
 def movie_details():
     """AJAX route to get full movie details based on imdbID."""
     imdb_id = request.args.get("imdbID")
-    api_key = current_app.config.get("OMDB_API_KEY")
-    
+
     if not imdb_id:
         return jsonify({})  # No imdbID, return an empty object
 
-    url = f"http://www.omdbapi.com/?i={imdb_id}&plot=full&apikey={api_key}"
-    response = requests.get(url)
+    data = lookup_movie(
+        catalog.find_by_imdb_id(imdb_id), lambda: omdb_client.get_by_id(imdb_id)
+    )
+    if data is not None and data.get("Response") == "True":
+        title_index.add_details(data)
+    body, status = details_response(data)
+    return jsonify(body), status
 
-    if response.status_code == 200:
-        data = response.json()
-        print(data)
-        if data.get("Response") == "True":
-            # Extract the necessary details
-            movie_details = {
-                'title': data.get('Title', "N/A"),
-                'director': data.get('Director', "N/A"),
-                'year': data.get('Year', "N/A"),
-                'rating': data.get('imdbRating', "N/A")
-            }
-            return jsonify(movie_details)
-        else:
-            return jsonify({})  # Movie not found
-    else:
-        return jsonify({}), 500  # Internal server error if the request fails
+
+@route("/healthz")
+def health_check():
+    """Route for load balancers: 200 while the database answers, 503 otherwise."""
+    try:
+        db.session.execute(text("SELECT 1"))
+    except Exception as e:
+        logging.error(f"Health check failed: {e}")
+        return jsonify({"status": "unavailable"}), 503
+    return jsonify({"status": "ok"})
 
 
 # ----------- Error Handlers -----------
 
 
-@app.errorhandler(404)
+@error_handler(404)
 def page_not_found(e):
     """Custom handler for 404 errors."""
     logging.error("404 error: Page not found.")
     return render_template("404.html"), 404
 
 
-@app.errorhandler(500)
+@error_handler(500)
 def internal_server_error(e):
     """Custom handler for 500 errors."""
     logging.error("500 error: Internal server error.")
     return render_template("500.html"), 500
 
 
+# The default app, used by the scripts, the tests and `flask run`
+app = create_app()
+
 # ----------- Run the App -----------
 
 if __name__ == "__main__":
+    # Development server only; see gunicorn.conf.py for production
     app.run(debug=True)
@@ -0,0 +1,157 @@
+"""ASGI app serving the OMDb proxy routes next to the WSGI app.
+
+/movie_suggestions and /movie_details mostly wait on OMDb. Served from an
+event loop they no longer hold a worker thread per lookup, so one process
+can have hundreds of upstream calls in flight:
+
+    pip install uvicorn httpx
+    uvicorn asgi:application --port 8001 --workers 2
+
+Route those two paths to it in the reverse proxy (nginx):
+
+    location ~ ^/(movie_suggestions|movie_details)$ { proxy_pass http://127.0.0.1:8001; }
+
+Responses have the same JSON bodies and status codes as the Flask views,
+and the app shares their config, OMDb cache, quota and title index.
+"""
+
+import asyncio
+import json
+import logging
+from functools import partial
+from urllib.parse import parse_qs
+
+from app import app as flask_app
+from app import details_response, suggestions_response
+from omdb.async_client import AsyncOMDbClient
+from omdb.ratelimit import SUGGEST
+from services import EXTENSION
+
+
+class ProxyApp:
+    """ASGI callable for the OMDb proxy routes of a Flask app."""
+
+    def __init__(self, app):
+        self.app = app
+        self.services = app.extensions[EXTENSION]
+        self._client = None
+        self.routes = {
+            "/movie_suggestions": self.movie_suggestions,
+            "/movie_details": self.movie_details,
+        }
+
+    @property
+    def client(self):
+        """The pooled async OMDb client, created on the first upstream lookup."""
+        if self._client is None:
+            instrumentation = self.services.instrumentation
+            self._client = AsyncOMDbClient.from_config(
+                self.app.config,
+                cache=self.services.omdb_cache,
+                on_call=partial(instrumentation.record_omdb_call, endpoint="<async>"),
+                limiter=self.services.omdb_limiter,
+            )
+        return self._client
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        handler = self.routes.get(scope["path"])
+        if handler is None:
+            await self.send_json(send, {"error": "Not found"}, 404)
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self.send_json(send, {"error": "Method not allowed"}, 405)
+            return
+        params = {
+            name: values[0]
+            for name, values in parse_qs(scope["query_string"].decode("latin-1")).items()
+        }
+        try:
+            body, status = await handler(params)
+        except Exception as e:
+            logging.error(f"Error serving {scope['path']}: {e}")
+            body, status = {"error": "Internal server error"}, 500
+        await self.send_json(send, body, status)
+
+    async def lifespan(self, receive, send):
+        """Open the title index and catalog before serving; close the OMDb pool on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(lambda: (self.services.title_index, self.services.catalog))
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def send_json(send, body, status):
+        # Same encoding as Flask's jsonify outside debug mode
+        payload = (json.dumps(body, sort_keys=True, separators=(",", ":")) + "\n").encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    def _in_app_context(self, fn, *args):
+        """Run a database lookup in a worker thread with the Flask app context."""
+        with self.app.app_context():
+            return fn(*args)
+
+    async def movie_suggestions(self, params):
+        """Async /movie_suggestions: local title index first, then OMDb search."""
+        query = params.get("query")
+        if not query:
+            return [], 200
+
+        limit = self.app.config["SUGGESTIONS_LIMIT"]
+        title_index = self.services.title_index
+        local = title_index.search(query, limit=limit, require_id=True)
+        if len(local) >= self.app.config["SUGGESTIONS_MIN_LOCAL"]:
+            return local, 200  # Enough local matches, skip the network
+        if not await asyncio.to_thread(self.services.omdb_limiter.has_budget, SUGGEST):
+            logging.info("OMDb quota reserved for detail lookups; serving local suggestions.")
+            return local, 200
+
+        data = await self.client.search(query)
+        if data is not None and data.get("Response") == "True":
+            title_index.add_search_results(data)
+        return suggestions_response(data, local, limit)
+
+    async def movie_details(self, params):
+        """Async /movie_details: offline catalog first, then OMDb by imdbID."""
+        imdb_id = params.get("imdbID")
+        if not imdb_id:
+            return {}, 200
+
+        catalog = await asyncio.to_thread(lambda: self.services.catalog)
+        catalog_payload = await asyncio.to_thread(
+            self._in_app_context, catalog.find_by_imdb_id, imdb_id
+        )
+        if catalog_payload is not None and catalog.is_complete(catalog_payload):
+            data = catalog_payload
+        else:
+            data = await self.client.get_by_id(imdb_id)
+            if data is None or data.get("Response") != "True":
+                # Fall back to a partial catalog entry if OMDb has nothing better
+                data = catalog_payload or data
+        if data is not None and data.get("Response") == "True":
+            self.services.title_index.add_details(data)
+        return details_response(data)
+
+
+application = ProxyApp(flask_app)
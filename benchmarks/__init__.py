@@ -0,0 +1 @@
+"""Benchmarks for the MovieWeb app. Run modules with ``python -m benchmarks.<name>``."""
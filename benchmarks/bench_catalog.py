@@ -0,0 +1,88 @@
+"""Benchmark catalog ingestion throughput and lookup latency.
+
+Usage:
+    python -m benchmarks.bench_catalog --rows 1000000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import tempfile
+
+from flask import Flask
+
+from benchmarks.common import save_results, summarize, time_calls
+from models import db
+from models.catalog import find_by_imdb_id, find_by_title, ingest
+
+WORDS = ["star", "night", "river", "ghost", "city", "last", "love", "war", "dark", "king"]
+
+
+def write_dump(path, rows, seed=1):
+    """Write a synthetic IMDb-style title.basics TSV (gzipped)."""
+    rng = random.Random(seed)
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write("tconst\tprimaryTitle\tstartYear\truntimeMinutes\tgenres\taverageRating\tnumVotes\n")
+        for i in range(rows):
+            title = " ".join(rng.choices(WORDS, k=3)) + f" {i}"
+            handle.write(
+                f"tt{i:07d}\t{title}\t{rng.randint(1920, 2024)}\t{rng.randint(70, 200)}"
+                f"\tDrama\t{rng.randint(10, 99) / 10}\t{rng.randint(5, 500000)}\n"
+            )
+
+
+def time_lookups(fn, keys):
+    """Summarize per-call lookup latencies."""
+    return summarize(time_calls(fn, [(key,) for key in keys]))
+
+
+def run(rows, chunk_size, lookups):
+    workdir = tempfile.mkdtemp(prefix="bench-catalog-")
+    dump_path = os.path.join(workdir, "title.basics.tsv.gz")
+    write_dump(dump_path, rows)
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(workdir, "catalog.db")
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        stats = ingest(dump_path, chunk_size=chunk_size)
+
+        rng = random.Random(2)
+        ids = [f"tt{rng.randrange(rows):07d}" for _ in range(lookups)]
+        titles = [find_by_imdb_id(imdb_id)["Title"] for imdb_id in ids]
+        db.session.expunge_all()  # time real lookups, not the identity map
+        by_id = time_lookups(find_by_imdb_id, ids)
+        by_title = time_lookups(find_by_title, titles)
+
+    return {
+        "rows": rows,
+        "chunk_size": chunk_size,
+        "ingest_seconds": stats["seconds"],
+        "ingest_rows_per_second": stats["rows_per_second"],
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "lookup_by_id": by_id,
+        "lookup_by_title": by_title,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.chunk_size, args.lookups)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "catalog", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Micro-benchmark every SQLiteDataManager method on a generated database.
+
+Usage:
+    python -m benchmarks.bench_data_manager --users 1000 --movies 100000 --output dm.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from sqlalchemy import select
+
+from benchmarks.common import save_results, summarize, time_calls
+from benchmarks.datagen import create_app, generate
+from config import Config
+from models import db
+from models.db_models import UserMovie
+from models.data_manager import SQLiteDataManager
+from models.title_index import TitleIndex
+
+
+def run(users, movies, calls, seed=1):
+    workdir = tempfile.mkdtemp(prefix="bench-dm-")
+    app = create_app(os.path.join(workdir, "movies.db"), SQLITE_PRAGMAS=Config.SQLITE_PRAGMAS)
+    with app.app_context():
+        data = generate(users, movies, seed=seed)
+    data_manager = SQLiteDataManager(app, title_index=TitleIndex())
+    with app.app_context():
+        db.engine.dispose()  # reconnect so every connection runs the PRAGMAs
+
+    rng = random.Random(seed + 1)
+    user_ids = data["user_ids"]
+    heavy = data["heaviest_user_id"]
+
+    def pick_users():
+        return [(rng.choice(user_ids),) for _ in range(calls)]
+
+    results = {}
+    with app.app_context():
+        entry_ids = db.session.scalars(select(UserMovie.id)).all()
+        deep_cursor = data_manager.get_users_page(users // 2).next_cursor
+        heavy_page = data_manager.get_user_movies_page(heavy, 50)
+
+        def bench(name, fn, args_list):
+            results[name] = summarize(time_calls(fn, args_list))
+            db.session.remove()
+
+        bench("get_all_users", data_manager.get_all_users, [()] * max(1, calls // 10))
+        bench("get_users_with_stats", data_manager.get_users_with_stats, [()] * max(1, calls // 10))
+        bench("get_user", data_manager.get_user, pick_users())
+        bench("get_users_page", data_manager.get_users_page, [(50,)] * calls)
+        bench("get_users_page_deep", data_manager.get_users_page, [(50, deep_cursor)] * calls)
+        bench("get_user_movies", data_manager.get_user_movies, pick_users())
+        bench("get_user_movies_heaviest", data_manager.get_user_movies, [(heavy,)] * max(1, calls // 10))
+        bench(
+            "get_user_movies_page",
+            data_manager.get_user_movies_page,
+            [(user_id, 50) for (user_id,) in pick_users()],
+        )
+        bench(
+            "get_user_movies_page_next",
+            data_manager.get_user_movies_page,
+            [(heavy, 50, heavy_page.next_cursor, "added")] * calls,
+        )
+        bench(
+            "get_user_movies_page_by_rating",
+            data_manager.get_user_movies_page,
+            [(heavy, 50, None, "-rating")] * calls,
+        )
+        bench("get_movie", data_manager.get_movie, [(rng.choice(entry_ids),) for _ in range(calls)])
+        bench("get_data_versions", data_manager.get_data_versions, [("users",)] * calls)
+
+        # Writes: add entries, then update and delete exactly those
+        added = []
+
+        def add_movie(user_id, i):
+            added.append(
+                data_manager.add_movie(user_id, f"Bench Film {i}", "Bench Director", 2000, 7.5).id
+            )
+
+        bench("add_movie", add_movie, [(rng.choice(user_ids), i) for i in range(calls)])
+        bench(
+            "add_movies_100",
+            data_manager.add_movies,
+            [
+                (
+                    rng.choice(user_ids),
+                    [
+                        {"name": f"Batch {b}-{i}", "director": "Bench Director", "year": 2001,
+                         "rating": 6.0, "imdb_id": None}
+                        for i in range(100)
+                    ],
+                )
+                for b in range(max(1, calls // 10))
+            ],
+        )
+        bench("update_movie", data_manager.update_movie, [(movie_id, None, None, None, 9) for movie_id in added])
+        bench("delete_movie", data_manager.delete_movie, [(movie_id,) for movie_id in added])
+
+    return {"dataset": {key: data[key] for key in ("users", "films", "movies")}, "methods": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.users, args.movies, args.calls, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "data_manager", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark building movie neighbours and reading recommendations.
+
+Reports build time and peak memory of the neighbour build (NumPy/SciPy
+when installed, else pure Python), and the latency of
+get_recommendations once the table is built.
+
+Usage:
+    python -m benchmarks.bench_recommendations --users 100000 --movies 1000000 --output rec.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import save_results, summarize, time_calls
+from benchmarks.datagen import create_app, generate
+from config import Config
+from models import db, recommendations
+from models.data_manager import SQLiteDataManager
+from models.title_index import TitleIndex
+
+
+def run(users, movies, calls, top_k, max_library, seed=1):
+    workdir = tempfile.mkdtemp(prefix="bench-rec-")
+    app = create_app(os.path.join(workdir, "movies.db"), SQLITE_PRAGMAS=Config.SQLITE_PRAGMAS)
+    with app.app_context():
+        data = generate(users, movies, seed=seed)
+    data_manager = SQLiteDataManager(app, title_index=TitleIndex())
+
+    with app.app_context():
+        started = time.perf_counter()
+        entries = db.session.execute(recommendations.library_entries(max_library)).all()
+        load_seconds = time.perf_counter() - started
+
+        # tracemalloc also sees NumPy's buffers, so the peak covers either build
+        tracemalloc.start()
+        started = time.perf_counter()
+        pairs = recommendations.neighbor_pairs(entries, top_k)
+        build_seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        rows = recommendations.rebuild(top_k=top_k, max_library=max_library)
+        db.session.commit()
+        rebuild_seconds = time.perf_counter() - started
+
+        rng = random.Random(seed + 1)
+        user_ids = data["user_ids"]
+        reads = summarize(
+            time_calls(
+                data_manager.get_recommendations,
+                [(rng.choice(user_ids),) for _ in range(calls)],
+            )
+        )
+        heaviest = summarize(
+            time_calls(data_manager.get_recommendations, [(data["heaviest_user_id"],)] * max(1, calls // 10))
+        )
+
+    return {
+        "dataset": {key: data[key] for key in ("users", "films", "movies")},
+        "backend": "numpy" if recommendations.np is not None else "python",
+        "entries": len(entries),
+        "neighbor_rows": rows,
+        "load_seconds": load_seconds,
+        "build_seconds": build_seconds,
+        "build_peak_mb": peak / 2**20,
+        "rebuild_seconds": rebuild_seconds,
+        "pairs": len(pairs),
+        "get_recommendations": reads,
+        "get_recommendations_heaviest": heaviest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--movies", type=int, default=1000000)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=Config.RECOMMEND_TOP_K)
+    parser.add_argument("--max-library", type=int, default=Config.RECOMMEND_MAX_LIBRARY)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.users, args.movies, args.calls, args.top_k, args.max_library, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "recommendations", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
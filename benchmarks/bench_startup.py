@@ -0,0 +1,96 @@
+"""Time a cold start: importing the app module, then its first requests.
+
+Each run is a fresh interpreter, so nothing is warm. The first request is
+where the database is opened and the schema checked; the second shows the
+steady state.
+
+Usage:
+    python -m benchmarks.bench_startup --users 100 --movies 10000 --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import save_results, summarize
+from benchmarks.datagen import create_app, generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of timings in milliseconds
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+status = client.get(sys.argv[1]).status_code
+first = time.perf_counter()
+client.get(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (first - imported) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "import_to_first_response_ms": (first - started) * 1000,
+    "status": status,
+}))
+"""
+
+
+def measure(database, omdb_cache_path, path="/users", runs=5):
+    """Cold-start the app runs times against database; summarize each phase."""
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + database,
+        OMDB_CACHE_PATH=omdb_cache_path,
+        LOG_LEVEL="WARNING",
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, path],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    phases = [key for key in samples[0] if key.endswith("_ms")]
+    results = {phase: summarize([sample[phase] for sample in samples]) for phase in phases}
+    results["statuses"] = sorted({sample["status"] for sample in samples})
+    return results
+
+
+def run(users, movies, runs, seed=1):
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    database = os.path.join(workdir, "movies.db")
+    with create_app(database).app_context():
+        data = generate(users, movies, seed=seed)
+    return {
+        "dataset": {key: data[key] for key in ("users", "films", "movies")},
+        "startup": measure(database, os.path.join(workdir, "omdb_cache.db"), runs=runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.users, args.movies, args.runs, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "startup", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
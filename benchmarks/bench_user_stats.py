@@ -0,0 +1,81 @@
+"""Compare reading library statistics from user_stats with recomputing them.
+
+One user owns the whole generated library at each size; the counter read
+should stay flat while the recomputation grows with the library.
+
+Usage:
+    python -m benchmarks.bench_user_stats --sizes 100 1000 10000 100000 --output stats.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+from collections import Counter
+
+from benchmarks.common import save_results, summarize, time_calls
+from benchmarks.datagen import create_app, generate
+from config import Config
+from models import db
+from models.data_manager import SQLiteDataManager
+from models.title_index import TitleIndex
+
+
+def stats_from_library(data_manager, user_id):
+    """What /user/<id>/stats would cost without the counters: load and fold every entry."""
+    movies = data_manager.get_user_movies(user_id)
+    ratings = [movie.rating for movie in movies if movie.rating is not None]
+    return {
+        "movie_count": len(movies),
+        "average_rating": statistics.fmean(ratings) if ratings else None,
+        "ratings": Counter(int(rating) for rating in ratings),
+        "decades": Counter(movie.year // 10 * 10 for movie in movies if movie.year),
+        "top_directors": Counter(movie.director for movie in movies if movie.director).most_common(5),
+    }
+
+
+def run(sizes, calls, seed=1):
+    results = {}
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix="bench-stats-")
+        app = create_app(os.path.join(workdir, "movies.db"), SQLITE_PRAGMAS=Config.SQLITE_PRAGMAS)
+        with app.app_context():
+            data = generate(1, size, seed=seed)
+        data_manager = SQLiteDataManager(app, title_index=TitleIndex())
+        user_id = data["heaviest_user_id"]
+
+        with app.app_context():
+            db.engine.dispose()  # reconnect so every connection runs the PRAGMAs
+
+            def bench(fn, repeat):
+                samples = time_calls(fn, [(user_id,)] * repeat)
+                db.session.remove()
+                return summarize(samples)
+
+            results[str(size)] = {
+                "get_user_stats": bench(data_manager.get_user_stats, calls),
+                "from_library": bench(
+                    lambda user_id: stats_from_library(data_manager, user_id),
+                    max(1, calls // max(1, size // 1000)),
+                ),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.calls, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "user_stats", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Helpers shared by the benchmarks: latency summaries and JSON results."""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(samples_ms):
+    """Summarize latencies in milliseconds."""
+    if not samples_ms:
+        return {"calls": 0}
+    return {
+        "calls": len(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "p50_ms": statistics.median(samples_ms),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms),
+    }
+
+
+def time_calls(fn, args_list):
+    """Call fn once per argument tuple; return per-call latencies in milliseconds."""
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path, name, parameters, results):
+    """Write results as JSON with enough context to compare runs over time."""
+    document = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": parameters,
+        "results": results,
+    }
+    with open(path, "w") as handle:
+        json.dump(document, handle, indent=2)
+    return document
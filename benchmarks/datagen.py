@@ -0,0 +1,147 @@
+"""Seeded synthetic data for benchmarks: users, catalog films and libraries.
+
+Library sizes and film popularity both follow a Zipf-like distribution, so a
+few users own large libraries and a few films appear in many of them, as in
+real usage. The same seed always produces the same database.
+
+Usage:
+    python -m benchmarks.datagen --users 1000 --movies 100000 --database /tmp/bench.db
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from datetime import timedelta
+
+from flask import Flask
+from sqlalchemy import func, insert, select
+
+from models import db, user_stats
+from models.db_models import Movie, User, UserMovie, utcnow
+
+WORDS = ["star", "night", "river", "ghost", "city", "last", "love", "war", "dark", "king",
+         "blue", "house", "road", "storm", "silent", "iron", "dream", "empire", "wild", "heart"]
+FIRST_NAMES = ["Ann", "Bob", "Cleo", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivo", "Jo"]
+DIRECTORS = [f"{first} {last}" for first in FIRST_NAMES for last in ("Mann", "Scott", "Lee", "Varda", "Ozu")]
+HISTORY_DAYS = 3 * 365
+CHUNK_SIZE = 10000
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative weights of ranks 1..n under a Zipf distribution."""
+    return list(itertools.accumulate(1 / rank**exponent for rank in range(1, n + 1)))
+
+
+def _next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert_chunks(model, rows):
+    """Insert rows from an iterable in fixed-size chunks."""
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, CHUNK_SIZE)):
+        db.session.execute(insert(model), chunk)
+    db.session.commit()
+
+
+def generate(users, movies, films=None, seed=1, skew=1.1, imdb_share=0.8):
+    """Add users, catalog films and movies (library entries) to the database.
+
+    films defaults to a quarter of movies. Must be called inside an
+    application context. Returns the counts and the new user and film ids,
+    most active user and most popular film first.
+    """
+    films = films or max(1, movies // 4)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    first_user = _next_id(User)
+    user_ids = list(range(first_user, first_user + users))
+    _insert_chunks(
+        User,
+        ({"id": user_id, "name": f"{rng.choice(FIRST_NAMES)} {user_id}"} for user_id in user_ids),
+    )
+
+    first_film = _next_id(Movie)
+    film_ids = list(range(first_film, first_film + films))
+
+    def film_row(film_id):
+        has_imdb = rng.random() < imdb_share
+        return {
+            "id": film_id,
+            "imdb_id": f"tt{9000000 + film_id:07d}" if has_imdb else None,
+            "name": " ".join(rng.choices(WORDS, k=rng.randint(1, 3))).title() + f" {film_id}",
+            "director": rng.choice(DIRECTORS),
+            "year": rng.randint(1930, 2024),
+        }
+
+    _insert_chunks(Movie, (film_row(film_id) for film_id in film_ids))
+
+    # Popularity rank -> id, shuffled so heavy users and hit films are spread out
+    rng.shuffle(user_ids)
+    rng.shuffle(film_ids)
+    user_weights = zipf_cum_weights(users, skew)
+    film_weights = zipf_cum_weights(films, skew)
+    now = utcnow()
+
+    def entry_rows():
+        for _ in range(movies):
+            yield {
+                "user_id": rng.choices(user_ids, cum_weights=user_weights)[0],
+                "movie_id": rng.choices(film_ids, cum_weights=film_weights)[0],
+                "rating": round(min(10.0, max(1.0, rng.gauss(7.0, 1.5))), 1),
+                "added_at": now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)),
+            }
+
+    _insert_chunks(UserMovie, entry_rows())
+    user_stats.rebuild(user_ids)  # rows went in directly, bypassing the data manager
+    db.session.commit()
+
+    seconds = time.perf_counter() - started
+    logging.info(f"Generated {users} users, {films} films and {movies} movies in {seconds:.1f}s.")
+    return {
+        "users": users,
+        "films": films,
+        "movies": movies,
+        "seconds": seconds,
+        "user_ids": user_ids,
+        "film_ids": film_ids,
+        "heaviest_user_id": user_ids[0],
+    }
+
+
+def create_app(database, **config):
+    """Build a bare Flask app bound to a SQLite file, with tables created."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.abspath(database)
+    app.config.update(config)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--films", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--database", required=True)
+    args = parser.parse_args()
+
+    app = create_app(args.database)
+    with app.app_context():
+        stats = generate(args.users, args.movies, args.films, args.seed, args.skew)
+    stats.pop("user_ids")
+    stats.pop("film_ids")
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
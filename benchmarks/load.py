@@ -0,0 +1,170 @@
+"""Multi-threaded HTTP load test of the app against a stubbed OMDb.
+
+Seeds a fresh database with benchmarks.datagen, serves the app on a local
+threaded server and drives a weighted mix of routes from several client
+threads. Reports p50/p95/p99 latency and throughput per route, and the
+cold-start time from importing the app to its first response. With
+--backend memory the app serves from the in-memory data manager, which
+separates database cost from the cost of Flask and the templates.
+
+Usage:
+    python -m benchmarks.load --users 1000 --movies 100000 --threads 8 --duration 30 --output load.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks.bench_startup import measure as measure_startup
+from benchmarks.common import save_results, summarize
+from benchmarks.datagen import WORDS, create_app, generate, zipf_cum_weights
+from omdb.stub_server import MOVIES, StubOMDbServer
+
+# Route name -> relative weight in the request mix
+ROUTE_MIX = {
+    "users": 3,
+    "user_movies": 5,
+    "user_movies_by_rating": 1,
+    "movie_suggestions": 2,
+    "movie_details": 1,
+}
+
+
+class RequestPlan:
+    """Pick the next request, with heavier users requested more often."""
+
+    def __init__(self, data, seed):
+        self.rng = random.Random(seed)
+        self.user_ids = data["user_ids"]
+        self.user_weights = zipf_cum_weights(len(self.user_ids), 1.1)
+        self.imdb_ids = [movie["imdbID"] for movie in MOVIES] + [
+            f"tt{9000000 + film_id:07d}" for film_id in data["film_ids"][:100]
+        ]
+        self.routes = list(ROUTE_MIX)
+        self.route_weights = list(itertools.accumulate(ROUTE_MIX.values()))
+
+    def next(self):
+        route = self.rng.choices(self.routes, cum_weights=self.route_weights)[0]
+        if route == "users":
+            return route, "/users"
+        if route == "movie_suggestions":
+            return route, f"/movie_suggestions?query={self.rng.choice(WORDS)}"
+        if route == "movie_details":
+            return route, f"/movie_details?imdbID={self.rng.choice(self.imdb_ids)}"
+        user_id = self.rng.choices(self.user_ids, cum_weights=self.user_weights)[0]
+        if route == "user_movies_by_rating":
+            return route, f"/user/{user_id}?sort=-rating"
+        return route, f"/user/{user_id}"
+
+
+def drive(base_url, plan, deadline, warmup_until, samples, errors):
+    """Send requests until deadline, recording latencies after warm-up."""
+    session = requests.Session()
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        route, path = plan.next()
+        try:
+            ok = session.get(base_url + path, timeout=30).status_code < 500
+        except requests.RequestException:
+            ok = False
+        if started < warmup_until:
+            continue
+        samples[route].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            errors[route] += 1
+
+
+def run(users, movies, threads, duration, warmup=1.0, seed=1, backend="sqlite"):
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    database = os.path.join(workdir, "movies.db")
+    with create_app(database).app_context():
+        data = generate(users, movies, seed=seed)
+
+    omdb_cache_path = os.path.join(workdir, "omdb_cache.db")
+    startup = measure_startup(database, omdb_cache_path, runs=3)
+
+    with StubOMDbServer() as stub:
+        # Config is read when the app module is imported, so point it here first
+        os.environ["DATABASE_URL"] = "sqlite:///" + database
+        os.environ["OMDB_BASE_URL"] = stub.url
+        os.environ["OMDB_CACHE_PATH"] = omdb_cache_path
+        os.environ["DATA_MANAGER_BACKEND"] = backend
+        from app import app
+
+        app.debug = False
+        # Per-request INFO logs would dominate what is being measured
+        logging.getLogger().setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        samples = defaultdict(list)  # list.append is thread-safe
+        errors = defaultdict(int)
+        start = time.perf_counter()
+        warmup_until = start + warmup
+        deadline = warmup_until + duration
+        workers = [
+            threading.Thread(
+                target=drive,
+                args=(base_url, RequestPlan(data, seed + i), deadline, warmup_until, samples, errors),
+            )
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        server.shutdown()
+        upstream_requests = stub.request_count
+
+    routes = {}
+    for route in ROUTE_MIX:
+        routes[route] = dict(
+            summarize(samples[route]),
+            requests_per_second=len(samples[route]) / duration,
+            errors=errors[route],
+        )
+    everything = [sample for route_samples in samples.values() for sample in route_samples]
+    return {
+        "dataset": {key: data[key] for key in ("users", "films", "movies")},
+        "total": dict(summarize(everything), requests_per_second=len(everything) / duration),
+        "routes": routes,
+        "omdb_upstream_requests": upstream_requests,
+        "startup": startup,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds, after warm-up")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(
+        args.users, args.movies, args.threads, args.duration, args.warmup, args.seed, args.backend
+    )
+    print(json.dumps(results, indent=2))
+    if args.output:
+        save_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,140 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY") or "you-will-never-guess"
     SQLALCHEMY_DATABASE_URI =  os.environ.get("DATABASE_URL") or "sqlite:///" + os.path.join(basedir, "data/movies.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    OMDB_API_KEY = os.environ.get("OMDB_API_KEY") or "your-omdb"   
+
+    # SQLite performance profile, applied to every new connection
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",  # readers no longer block on writers
+        "synchronous": "NORMAL",  # durable with WAL, far fewer fsyncs
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS") or 5000),
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE") or 256 * 1024 * 1024),
+        "cache_size": -int(os.environ.get("SQLITE_CACHE_KB") or 64 * 1024),
+        "temp_store": "MEMORY",
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE") or 10),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW") or 10),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT") or 30),
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE") or 3600),
+    }
+    # Serve GET-route reads from a separate read-only engine
+    SQLALCHEMY_READ_ONLY_ENGINE = os.environ.get("SQLALCHEMY_READ_ONLY_ENGINE") == "1"
+    OMDB_API_KEY = os.environ.get("OMDB_API_KEY") or "your-omdb"
+
+    # OMDb response cache: in-process LRU in front of a persistent SQLite table
+    OMDB_CACHE_PATH = os.environ.get("OMDB_CACHE_PATH") or os.path.join(basedir, "data/omdb_cache.db")
+    OMDB_CACHE_SIZE = int(os.environ.get("OMDB_CACHE_SIZE") or 1024)
+    OMDB_CACHE_TTL = int(os.environ.get("OMDB_CACHE_TTL") or 86400)
+    OMDB_CACHE_NEGATIVE_TTL = int(os.environ.get("OMDB_CACHE_NEGATIVE_TTL") or 3600)
+
+    # OMDb client: pooled session, timeouts, retries and circuit breaker
+    OMDB_BASE_URL = os.environ.get("OMDB_BASE_URL") or "http://www.omdbapi.com/"
+    OMDB_CONNECT_TIMEOUT = float(os.environ.get("OMDB_CONNECT_TIMEOUT") or 3.05)
+    OMDB_READ_TIMEOUT = float(os.environ.get("OMDB_READ_TIMEOUT") or 5.0)
+    OMDB_MAX_RETRIES = int(os.environ.get("OMDB_MAX_RETRIES") or 2)
+    OMDB_BACKOFF = float(os.environ.get("OMDB_BACKOFF") or 0.2)
+    OMDB_MAX_BACKOFF = float(os.environ.get("OMDB_MAX_BACKOFF") or 2.0)
+    OMDB_POOL_SIZE = int(os.environ.get("OMDB_POOL_SIZE") or 10)
+    OMDB_BREAKER_THRESHOLD = int(os.environ.get("OMDB_BREAKER_THRESHOLD") or 5)
+    OMDB_BREAKER_RESET = float(os.environ.get("OMDB_BREAKER_RESET") or 30.0)
+    # Connections the async client (asgi.py) keeps open for in-flight lookups
+    OMDB_ASYNC_MAX_CONNECTIONS = int(os.environ.get("OMDB_ASYNC_MAX_CONNECTIONS") or 100)
+
+    # OMDb quota shared by every process: token bucket plus daily budget.
+    # Suggestions and background enrichment stop once only their reserved
+    # share of the daily budget is left, keeping it for detail lookups.
+    OMDB_QUOTA_PATH = os.environ.get("OMDB_QUOTA_PATH") or OMDB_CACHE_PATH
+    OMDB_DAILY_LIMIT = int(os.environ.get("OMDB_DAILY_LIMIT") or 1000)
+    OMDB_RATE = float(os.environ.get("OMDB_RATE") or 5.0)  # calls per second
+    OMDB_BURST = int(os.environ.get("OMDB_BURST") or 10)
+    OMDB_SUGGEST_RESERVE = float(os.environ.get("OMDB_SUGGEST_RESERVE") or 0.2)
+    OMDB_BACKGROUND_RESERVE = float(os.environ.get("OMDB_BACKGROUND_RESERVE") or 0.5)
+
+    # /movie_suggestions answers from the local title index when it has enough hits
+    SUGGESTIONS_LIMIT = int(os.environ.get("SUGGESTIONS_LIMIT") or 10)
+    SUGGESTIONS_MIN_LOCAL = int(os.environ.get("SUGGESTIONS_MIN_LOCAL") or 5)
+
+    # Keyset pagination of /users and /user/<id>
+    USERS_PER_PAGE = int(os.environ.get("USERS_PER_PAGE") or 50)
+    MOVIES_PER_PAGE = int(os.environ.get("MOVIES_PER_PAGE") or 50)
+    MAX_PER_PAGE = int(os.environ.get("MAX_PER_PAGE") or 500)
+
+    # Bulk library import/export
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE") or 1000)
+    EXPORT_PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE") or 1000)
+    # Largest add/update/delete batch accepted by /users/<id>/movies/batch
+    BATCH_MAX_OPERATIONS = int(os.environ.get("BATCH_MAX_OPERATIONS") or 1000)
+
+    # Rendered /users and /user/<id> pages kept per worker, keyed by data version
+    PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE") or 256)
+
+    # "sqlite", or "memory": an indexed in-process store loaded from the
+    # database at startup that never writes back (tests and benchmarks)
+    DATA_MANAGER_BACKEND = os.environ.get("DATA_MANAGER_BACKEND") or "sqlite"
+
+    # Read-through cache of users, libraries and movies in front of the data
+    # manager. Pages are keyed by data version; other reads are invalidated
+    # only by writes through this process, so with the enrichment worker or
+    # other writers running they may lag by up to DATA_MANAGER_CACHE_TTL
+    DATA_MANAGER_CACHE = os.environ.get("DATA_MANAGER_CACHE") == "1"
+    DATA_MANAGER_CACHE_SIZE = int(os.environ.get("DATA_MANAGER_CACHE_SIZE") or 4096)
+    DATA_MANAGER_CACHE_TTL = int(os.environ.get("DATA_MANAGER_CACHE_TTL") or 3600)
+
+    # Log requests slower than this with their SQL/OMDb/template breakdown (0 disables)
+    SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS") or 1000)
+
+    # Logging: JSON lines written by a background thread, with rotation
+    LOG_FILE = os.environ.get("LOG_FILE", os.path.join(basedir, "app.log")) or None  # "" for the terminal only
+    LOG_LEVEL = os.environ.get("LOG_LEVEL") or "INFO"
+    # Size rotation; 0 leaves rotation to an external tool (the gunicorn default)
+    LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES") or 10 * 1024 * 1024)
+    LOG_ROTATE_WHEN = os.environ.get("LOG_ROTATE_WHEN")  # e.g. "midnight"; overrides size rotation
+    LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT") or 5)
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE") or 10000)
+    # Full queue: INFO/DEBUG are dropped; warnings wait this long, then go to stderr
+    LOG_QUEUE_WAIT = float(os.environ.get("LOG_QUEUE_WAIT") or 1.0)
+    # Once this many records are waiting, keep INFO lines for only this share of requests
+    LOG_SAMPLING_QUEUE_DEPTH = int(os.environ.get("LOG_SAMPLING_QUEUE_DEPTH") or 1000)
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get("LOG_INFO_SAMPLE_RATE") or 0.1)
+
+    # Background OMDb enrichment (plot, genre, poster, runtime); see enrich_worker.py
+    ENRICH_ON_ADD = (os.environ.get("ENRICH_ON_ADD") or "1") == "1"
+    ENRICH_BATCH_SIZE = int(os.environ.get("ENRICH_BATCH_SIZE") or 20)
+    ENRICH_MAX_ATTEMPTS = int(os.environ.get("ENRICH_MAX_ATTEMPTS") or 5)
+    ENRICH_BACKOFF = float(os.environ.get("ENRICH_BACKOFF") or 30.0)
+    ENRICH_MAX_BACKOFF = float(os.environ.get("ENRICH_MAX_BACKOFF") or 3600.0)
+    ENRICH_LEASE = float(os.environ.get("ENRICH_LEASE") or 300.0)
+    ENRICH_POLL_INTERVAL = float(os.environ.get("ENRICH_POLL_INTERVAL") or 2.0)
+
+    # "Users who saved this also saved": top-K neighbours per film, rebuilt by
+    # recommend_worker.py whenever libraries changed; see models/recommendations.py
+    RECOMMEND_TOP_K = int(os.environ.get("RECOMMEND_TOP_K") or 20)
+    RECOMMEND_MIN_COMMON = int(os.environ.get("RECOMMEND_MIN_COMMON") or 2)
+    RECOMMEND_MAX_LIBRARY = int(os.environ.get("RECOMMEND_MAX_LIBRARY") or 500)
+    RECOMMEND_REFRESH_INTERVAL = float(os.environ.get("RECOMMEND_REFRESH_INTERVAL") or 300.0)
+    RECOMMEND_SEEDS = int(os.environ.get("RECOMMEND_SEEDS") or 200)  # recent saves a request looks up
+    RECOMMEND_LIMIT = int(os.environ.get("RECOMMEND_LIMIT") or 20)
+
+    # Production server (gunicorn.conf.py): processes x threads per process.
+    # Keep DB_POOL_SIZE + DB_MAX_OVERFLOW at or above SERVER_THREADS.
+    SERVER_BIND = os.environ.get("SERVER_BIND") or "0.0.0.0:8000"
+    SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS") or os.cpu_count() or 1)
+    SERVER_THREADS = int(os.environ.get("SERVER_THREADS") or 4)
+    SERVER_TIMEOUT = int(os.environ.get("SERVER_TIMEOUT") or 30)
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT") or 30)
+    SERVER_KEEPALIVE = int(os.environ.get("SERVER_KEEPALIVE") or 5)
+    SERVER_MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS") or 10000)
+
+
+class TestConfig(Config):
+    """Self-contained settings for tests: in-memory database and OMDb state."""
+
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # in-memory SQLite shares one connection; no pool sizing
+    OMDB_CACHE_PATH = None  # memory-only response cache
+    OMDB_QUOTA_PATH = ":memory:"
+    OMDB_API_KEY = "test"
+    LOG_FILE = None  # terminal only; never append to the working tree's app.log
@@ -0,0 +1,66 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ["LOG_FILE"] = ""  # before app builds its default app: no app.log from test runs
+
+from app import create_app
+from models import db
+from services import EXTENSION
+
+
+class QueryCounter:
+    """Record the SQL statements sent to the database."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def app():
+    """A fresh app on its own in-memory database, with its tables created."""
+    app = create_app("config.TestConfig")
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def ctx(app):
+    """Run a test inside the test app's context."""
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def data_manager(app):
+    """The test app's data manager; call it inside an app context."""
+    return app.extensions[EXTENSION].data_manager
+
+
+@pytest.fixture
+def count_queries(app):
+    """Return a context manager counting the app's SQL issued inside it (e.g. per request)."""
+
+    @contextmanager
+    def counting():
+        with app.app_context():
+            engine = db.engine
+        counter = QueryCounter()
+        event.listen(engine, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", counter)
+
+    return counting
@@ -0,0 +1,49 @@
+"""Background worker that enriches queued films with OMDb details.
+
+Usage:
+    python enrich_worker.py                 # run until interrupted
+    python enrich_worker.py --once          # drain due jobs, then exit
+    python enrich_worker.py --requeue-stale-days 30
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from datetime import timedelta
+
+from app import app, jobs, omdb_client
+from models.enrichment import run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich queued films with OMDb details.")
+    parser.add_argument("--once", action="store_true", help="exit when no due job is left")
+    parser.add_argument("--batch-size", type=int, default=app.config["ENRICH_BATCH_SIZE"])
+    parser.add_argument(
+        "--requeue-stale-days",
+        type=float,
+        help="first queue films not enriched within this many days",
+    )
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    with app.app_context():
+        if args.requeue_stale_days is not None:
+            jobs.requeue_stale(timedelta(days=args.requeue_stale_days))
+        processed = run_worker(
+            jobs,
+            omdb_client,
+            batch_size=args.batch_size,
+            poll_interval=app.config["ENRICH_POLL_INTERVAL"],
+            stop=stop,
+            once=args.once,
+        )
+        logging.info(f"Enrichment worker stopped after {processed} jobs; queue: {jobs.counts()}")
+
+
+if __name__ == "__main__":
+    main()
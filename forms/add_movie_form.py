@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, IntegerField, FloatField, SubmitField
+from wtforms import StringField, IntegerField, FloatField, HiddenField, SubmitField
 from wtforms.validators import DataRequired, NumberRange
 
 
@@ -10,4 +10,5 @@ class AddMovieForm(FlaskForm):
     rating = FloatField(
         "Rating", validators=[DataRequired(), NumberRange(min=0, max=10)]
     )
+    imdb_id = HiddenField("IMDb ID")  # Filled in when a suggestion is picked
     submit = SubmitField("Add Movie")
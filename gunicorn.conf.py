@@ -0,0 +1,67 @@
+"""Gunicorn settings for serving the app in production.
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Sizing on one box: SERVER_WORKERS processes (default: one per core) each
+run SERVER_THREADS threads (gthread). Processes give CPU parallelism
+(templates and JSON hold the GIL); threads cover time spent waiting on
+SQLite and OMDb. Start with one worker per core and 4 threads, then raise
+threads if /metrics shows requests mostly waiting on OMDb, or workers if
+CPU is idle under load. SQLite in WAL mode lets every worker read at
+once, but writes are serialized, so a write-heavy load will not scale
+with cores; busy_timeout makes writers queue instead of failing.
+
+The app is imported once in the master (preload_app) so workers fork
+with templates and code already loaded. Nothing opens a database or OMDb
+connection at import, and post_fork drops any that were, so SQLite
+connections are never shared between processes.
+
+Each worker restarts after about SERVER_MAX_REQUESTS requests to bound
+memory growth. On SIGTERM workers stop accepting connections, finish
+in-flight requests within SERVER_GRACEFUL_TIMEOUT seconds, then flush
+their logs and close connections. Give load balancers /healthz.
+
+Workers share LOG_FILE, and several processes cannot rotate one file
+safely, so under gunicorn LOG_MAX_BYTES defaults to 0 (no built-in
+rotation) and LOG_ROTATE_WHEN should stay unset. Rotate the file
+externally, e.g. with logrotate; each worker reopens it once it is moved.
+"""
+
+import os
+
+from config import Config
+
+wsgi_app = "wsgi:app"
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+worker_class = "gthread"
+threads = Config.SERVER_THREADS
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+keepalive = Config.SERVER_KEEPALIVE
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10  # workers do not all restart at once
+preload_app = True
+accesslog = None  # per-endpoint request counts and latency are at /metrics
+
+
+def post_fork(server, worker):
+    """Give the new worker its own connections and log writer thread."""
+    from app import app
+    from logging_setup import start_logging
+    from services import EXTENSION
+
+    # Threads do not survive fork; built-in rotation only if explicitly asked for
+    start_logging(dict(app.config, LOG_MAX_BYTES=int(os.environ.get("LOG_MAX_BYTES") or 0)))
+    app.extensions[EXTENSION].after_fork()
+
+
+def worker_exit(server, worker):
+    """Flush logs and close connections once in-flight requests are done."""
+    from app import app
+    from logging_setup import stop_logging
+    from services import EXTENSION
+
+    app.extensions[EXTENSION].close()
+    stop_logging()
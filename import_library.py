@@ -0,0 +1,42 @@
+"""Bulk-import a movie library for one user from a CSV, JSON or NDJSON file.
+
+Usage:
+    python import_library.py USER_ID movies.csv [--batch-size 1000]
+"""
+
+import argparse
+import json
+import sys
+
+from app import app, data_manager
+from models import library_io
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import movies into a user's library.")
+    parser.add_argument("user_id", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=library_io.FORMATS, help="detected from the extension")
+    parser.add_argument("--batch-size", type=int, default=app.config["IMPORT_BATCH_SIZE"])
+    args = parser.parse_args()
+
+    # Form validation needs a request context
+    with app.test_request_context():
+        if data_manager.get_user(args.user_id) is None:
+            sys.exit(f"User ID {args.user_id} not found.")
+        fmt = args.format or library_io.detect_format(args.path)
+        with open(args.path, "rb") as stream:
+            report = library_io.import_library(
+                data_manager,
+                args.user_id,
+                library_io.read_rows(stream, fmt),
+                batch_size=args.batch_size,
+            )
+
+    print(f"Imported {report['imported']} movies.")
+    for error in report["errors"]:
+        print(json.dumps(error), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
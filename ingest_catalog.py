@@ -0,0 +1,55 @@
+"""Load an offline IMDb/OMDb-style title dump into the local catalog.
+
+Usage:
+    python ingest_catalog.py title.basics.tsv.gz title.ratings.tsv.gz \
+        --crew title.crew.tsv.gz --names name.basics.tsv.gz
+
+IMDb dumps carry no director names, and catalog entries without a director
+still go to OMDb, so pass --crew and --names (or an OMDb-style CSV with a
+Director column) for the catalog to answer lookups on its own.
+"""
+
+import argparse
+
+from app import app
+from models import db
+from models.catalog import ingest, ingest_directors
+
+
+def print_progress(rows, elapsed):
+    """Print a one-line progress report."""
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"\r{rows:,} rows ({rate:,.0f} rows/s)", end="", flush=True)
+
+
+def report(stats):
+    """Print the summary line for one finished ingest."""
+    print(
+        f"\nDone: {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+        f"({stats['rows_per_second']:,.0f} rows/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest title dumps into the catalog.")
+    parser.add_argument("paths", nargs="+", help="TSV/CSV dump files, optionally gzipped")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per transaction")
+    parser.add_argument("--delimiter", help="field delimiter (detected from the header)")
+    parser.add_argument("--crew", help="IMDb title.crew dump, to fill in directors")
+    parser.add_argument("--names", help="IMDb name.basics dump, to name the --crew directors")
+    args = parser.parse_args()
+    if bool(args.crew) != bool(args.names):
+        parser.error("--crew and --names must be given together")
+
+    with app.app_context():
+        db.create_all()
+        for path in args.paths:
+            print(f"Ingesting {path}")
+            report(ingest(path, args.chunk_size, args.delimiter, progress=print_progress))
+        if args.crew:
+            print(f"Ingesting directors from {args.crew} and {args.names}")
+            report(ingest_directors(args.crew, args.names, args.chunk_size, progress=print_progress))
+
+
+if __name__ == "__main__":
+    main()
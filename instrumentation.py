@@ -0,0 +1,245 @@
+"""Per-request performance breakdown exported in Prometheus text format.
+
+Each request records its latency, the SQL statements it ran (through
+SQLAlchemy engine events), its OMDb upstream calls and the time spent
+rendering templates. Totals are kept per endpoint and served at /metrics.
+"""
+
+import logging
+import threading
+import time
+
+from flask import Response, g, has_app_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            for labels, value in sorted(self.values.items()):
+                yield self.name, _label_text(self.labelnames, labels), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, series in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    yield f"{self.name}_bucket", _label_text(names, labels + (bound,)), cumulative
+                yield f"{self.name}_bucket", _label_text(names, labels + ("+Inf",)), series[-1]
+                yield f"{self.name}_sum", _label_text(self.labelnames, labels), series[-2]
+                yield f"{self.name}_count", _label_text(self.labelnames, labels), series[-1]
+
+
+class Gauge:
+    """Value read from a callback when metrics are scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, callback, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.callback = callback  # returns a number, or {labels: number}
+
+    def samples(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            yield self.name, _label_text(self.labelnames, labels), value
+
+
+class RequestStats:
+    """Breakdown of one request, kept on flask.g."""
+
+    __slots__ = ("started", "sql_count", "sql_seconds", "omdb_count", "omdb_seconds",
+                 "template_seconds", "template_started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.omdb_count = 0
+        self.omdb_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_started = []
+
+
+def _current():
+    """Return the RequestStats of the active request, if any."""
+    return g.get("request_stats") if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - started.pop()
+
+
+class Instrumentation:
+    """Collect per-endpoint metrics for a Flask app and serve them at /metrics."""
+
+    def __init__(self, app=None, slow_request_ms=0, buckets=DEFAULT_BUCKETS):
+        self.slow_request_ms = slow_request_ms
+        self.metrics = [
+            Histogram("app_request_duration_seconds", "Request latency.", ("endpoint", "method"), buckets),
+            Counter("app_requests_total", "Requests served.", ("endpoint", "method", "status")),
+            Counter("app_sql_statements_total", "SQL statements executed.", ("endpoint",)),
+            Counter("app_sql_seconds_total", "Time spent executing SQL.", ("endpoint",)),
+            Counter("app_omdb_calls_total", "OMDb upstream calls.", ("endpoint", "outcome")),
+            Histogram("app_omdb_call_duration_seconds", "OMDb upstream call latency.", ("endpoint",), buckets),
+            Counter("app_template_render_seconds_total", "Time spent rendering templates.", ("endpoint",)),
+        ]
+        (
+            self.request_latency,
+            self.requests,
+            self.sql_statements,
+            self.sql_seconds,
+            self.omdb_calls,
+            self.omdb_latency,
+            self.template_seconds,
+        ) = self.metrics
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register request hooks, SQL and template listeners and the /metrics route."""
+        self.slow_request_ms = app.config.get("SLOW_REQUEST_MS", self.slow_request_ms)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        # Listeners cover every engine (including the read-only one) and are
+        # registered once however many apps are instrumented
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    def _before_request(self):
+        g.request_stats = RequestStats()
+
+    def _after_request(self, response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        seconds = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "<unmatched>"
+        self.request_latency.observe((endpoint, request.method), seconds)
+        self.requests.inc((endpoint, request.method, str(response.status_code)))
+        if stats.sql_count:
+            self.sql_statements.inc((endpoint,), stats.sql_count)
+            self.sql_seconds.inc((endpoint,), stats.sql_seconds)
+        if stats.template_seconds:
+            self.template_seconds.inc((endpoint,), stats.template_seconds)
+
+        if self.slow_request_ms and seconds * 1000 >= self.slow_request_ms:
+            logging.warning(
+                f"Slow request {request.method} {request.full_path} -> {response.status_code} "
+                f"in {seconds * 1000:.1f}ms: {stats.sql_count} SQL ({stats.sql_seconds * 1000:.1f}ms), "
+                f"{stats.omdb_count} OMDb ({stats.omdb_seconds * 1000:.1f}ms), "
+                f"templates {stats.template_seconds * 1000:.1f}ms"
+            )
+        return response
+
+    def _before_render(self, sender, template, context, **extra):
+        stats = _current()
+        if stats is not None:
+            stats.template_started.append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        stats = _current()
+        if stats is not None and stats.template_started:
+            stats.template_seconds += time.perf_counter() - stats.template_started.pop()
+
+    def record_omdb_call(self, seconds, ok, endpoint="<background>"):
+        """OMDbClient on_call hook: attribute an upstream call to the current endpoint."""
+        stats = _current()
+        if stats is not None:
+            stats.omdb_count += 1
+            stats.omdb_seconds += seconds
+            endpoint = request.endpoint or "<unmatched>"
+        self.omdb_calls.inc((endpoint, "ok" if ok else "error"))
+        self.omdb_latency.observe((endpoint,), seconds)
+
+    def add_gauge(self, name, help_text, callback, labelnames=()):
+        """Export a value computed at scrape time, e.g. a remaining quota."""
+        self.metrics.append(Gauge(name, help_text, callback, labelnames))
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return Response(self.render(), content_type=CONTENT_TYPE)
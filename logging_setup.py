@@ -0,0 +1,180 @@
+"""Queue-based logging: request threads enqueue, one background thread writes.
+
+Records are tagged with the current request ID on the request thread, then
+handed to a QueueListener that writes JSON lines to LOG_FILE, if set, and
+plain text to the terminal. Under load, per-request INFO lines can be
+sampled; warnings and errors are always kept.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_listener = None
+_queue_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the request ID and drop unsampled INFO lines.
+
+    Runs on the calling thread before the record is queued, while the
+    request context is still available.
+    """
+
+    def filter(self, record):
+        if not has_request_context():
+            record.request_id = "-"
+            return True
+        record.request_id = g.get("request_id", "-")
+        return record.levelno >= logging.WARNING or g.get("log_sampled", True)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that sheds low-value records when the queue is full.
+
+    Records below WARNING are dropped and counted. Warnings and errors wait
+    up to wait seconds for room, then go straight to stderr.
+    """
+
+    def __init__(self, log_queue, wait=1.0):
+        super().__init__(log_queue)
+        self.wait = wait
+        self.dropped = 0
+        self.fallback = logging.Formatter(TEXT_FORMAT)
+
+    def enqueue(self, record):
+        if record.levelno < logging.WARNING:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+            return
+        try:
+            self.queue.put(record, timeout=self.wait)
+        except queue.Full:
+            sys.stderr.write(self.fallback.format(record) + "\n")
+
+
+def _file_handler(config):
+    """Return the JSON log file handler, or None if LOG_FILE is unset."""
+    path = config.get("LOG_FILE")
+    if not path:
+        return None
+    when = config.get("LOG_ROTATE_WHEN")
+    backups = config.get("LOG_BACKUP_COUNT", 5)
+    max_bytes = config.get("LOG_MAX_BYTES", 10 * 1024 * 1024)
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups)
+    if not max_bytes:
+        # Rotated externally (e.g. logrotate): reopen the file once it is moved
+        return logging.handlers.WatchedFileHandler(path)
+    return logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+
+
+def start_logging(config):
+    """Route all logging through a queue drained by one background thread.
+
+    Replaces the pipeline of an earlier call, so it is safe to call again.
+    Returns the queue records are written to.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [stream_handler]
+    file_handler = _file_handler(config)
+    if file_handler is not None:
+        file_handler.setFormatter(JsonFormatter())
+        handlers.insert(0, file_handler)
+
+    log_queue = queue.Queue(config.get("LOG_QUEUE_SIZE", 10000))
+    queue_handler = _queue_handler = DroppingQueueHandler(log_queue, config.get("LOG_QUEUE_WAIT", 1.0))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.get("LOG_LEVEL", "INFO"))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return log_queue
+
+
+def configure_logging(app):
+    """Tag the app's request logs with request IDs, starting the pipeline if needed.
+
+    The pipeline is per process: apps created later share the first one's.
+    """
+    config = app.config
+    if _listener is None:
+        start_logging(config)
+
+    sample_rate = config.get("LOG_INFO_SAMPLE_RATE", 1.0)
+    busy_queue = config.get("LOG_SAMPLING_QUEUE_DEPTH", 1000)
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16]
+        # Sample whole requests, and only while the writer is falling behind
+        g.log_sampled = queue_depth() < busy_queue or random.random() < sample_rate
+
+    @app.after_request
+    def echo_request_id(response):
+        response.headers.setdefault(REQUEST_ID_HEADER, g.get("request_id", ""))
+        return response
+
+
+def queue_depth():
+    """Return the number of records waiting to be written."""
+    return _listener.queue.qsize() if _listener is not None else 0
+
+
+def dropped_records():
+    """Return the number of records shed because the queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        if dropped_records():
+            sys.stderr.write(f"{dropped_records()} log records below WARNING were dropped.\n")
+
+
+atexit.register(stop_logging)
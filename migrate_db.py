@@ -0,0 +1,17 @@
+"""Upgrade an existing database to the current schema.
+
+Usage:
+    python migrate_db.py
+"""
+
+from sqlalchemy import create_engine
+
+from config import Config
+from models.migrations import migrate
+
+if __name__ == "__main__":
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    if migrate(engine):
+        print("Database migrated.")
+    else:
+        print("Database already up to date.")
@@ -0,0 +1,286 @@
+# models/caching_data_manager.py
+
+import logging
+import sys
+import threading
+from collections import namedtuple
+
+from models.data_management_interface import DataManagerInterface
+from models.data_manager import USERS_SCOPE, user_scope
+from models.pagination import Page
+from omdb.cache import LRUCache
+
+# Cached values are immutable records, never session-bound ORM objects
+UserRecord = namedtuple("UserRecord", ["id", "name"])
+MovieRecord = namedtuple(
+    "MovieRecord",
+    [
+        "id", "user_id", "movie_id", "imdb_id", "name", "director", "year", "rating", "added_at",
+        "genre", "runtime", "plot", "poster",
+    ],
+)
+
+ALL_USERS = ("users",)
+
+
+def _movie_key(movie_id):
+    return ("movie", movie_id)
+
+
+def _user_movies_key(user_id):
+    return ("user_movies", user_id)
+
+
+def _page_key(kind, version, *args):
+    """Key a cached page by its data version, so any writer's change misses it."""
+    return (kind, version, *args)
+
+
+def _movie_record(row):
+    return MovieRecord(*(getattr(row, field) for field in MovieRecord._fields))
+
+
+def _to_year(year):
+    """Match the integer year the backend stores for form input."""
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return year
+
+
+def _size_of(value):
+    """Approximate bytes held by a cached record or tuple of records."""
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(_size_of(item) for item in value)
+    return size
+
+
+class CachingDataManager(DataManagerInterface):
+    """Read-through cache in front of another DataManagerInterface.
+
+    get_movie, get_user_movies and get_all_users are served from an LRU
+    cache; every write through this manager drops exactly the keys it
+    affects. That invalidation is local to the process: changes made
+    elsewhere, such as details filled in by the enrichment worker, show
+    only once the TTL expires. Pages are keyed by the data version of
+    their scope instead, so they see every writer's changes at the cost
+    of one version lookup.
+    """
+
+    def __init__(self, backend, max_size=4096, ttl=3600):
+        self.backend = backend
+        self.cache = LRUCache(max_size)
+        self.ttl = ttl
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, backend, config):
+        return cls(
+            backend,
+            max_size=config.get("DATA_MANAGER_CACHE_SIZE", 4096),
+            ttl=config.get("DATA_MANAGER_CACHE_TTL", 3600),
+        )
+
+    def _read_through(self, key, load):
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = load()
+        with self._lock:
+            # A write during the load may have made value stale; skip caching it
+            if value is not None and generation == self._generation:
+                self.cache.set(key, value, self.ttl)
+        return value
+
+    def _invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.cache.delete(key)
+
+    def _invalidate_adopted(self, movies):
+        """Drop cached entries for hand-entered films that now gain an imdbID.
+
+        Adding a movie with an imdbID can attach it to a shared catalog row
+        that had none, which changes that film in every library linking it.
+        """
+        details = {
+            (m["name"], m["director"], m["year"]) for m in movies if m.get("imdb_id")
+        }
+        if not details:
+            return
+        stale = []
+        for key, value in self.cache.items():
+            if key == ALL_USERS or key[0] == "users_page":
+                continue
+            if isinstance(value, Page):
+                records = value.items
+            else:
+                records = (value,) if isinstance(value, MovieRecord) else value
+            if any(
+                record.imdb_id is None and (record.name, record.director, record.year) in details
+                for record in records
+            ):
+                stale.append(key)
+        if stale:
+            self._invalidate(*stale)
+
+    def get_all_users(self):
+        """Retrieve all users, cached until a user is added."""
+        return self._read_through(
+            ALL_USERS,
+            lambda: tuple(UserRecord(user.id, user.name) for user in self.backend.get_all_users()),
+        )
+
+    def get_user(self, user_id):
+        return self.backend.get_user(user_id)
+
+    def get_users_with_stats(self):
+        return self.backend.get_users_with_stats()
+
+    def get_user_stats(self, user_id):
+        return self.backend.get_user_stats(user_id)
+
+    def get_recommendations(self, user_id, limit=20):
+        return self.backend.get_recommendations(user_id, limit)
+
+    def _read_page(self, key, load, to_record=None):
+        def load_page():
+            page = load()
+            items = tuple(map(to_record, page.items) if to_record else page.items)
+            return Page(items, page.next_cursor, page.prev_cursor)
+
+        return self._read_through(key, load_page)
+
+    def get_users_page(self, limit, cursor=None, sort="name"):
+        """Retrieve one page of users, cached until any library changes."""
+        (version,) = self.backend.get_data_versions(USERS_SCOPE)
+        return self._read_page(
+            _page_key("users_page", version, limit, cursor, sort),
+            lambda: self.backend.get_users_page(limit, cursor, sort),
+        )
+
+    def get_user_movies(self, user_id, filters=None, sort="added"):
+        """Retrieve a user's movies, cached until their library changes.
+
+        Only the full library in its default order is cached; filtered or
+        re-sorted listings go to the backend.
+        """
+        if filters or sort != "added":
+            return self.backend.get_user_movies(user_id, filters, sort)
+        return self._read_through(
+            _user_movies_key(user_id),
+            lambda: tuple(_movie_record(row) for row in self.backend.get_user_movies(user_id)),
+        )
+
+    def get_user_movies_page(self, user_id, limit, cursor=None, sort="added", filters=None):
+        """Retrieve one page of a user's movies, cached until their library changes."""
+        (version,) = self.backend.get_data_versions(user_scope(user_id))
+        return self._read_page(
+            _page_key(
+                "user_movies_page", version, user_id, limit, cursor, sort,
+                tuple(sorted((filters or {}).items())),
+            ),
+            lambda: self.backend.get_user_movies_page(user_id, limit, cursor, sort, filters),
+            _movie_record,
+        )
+
+    def get_movie(self, movie_id):
+        """Retrieve a single library entry, cached until it is changed."""
+
+        def load():
+            row = self.backend.get_movie(movie_id)
+            return _movie_record(row) if row is not None else None
+
+        return self._read_through(_movie_key(movie_id), load)
+
+    def get_data_versions(self, *scopes):
+        return self.backend.get_data_versions(*scopes)
+
+    def add_user(self, user):
+        """Add a user and drop the cached user list."""
+        try:
+            return self.backend.add_user(user)
+        finally:
+            self._invalidate(ALL_USERS)
+
+    def add_movie(self, user_id, name, director, year, rating, imdb_id=None):
+        """Add a movie and drop the user's cached library."""
+        try:
+            return self.backend.add_movie(user_id, name, director, year, rating, imdb_id)
+        finally:
+            self._invalidate(_user_movies_key(user_id))
+            self._invalidate_adopted(
+                [{"name": name, "director": director, "year": _to_year(year), "imdb_id": imdb_id}]
+            )
+
+    def add_movies(self, user_id, movies):
+        """Add many movies and drop the user's cached library."""
+        try:
+            return self.backend.add_movies(user_id, movies)
+        finally:
+            self._invalidate(_user_movies_key(user_id))
+            self._invalidate_adopted(movies)
+
+    def update_movie(self, movie_id, name=None, director=None, year=None, rating=None):
+        """Update a movie and drop its cached entry and library."""
+        before = self.get_movie(movie_id)
+        try:
+            return self.backend.update_movie(movie_id, name, director, year, rating)
+        finally:
+            keys = [_movie_key(movie_id)]
+            if before is not None:
+                keys.append(_user_movies_key(before.user_id))
+            self._invalidate(*keys)
+
+    def delete_movie(self, movie_id):
+        """Delete a movie and drop its cached entry and library."""
+        before = self.get_movie(movie_id)
+        try:
+            return self.backend.delete_movie(movie_id)
+        finally:
+            keys = [_movie_key(movie_id)]
+            if before is not None:
+                keys.append(_user_movies_key(before.user_id))
+            self._invalidate(*keys)
+
+    def update_movies(self, user_id, updates):
+        return self.apply_movie_changes(user_id, updates=updates)[1]
+
+    def delete_movies(self, user_id, movie_ids):
+        return self.apply_movie_changes(user_id, deletes=movie_ids)[2]
+
+    def apply_movie_changes(self, user_id, adds=(), updates=(), deletes=()):
+        """Apply a batch of changes and drop the user's library and changed entries."""
+        try:
+            return self.backend.apply_movie_changes(user_id, adds, updates, deletes)
+        finally:
+            self._invalidate(
+                _user_movies_key(user_id),
+                *(_movie_key(u["id"]) for u in updates),
+                *(_movie_key(movie_id) for movie_id in deletes),
+            )
+            self._invalidate_adopted(adds)
+
+    def clear(self):
+        """Drop every cached record."""
+        with self._lock:
+            self._generation += 1
+            self.cache.clear()
+        logging.info("Data manager cache cleared.")
+
+    def stats(self):
+        """Return hit ratio and approximate memory use of the cache."""
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            "entries": len(self.cache),
+            "max_size": self.cache.max_size,
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "hit_ratio": self.cache.hits / lookups if lookups else 0.0,
+            "evictions": self.cache.evictions,
+            "memory_bytes": sum(_size_of(value) for _, value in self.cache.items()),
+        }
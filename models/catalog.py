@@ -0,0 +1,309 @@
+# models/catalog.py
+"""Offline title catalog: streaming ingestion of dataset dumps and lookups.
+
+Dumps can be IMDb-style TSV files (``title.basics.tsv.gz``,
+``title.ratings.tsv.gz``) or OMDb-style CSV exports. Rows are upserted by
+imdbID and only non-empty columns overwrite stored values, so several dumps
+can be layered onto the same catalog. Rows without a title (e.g. ratings)
+only update titles already in the catalog. IMDb lists directors as person
+IDs, so their names come from ``title.crew`` plus ``name.basics`` via
+ingest_directors().
+"""
+
+import csv
+import gzip
+import io
+import logging
+import re
+import sys
+import time
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db
+from models.db_models import CatalogTitle
+from models.title_index import normalize_title
+
+# Dump column names accepted for each catalog column
+FIELD_ALIASES = {
+    "imdb_id": ("tconst", "imdbID", "imdb_id"),
+    "title": ("primaryTitle", "Title", "title"),
+    "year": ("startYear", "Year", "year"),
+    # Not IMDb's title.crew "directors": it holds person IDs (nm...), not names
+    "director": ("Director", "director"),
+    "rating": ("averageRating", "imdbRating", "rating"),
+    "votes": ("numVotes", "imdbVotes", "votes"),
+    "genre": ("genres", "Genre", "genre"),
+    "runtime": ("runtimeMinutes", "Runtime", "runtime"),
+    "plot": ("Plot", "plot"),
+}
+COLUMNS = list(FIELD_ALIASES) + ["title_key"]
+# IMDb dumps also list episodes, shorts and games; only these are ingested
+TITLE_TYPES = {"movie"}
+NULL_VALUES = {"", "\\N", "N/A"}
+
+# Allow very long plot fields
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def _open_text(path):
+    """Open a (possibly gzipped) dump for streaming text reads."""
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _to_int(value):
+    match = re.match(r"\d+", value.replace(",", ""))
+    return int(match.group()) if match else None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _convert(column, value):
+    """Convert one raw dump value for a catalog column."""
+    if value is None or value in NULL_VALUES:
+        return None
+    if column in ("year", "votes"):
+        return _to_int(value)
+    if column == "rating":
+        return _to_float(value)
+    if column == "runtime" and value.isdigit():
+        return f"{value} min"
+    return value
+
+
+def iter_rows(path, delimiter=None):
+    """Yield catalog row dicts from a dump one line at a time.
+
+    Dumps with a titleType column yield only rows of TITLE_TYPES.
+    """
+    with _open_text(path) as handle:
+        header = handle.readline()
+        if delimiter is None:
+            delimiter = "\t" if "\t" in header else ","
+        names = next(csv.reader([header], delimiter=delimiter))
+        positions = {}
+        for column, aliases in FIELD_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    positions[column] = names.index(alias)
+                    break
+        if "imdb_id" not in positions:
+            raise ValueError(f"{path} has no imdbID/tconst column")
+        type_position = names.index("titleType") if "titleType" in names else None
+
+        # IMDb TSV files do not use quoting
+        quoting = csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL
+        for fields in csv.reader(handle, delimiter=delimiter, quoting=quoting):
+            if type_position is not None and (
+                type_position >= len(fields) or fields[type_position] not in TITLE_TYPES
+            ):
+                continue
+            row = dict.fromkeys(COLUMNS)
+            for column, position in positions.items():
+                if position < len(fields):
+                    row[column] = _convert(column, fields[position])
+            if row["imdb_id"] is None:
+                continue
+            if row["title"] is not None:
+                row["title_key"] = normalize_title(row["title"])
+            yield row
+
+
+def _upsert_statement():
+    """Build an upsert that keeps existing values where the dump has none."""
+    table = CatalogTitle.__table__
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.imdb_id],
+        set_={
+            column: func.coalesce(statement.excluded[column], table.c[column])
+            for column in COLUMNS
+            if column != "imdb_id"
+        },
+    )
+
+
+def _update_statement():
+    """Build an update of an existing title that keeps values the row lacks."""
+    table = CatalogTitle.__table__
+    return (
+        update(table)
+        .where(table.c.imdb_id == bindparam("match_imdb_id"))
+        .values({
+            column: func.coalesce(bindparam(f"new_{column}"), table.c[column])
+            for column in COLUMNS
+            if column != "imdb_id"
+        })
+    )
+
+
+def _write(rows, chunk_size, progress):
+    """Write rows in chunked transactions; return (rows, seconds).
+
+    Titled rows are upserted. Rows without a title only update titles
+    already in the catalog, so they never create nameless entries.
+    """
+    upsert, update_existing = _upsert_statement(), _update_statement()
+    started = time.perf_counter()
+    total = 0
+    chunk = []
+
+    def flush():
+        inserts = [row for row in chunk if row["title"] is not None]
+        updates = [
+            {"match_imdb_id": row["imdb_id"], **{f"new_{column}": row[column] for column in COLUMNS}}
+            for row in chunk
+            if row["title"] is None
+        ]
+        if inserts:
+            db.session.execute(upsert, inserts)
+        if updates:
+            db.session.execute(update_existing, updates)
+        db.session.commit()
+        chunk.clear()
+        if progress is not None:
+            progress(total, time.perf_counter() - started)
+
+    for row in rows:
+        chunk.append(row)
+        total += 1
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return total, time.perf_counter() - started
+
+
+def _stats(total, seconds):
+    return {
+        "rows": total,
+        "seconds": seconds,
+        "rows_per_second": total / seconds if seconds else 0.0,
+    }
+
+
+def ingest(path, chunk_size=10000, delimiter=None, progress=None):
+    """Stream a dump into the catalog using batched upserts.
+
+    Only one chunk of rows is held in memory at a time. progress, if given,
+    is called with (rows_so_far, elapsed_seconds) after each chunk.
+    Must be called inside an application context.
+    """
+    total, seconds = _write(iter_rows(path, delimiter), chunk_size, progress)
+    logging.info(f"Ingested {total} catalog rows from {path} in {seconds:.1f}s.")
+    return _stats(total, seconds)
+
+
+def _iter_tsv(path, names):
+    """Yield the named columns of each row of an IMDb TSV dump."""
+    with _open_text(path) as handle:
+        header = next(csv.reader([handle.readline()], delimiter="\t"))
+        missing = [name for name in names if name not in header]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)} column")
+        positions = [header.index(name) for name in names]
+        for fields in csv.reader(handle, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(fields) > max(positions):
+                yield [fields[position] for position in positions]
+
+
+def ingest_directors(crew_path, names_path, chunk_size=10000, progress=None):
+    """Fill in director names from IMDb's title.crew and name.basics dumps.
+
+    Only crew rows for titles already in the catalog are kept, and only
+    their directors' names are read from name.basics, so ingest the title
+    dumps first. Must be called inside an application context.
+    """
+    started = time.perf_counter()
+    directors = {}
+    pending = []
+
+    def keep_catalog_titles():
+        known = set(
+            db.session.scalars(
+                select(CatalogTitle.imdb_id).where(
+                    CatalogTitle.imdb_id.in_([imdb_id for imdb_id, _ in pending])
+                )
+            )
+        )
+        directors.update(item for item in pending if item[0] in known)
+        pending.clear()
+
+    for imdb_id, people in _iter_tsv(crew_path, ("tconst", "directors")):
+        if people not in NULL_VALUES:
+            pending.append((imdb_id, people.split(",")))
+            if len(pending) >= chunk_size:
+                keep_catalog_titles()
+    if pending:
+        keep_catalog_titles()
+
+    wanted = {person for people in directors.values() for person in people}
+    names = {
+        person: name
+        for person, name in _iter_tsv(names_path, ("nconst", "primaryName"))
+        if person in wanted and name not in NULL_VALUES
+    }
+
+    def rows():
+        for imdb_id, people in directors.items():
+            found = [names[person] for person in people if person in names]
+            if found:
+                yield dict(dict.fromkeys(COLUMNS), imdb_id=imdb_id, director=", ".join(found))
+
+    total, _ = _write(rows(), chunk_size, progress)
+    seconds = time.perf_counter() - started
+    logging.info(f"Ingested directors for {total} catalog titles in {seconds:.1f}s.")
+    return _stats(total, seconds)
+
+
+def to_omdb_payload(title):
+    """Render a CatalogTitle in the shape of an OMDb detail response."""
+
+    def text(value):
+        return "N/A" if value is None else str(value)
+
+    return {
+        "Title": text(title.title),
+        "Year": text(title.year),
+        "imdbID": title.imdb_id,
+        "Director": text(title.director),
+        "imdbRating": text(title.rating),
+        "imdbVotes": text(title.votes),
+        "Genre": text(title.genre),
+        "Runtime": text(title.runtime),
+        "Plot": text(title.plot),
+        "Response": "True",
+    }
+
+
+def is_complete(payload):
+    """Return True if a payload has the fields the add-movie form needs."""
+    return payload["Director"] != "N/A" and payload["imdbRating"] != "N/A"
+
+
+def find_by_imdb_id(imdb_id):
+    """Look up a catalog title by imdbID (primary key)."""
+    title = db.session.get(CatalogTitle, imdb_id)
+    return to_omdb_payload(title) if title is not None else None
+
+
+def find_by_title(title):
+    """Look up the most-voted catalog title with this exact (normalized) title."""
+    key = normalize_title(title)
+    if not key:
+        return None
+    match = db.session.scalars(
+        select(CatalogTitle)
+        .where(CatalogTitle.title_key == key)
+        .order_by(CatalogTitle.votes.desc())
+        .limit(1)
+    ).first()
+    return to_omdb_payload(match) if match is not None else None
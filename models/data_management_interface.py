@@ -9,15 +9,62 @@ class DataManagerInterface(ABC):
         pass
 
     @abstractmethod
-    def get_user_movies(self, user_id):
-        """Retrieve all movies for a given user."""
+    def get_user(self, user_id):
+        """Retrieve a single user."""
         pass
 
     @abstractmethod
-    def add_movie(self, user_id, name, director, year, rating):
+    def get_users_with_stats(self):
+        """Retrieve all users with their movie count and average rating."""
+        pass
+
+    @abstractmethod
+    def get_user_stats(self, user_id):
+        """Retrieve a user's library statistics (counts, ratings, decades, directors)."""
+        pass
+
+    @abstractmethod
+    def get_recommendations(self, user_id, limit=20):
+        """Retrieve films the user has not saved, ranked by similarity to their library."""
+        pass
+
+    @abstractmethod
+    def get_users_page(self, limit, cursor=None, sort="name"):
+        """Retrieve one page of users, continuing after a cursor."""
+        pass
+
+    @abstractmethod
+    def get_user_movies(self, user_id, filters=None, sort="added"):
+        """Retrieve all movies for a given user, optionally filtered and sorted."""
+        pass
+
+    @abstractmethod
+    def get_user_movies_page(self, user_id, limit, cursor=None, sort="added", filters=None):
+        """Retrieve one page of a user's movies, continuing after a cursor.
+
+        sort is one of "added", "name", "director", "year" or "rating",
+        optionally prefixed with "-" for descending order. filters maps
+        "director", "year_min", "year_max", "min_rating" and "title" (a
+        substring) to values, which may be raw query-string strings; an
+        invalid sort or filter raises ValueError.
+        """
+        pass
+
+    @abstractmethod
+    def add_user(self, user):
+        """Add a new user."""
+        pass
+
+    @abstractmethod
+    def add_movie(self, user_id, name, director, year, rating, imdb_id=None):
         """Add a new movie to the user's movie list."""
         pass
 
+    @abstractmethod
+    def add_movies(self, user_id, movies):
+        """Add many movies (dicts of add_movie's arguments) in one batch."""
+        pass
+
     @abstractmethod
     def update_movie(self, movie_id, name=None, director=None, year=None, rating=None):
         """Update a movie's information."""
@@ -27,7 +74,31 @@ class DataManagerInterface(ABC):
     def delete_movie(self, movie_id):
         """Delete a movie from the user's list."""
         pass
+
+    @abstractmethod
+    def update_movies(self, user_id, updates):
+        """Update many of a user's movies; updates are dicts of id and changed fields."""
+        pass
+
+    @abstractmethod
+    def delete_movies(self, user_id, movie_ids):
+        """Delete many of a user's movies; return the IDs deleted."""
+        pass
+
+    @abstractmethod
+    def apply_movie_changes(self, user_id, adds=(), updates=(), deletes=()):
+        """Add, update and delete movies of one user in a single transaction.
+
+        Returns (IDs of the added movies in order, IDs updated, IDs
+        deleted). IDs not in the user's library are skipped.
+        """
+        pass
     
+    @abstractmethod
+    def get_data_versions(self, *scopes):
+        """Return a version per scope ("users", "user:<id>"), bumped on writes."""
+        pass
+
     @abstractmethod
     def get_movie(self, movie_id):
         """Retrieve a single movie."""
@@ -1,57 +1,328 @@
 # models/sqlite_data_manager.py
 
 import logging
+import time
+from datetime import datetime
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models.data_management_interface import DataManagerInterface
-from models.db_models import db, User, Movie
+from models.db_models import db, DataVersion, User, Movie, UserMovie, utcnow
+from models.migrations import migrate
+from models.pagination import keyset_paginate
+from models.sqlite_tuning import apply_pragmas, create_read_only_engine
+from models import recommendations, user_stats
+
+# Sort keys for paginated listings: (attribute, SQL expression, cursor parser)
+USER_SORTS = {
+    "name": ("name", User.name, None),
+}
+MOVIE_SORTS = {
+    "added": ("added_at", UserMovie.added_at, datetime.fromisoformat),
+    "name": ("name", Movie.name, None),
+    "director": ("director", func.coalesce(Movie.director, ""), None),
+    "year": ("year", func.coalesce(Movie.year, 0), None),
+    "rating": ("rating", func.coalesce(UserMovie.rating, -1.0), None),
+}
+NULL_SORT_VALUES = {"director": "", "year": 0, "rating": -1.0}
+
+# Library filters: name -> (parser for the raw value, SQL condition)
+MOVIE_FILTERS = {
+    # NOCASE matches the collation of ix_movies_director_year
+    "director": (str.strip, lambda value: Movie.director.collate("NOCASE") == value),
+    "year_min": (int, lambda value: Movie.year >= value),
+    "year_max": (int, lambda value: Movie.year <= value),
+    "min_rating": (float, lambda value: UserMovie.rating >= value),
+    "title": (str.strip, lambda value: Movie.name.contains(value, autoescape=True)),
+}
+
+# Columns of a library listing row; rows are plain tuples, not ORM objects
+MOVIE_ROW_COLUMNS = (
+    UserMovie.id.label("id"),
+    UserMovie.user_id.label("user_id"),
+    UserMovie.movie_id.label("movie_id"),
+    Movie.imdb_id.label("imdb_id"),
+    Movie.name.label("name"),
+    Movie.director.label("director"),
+    Movie.year.label("year"),
+    UserMovie.rating.label("rating"),
+    UserMovie.added_at.label("added_at"),
+    Movie.genre.label("genre"),
+    Movie.runtime.label("runtime"),
+    Movie.plot.label("plot"),
+    Movie.poster.label("poster"),
+)
+
+
+def _movie_rows():
+    """Select library rows joined to their catalog movie."""
+    return select(*MOVIE_ROW_COLUMNS).join(Movie, Movie.id == UserMovie.movie_id)
+
+
+
+def parse_filters(filters):
+    """Turn {"year_min": "1990", ...} into [(name, parsed value)]; raise ValueError if invalid.
+
+    Empty values are dropped, so blank form fields filter nothing.
+    """
+    parsed = []
+    for name, value in (filters or {}).items():
+        if name not in MOVIE_FILTERS:
+            raise ValueError(f"Unknown filter: {name!r}")
+        if value is None or value == "":
+            continue
+        parse, _ = MOVIE_FILTERS[name]
+        try:
+            value = parse(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for filter {name!r}: {value!r}") from e
+        if value != "":
+            parsed.append((name, value))
+    return parsed
+
+
+def _filter_conditions(filters):
+    """Turn filters into SQL conditions."""
+    return [MOVIE_FILTERS[name][1](value) for name, value in parse_filters(filters)]
+
+
+def _parse_sort(sort, sorts):
+    """Split a sort like "-rating" into its definition and direction."""
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in sorts:
+        raise ValueError(f"Unknown sort key: {sort!r}")
+    return name, sorts[name], descending
+
+
+USERS_SCOPE = "users"
+
+
+def user_scope(user_id):
+    """Version scope covering one user's library."""
+    return f"user:{user_id}"
+
+
+def bump_versions(*scopes):
+    """Increment scope versions inside the current transaction.
+
+    New scopes start from a clock value rather than 1, so a recreated
+    database never repeats versions that caches may still hold.
+    """
+    first = time.time_ns() // 1000
+    statement = sqlite_insert(DataVersion).values(
+        [{"scope": scope, "version": first} for scope in scopes]
+    )
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={"version": DataVersion.version + 1},
+        )
+    )
+
+
+def _catalog_key(movie):
+    """Identify a film by imdbID when known, otherwise by its details."""
+    if movie["imdb_id"]:
+        return ("i", movie["imdb_id"])
+    return ("d", movie["name"], movie["director"], movie["year"])
 
 
 class SQLiteDataManager(DataManagerInterface):
     """Concrete class implementing the DataManagerInterface for SQLite."""
 
-    def __init__(self, app):
-        """Initialize the SQLite database connection."""
+    def __init__(self, app, title_index=None, jobs=None):
+        """Initialize the SQLite database connection.
+
+        jobs, if given, is a JobQueue that new films are queued on for
+        enrichment in the same transaction that adds them.
+        """
+        self.title_index = title_index
+        self.jobs = jobs
+        self.read_engine = None
+        self.recommend_seeds = app.config.get("RECOMMEND_SEEDS", 200)
         with app.app_context():
+            pragmas = app.config.get("SQLITE_PRAGMAS")
+            apply_pragmas(db.engine, pragmas)
+            if app.config.get("SQLALCHEMY_READ_ONLY_ENGINE"):
+                self.read_engine = create_read_only_engine(
+                    app.config["SQLALCHEMY_DATABASE_URI"],
+                    pragmas,
+                    **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+                )
+            migrate(db.engine)
             db.create_all()
+            if title_index is not None:
+                self._load_title_index()
+
+    def _load_title_index(self):
+        """Seed the title index with every title saved in a library."""
+        rows = db.session.execute(
+            select(Movie.name, Movie.year, Movie.imdb_id, func.count(UserMovie.id))
+            .join(UserMovie, UserMovie.movie_id == Movie.id)
+            .group_by(Movie.id)
+        )
+        self.title_index.load(rows)
+        logging.info(f"Title index loaded with {len(self.title_index)} titles.")
+
+    def _rows(self, statement):
+        """Run a read query, on the read-only engine when serving a GET."""
+        if (
+            self.read_engine is not None
+            and has_request_context()
+            and request.method in ("GET", "HEAD")
+        ):
+            with self.read_engine.connect() as connection:
+                return connection.execute(statement).all()
+        return db.session.execute(statement).all()
 
     def get_all_users(self):
         """Retrieve all users from the SQLite database."""
-        return User.query.all()
+        return self._rows(select(User.id, User.name).order_by(User.id))
+
+    def get_user(self, user_id):
+        """Retrieve a single user from the SQLite database."""
+        rows = self._rows(select(User.id, User.name).where(User.id == user_id))
+        return rows[0] if rows else None
+
+    def get_users_with_stats(self):
+        """Retrieve every user with their movie count and average rating."""
+        return self._rows(
+            select(
+                User.id,
+                User.name,
+                func.count(UserMovie.id).label("movie_count"),
+                func.avg(UserMovie.rating).label("average_rating"),
+            )
+            .outerjoin(UserMovie, UserMovie.user_id == User.id)
+            .group_by(User.id)
+            .order_by(User.name, User.id)
+        )
+
+    def get_user_stats(self, user_id):
+        """Read a user's statistics from the incrementally maintained user_stats table."""
+        return user_stats.get_stats(user_id)
+
+    def get_recommendations(self, user_id, limit=20):
+        """Rank unsaved films by their precomputed similarity to the user's recent saves."""
+        return self._rows(recommendations.recommendations_query(user_id, limit, self.recommend_seeds))
+
+    def get_users_page(self, limit, cursor=None, sort="name"):
+        """Retrieve one keyset-paginated page of users with their movie stats."""
+        name, (attribute, expression, parse), descending = _parse_sort(sort, USER_SORTS)
+        # Correlated subqueries are evaluated only for the users on the page,
+        # whereas a GROUP BY would aggregate every user before the LIMIT
+        in_library = UserMovie.user_id == User.id
+        return keyset_paginate(
+            self._rows,
+            select(
+                User.id,
+                User.name,
+                select(func.count(UserMovie.id)).where(in_library).scalar_subquery().label("movie_count"),
+                select(func.avg(UserMovie.rating)).where(in_library).scalar_subquery().label("average_rating"),
+            ),
+            expression,
+            User.id,
+            lambda user: (getattr(user, attribute), user.id),
+            limit,
+            cursor,
+            descending,
+            parse,
+        )
+
+    def get_user_movies_page(self, user_id, limit, cursor=None, sort="added", filters=None):
+        """Retrieve one keyset-paginated page of a user's movies."""
+        name, (attribute, expression, parse), descending = _parse_sort(sort, MOVIE_SORTS)
+
+        def key(movie):
+            value = getattr(movie, attribute)
+            return (NULL_SORT_VALUES.get(name) if value is None else value), movie.id
 
-    def get_user_movies(self, user_id):
+        return keyset_paginate(
+            self._rows,
+            _movie_rows().where(UserMovie.user_id == user_id, *_filter_conditions(filters)),
+            expression,
+            UserMovie.id,
+            key,
+            limit,
+            cursor,
+            descending,
+            parse,
+        )
+
+    def get_user_movies(self, user_id, filters=None, sort="added"):
         """Retrieve all movies for a given user from the SQLite database."""
+        _, (_, expression, _), descending = _parse_sort(sort, MOVIE_SORTS)
+        conditions = _filter_conditions(filters)
         try:
-            # Fetch the user by user_id using SQLAlchemy's session.get
-            user = db.session.get(User, user_id)
+            logging.info(f"Fetching movies for user with ID {user_id}.")
 
-            if user:
-                logging.info(f"Fetching movies for user with ID {user_id}.")
+            # One column-only query; unknown users simply have no rows
+            order = (expression.desc(), UserMovie.id.desc()) if descending else (expression, UserMovie.id)
+            movies = self._rows(
+                _movie_rows()
+                .where(UserMovie.user_id == user_id, *conditions)
+                .order_by(*order)
+            )
 
-                # Check if the user has any movies
-                if user.movies:
-                    logging.info(
-                        f"Found user: {user.name} with {len(user.movies)} movies."
-                    )
-                    return user.movies
-                else:
-                    logging.info(f"User {user.name} has no movies.")
-                    return []  # Return an empty list if there are no movies
+            # Check if the user has any movies
+            if movies:
+                logging.info(f"Found {len(movies)} movies for user ID {user_id}.")
+                return movies
             else:
-                logging.warning(f"User with ID {user_id} not found.")
-                return []  # Return an empty list if the user is not found
+                logging.info(f"User ID {user_id} has no movies.")
+                return []  # Return an empty list if there are no movies
 
         except Exception as e:
             logging.error(f"Error fetching movies for user ID {user_id}: {e}")
             return []
 
+    def _resolve_movie(self, name, director, year, imdb_id=None):
+        """Return the catalog movie for these details, creating it if needed."""
+        if imdb_id:
+            movie = db.session.scalars(
+                select(Movie).where(Movie.imdb_id == imdb_id)
+            ).first()
+            if movie:
+                return movie
+
+        movie = db.session.scalars(
+            select(Movie)
+            .where(Movie.name == name, Movie.year == year, Movie.director == director)
+            .order_by(Movie.imdb_id.is_(None))
+            .limit(1)
+        ).first()
+        if movie and imdb_id:
+            if movie.imdb_id is None:
+                movie.imdb_id = imdb_id  # Hand-entered film now matched to OMDb
+            elif movie.imdb_id != imdb_id:
+                movie = None  # A different film that shares name, director and year
+        if movie is None:
+            movie = Movie(name=name, director=director, year=year, imdb_id=imdb_id or None)
+            db.session.add(movie)
+        return movie
+
+    def get_data_versions(self, *scopes):
+        """Return the current version of each scope (0 if never written)."""
+        stored = dict(
+            self._rows(
+                select(DataVersion.scope, DataVersion.version).where(
+                    DataVersion.scope.in_(scopes)
+                )
+            )
+        )
+        return tuple(stored.get(scope, 0) for scope in scopes)
+
     def add_user(self, user):
         """Add a new user to the SQLite database."""
         db.session.add(user)
+        bump_versions(USERS_SCOPE)
         db.session.commit()
         return user
 
 
-    def add_movie(self, user_id, name, director, year, rating):
+    def add_movie(self, user_id, name, director, year, rating, imdb_id=None):
         """Add a new movie to the user's movie list in the SQLite database."""
         try:
         # Fetch the user to ensure they exist
@@ -69,14 +340,19 @@ class SQLiteDataManager(DataManagerInterface):
                 logging.error("Invalid year or rating format.")
                 return None
 
-        # Create a new movie object and associate it with the user
-            new_movie = Movie(
-            name=name, director=director, year=year, rating=rating, user_id=user.id
-        )
+        # Link the shared catalog movie to the user's library
+            movie = self._resolve_movie(name, director, year, imdb_id)
+            new_movie = UserMovie(user_id=user.id, movie=movie, rating=rating)
 
-        # Add the new movie to the session and commit it to the database
+        # Add the new entry to the session and commit it to the database
             db.session.add(new_movie)
+            user_stats.record_changes(user.id, added=[(movie.director, movie.year, rating)])
+            if self.jobs is not None and movie.imdb_id and movie.enriched_at is None:
+                self.jobs.enqueue([movie.imdb_id])
+            bump_versions(USERS_SCOPE, user_scope(user_id))
             db.session.commit()
+            if self.title_index is not None:
+                self.title_index.add(name, year, movie.imdb_id)
 
             logging.info(f"Movie '{name}' added successfully for user ID {user_id}.")
             return new_movie
@@ -86,31 +362,274 @@ class SQLiteDataManager(DataManagerInterface):
             db.session.rollback()  # Rollback the session in case of an error
             return None
 
+    def _resolve_movie_ids(self, movies):
+        """Map each movie's catalog key to a movies.id, inserting missing films.
+
+        Set-based version of _resolve_movie for bulk imports: a fixed number
+        of queries per batch, whatever its size.
+        """
+        ids = {}
+        imdb_ids = {m["imdb_id"] for m in movies if m["imdb_id"]}
+        if imdb_ids:
+            for movie_id, imdb_id in db.session.execute(
+                select(Movie.id, Movie.imdb_id).where(Movie.imdb_id.in_(imdb_ids))
+            ):
+                ids[("i", imdb_id)] = movie_id
+
+        # Films matching on details, preferring rows that have an imdbID
+        by_details = {}
+        for movie_id, imdb_id, name, director, year in db.session.execute(
+            select(Movie.id, Movie.imdb_id, Movie.name, Movie.director, Movie.year)
+            .where(Movie.name.in_({m["name"] for m in movies}))
+            .order_by(Movie.imdb_id.is_(None))
+        ):
+            by_details.setdefault((name, director, year), (movie_id, imdb_id))
+
+        missing, adopted = {}, []
+        for m in movies:
+            key = _catalog_key(m)
+            details = (m["name"], m["director"], m["year"])
+            if key in ids or key in missing:
+                continue
+            match = by_details.get(details)
+            if m["imdb_id"] and match and match[1] is None:
+                # Hand-entered film now matched to OMDb
+                adopted.append({"id": match[0], "imdb_id": m["imdb_id"]})
+                by_details[details] = (match[0], m["imdb_id"])
+                ids[key] = match[0]
+            elif not m["imdb_id"] and match:
+                ids[key] = match[0]
+            else:
+                missing[key] = {
+                    "imdb_id": m["imdb_id"] or None,
+                    "name": m["name"],
+                    "director": m["director"],
+                    "year": m["year"],
+                }
+
+        if adopted:
+            db.session.execute(update(Movie), adopted)
+        if missing:
+            new_ids = db.session.scalars(
+                insert(Movie).returning(Movie.id, sort_by_parameter_order=True),
+                list(missing.values()),
+            ).all()
+            ids.update(zip(missing, new_ids))
+        return ids
+
+    def add_movies(self, user_id, movies):
+        """Add many validated movies to a user's library in one transaction.
+
+        movies is a list of dicts with name, director, year, rating and
+        imdb_id keys. Returns the number of movies added.
+        """
+        if not movies:
+            return 0
+        return len(self.apply_movie_changes(user_id, adds=movies)[0])
+
+    def _insert_movies(self, user_id, movies):
+        """Insert library entries for validated movies; return their new IDs (no commit)."""
+        ids = self._resolve_movie_ids(movies)
+        added_at = utcnow()
+        # One multi-row INSERT; SQLite hands out rowids in VALUES order, so
+        # the sorted IDs line up with movies (sort_by_parameter_order would
+        # fall back to a statement per row)
+        new_ids = db.session.scalars(
+            insert(UserMovie).returning(UserMovie.id),
+            [
+                {
+                    "user_id": user_id,
+                    "movie_id": ids[_catalog_key(m)],
+                    "rating": m["rating"],
+                    "added_at": added_at,
+                }
+                for m in movies
+            ],
+        ).all()
+        if self.jobs is not None:
+            self.jobs.enqueue({m["imdb_id"] for m in movies if m["imdb_id"]})
+        return sorted(new_ids)
+
+    def _update_movies(self, user_id, updates):
+        """Apply field changes with one UPDATE per column (no commit).
+
+        Returns the IDs updated, the (old, new) (name, year) of entries
+        that now point at another film, and the (director, year, rating) of
+        the entries before and after.
+        """
+        by_id = {u["id"]: u for u in updates}
+        # One query for the current state of every entry in the batch
+        current = db.session.execute(
+            select(UserMovie.id, Movie.name, Movie.director, Movie.year, UserMovie.rating)
+            .join(Movie, Movie.id == UserMovie.movie_id)
+            .where(UserMovie.user_id == user_id, UserMovie.id.in_(by_id))
+        ).all()
+
+        targets, ratings, retitled, before, after = {}, {}, [], [], []
+        for movie_id, name, director, year, rating in current:
+            u = by_id[movie_id]
+            details = {
+                "name": u.get("name") or name,
+                "director": u.get("director") or director,
+                "year": int(u["year"]) if u.get("year") else year,
+                "imdb_id": None,
+            }
+            if (details["name"], details["director"], details["year"]) != (name, director, year):
+                # Catalog rows are shared, so a changed film means a new movie_id
+                targets[movie_id] = details
+                retitled.append(((name, year), (details["name"], details["year"])))
+            if u.get("rating") is not None:
+                ratings[movie_id] = float(u["rating"])
+            before.append((director, year, rating))
+            after.append((details["director"], details["year"], ratings.get(movie_id, rating)))
+
+        if targets:
+            catalog_ids = self._resolve_movie_ids(list(targets.values()))
+            db.session.execute(
+                update(UserMovie)
+                .where(UserMovie.user_id == user_id, UserMovie.id.in_(targets))
+                .values(
+                    movie_id=case(
+                        {
+                            movie_id: catalog_ids[_catalog_key(details)]
+                            for movie_id, details in targets.items()
+                        },
+                        value=UserMovie.id,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if ratings:
+            db.session.execute(
+                update(UserMovie)
+                .where(UserMovie.user_id == user_id, UserMovie.id.in_(ratings))
+                .values(rating=case(ratings, value=UserMovie.id))
+                .execution_options(synchronize_session=False)
+            )
+        return sorted(movie_id for movie_id, *_ in current), retitled, before, after
+
+    def _delete_movies(self, user_id, movie_ids):
+        """Delete entries with one DELETE (no commit).
+
+        Returns the IDs deleted, and the (name, year) and the (director,
+        year, rating) of each removed entry.
+        """
+        deleted = db.session.execute(
+            delete(UserMovie)
+            .where(UserMovie.user_id == user_id, UserMovie.id.in_(set(movie_ids)))
+            .returning(UserMovie.id, UserMovie.movie_id, UserMovie.rating)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not deleted:
+            return [], [], []
+        films = {
+            movie_id: (name, director, year)
+            for movie_id, name, director, year in db.session.execute(
+                select(Movie.id, Movie.name, Movie.director, Movie.year).where(
+                    Movie.id.in_({movie_id for _, movie_id, _ in deleted})
+                )
+            )
+        }
+        return (
+            sorted(entry_id for entry_id, _, _ in deleted),
+            [(films[movie_id][0], films[movie_id][2]) for _, movie_id, _ in deleted],
+            [(films[movie_id][1], films[movie_id][2], rating) for _, movie_id, rating in deleted],
+        )
+
+    def apply_movie_changes(self, user_id, adds=(), updates=(), deletes=()):
+        """Add, update and delete movies of one user in a single transaction.
+
+        adds are dicts like add_movies takes; updates are dicts with an id
+        and any of name, director, year and rating. Every kind of change is
+        one set-based statement (two for re-pointed films), and the library
+        statistics get one upsert, whatever the batch size. Returns (new IDs in order, IDs updated, IDs deleted);
+        IDs outside the user's library are skipped.
+        """
+        try:
+            added = self._insert_movies(user_id, adds) if adds else []
+            updated, retitled, before, after = (
+                self._update_movies(user_id, updates) if updates else ([], [], [], [])
+            )
+            deleted, removed, gone = self._delete_movies(user_id, deletes) if deletes else ([], [], [])
+            if added or updated or deleted:
+                user_stats.record_changes(
+                    user_id,
+                    added=[(m["director"], m["year"], m["rating"]) for m in adds] + after,
+                    removed=before + gone,
+                )
+                bump_versions(USERS_SCOPE, user_scope(user_id))
+            db.session.commit()
+        except Exception as e:
+            logging.error(f"Error changing movies for user ID {user_id}: {e}")
+            db.session.rollback()
+            raise
+
+        if self.title_index is not None:
+            for m in adds:
+                self.title_index.add(m["name"], m["year"], m["imdb_id"] or None)
+            for (old_name, old_year), (name, year) in retitled:
+                self.title_index.remove(old_name, old_year)
+                self.title_index.add(name, year)
+            for name, year in removed:
+                self.title_index.remove(name, year)
+        logging.info(
+            f"Movies for user ID {user_id}: {len(added)} added, {len(updated)} updated, "
+            f"{len(deleted)} deleted."
+        )
+        return added, updated, deleted
+
+    def update_movies(self, user_id, updates):
+        """Update many of a user's movies in one transaction; return the IDs updated."""
+        return self.apply_movie_changes(user_id, updates=updates)[1]
+
+    def delete_movies(self, user_id, movie_ids):
+        """Delete many of a user's movies in one transaction; return the IDs deleted."""
+        return self.apply_movie_changes(user_id, deletes=movie_ids)[2]
+
     def update_movie(self, movie_id, name=None, director=None, year=None, rating=None):
         """Update a movie's information in the SQLite database."""
-        movie = Movie.query.get(movie_id)
+        movie = db.session.get(UserMovie, movie_id)
         if movie:
-            if name:
-                movie.name = name
-            if director:
-                movie.director = director
-            if year:
-                movie.year = year
+            old_name, old_year = movie.name, movie.year
+            before = (movie.director, movie.year, movie.rating)
+            details = (
+                name or movie.name,
+                director or movie.director,
+                int(year) if year else movie.year,
+            )
+            if details != (movie.name, movie.director, movie.year):
+                # The catalog row is shared, so point this entry at another film
+                movie.movie = self._resolve_movie(*details)
             if rating:
-                movie.rating = rating
+                movie.rating = float(rating)
+            user_stats.record_changes(
+                movie.user_id, added=[(movie.director, movie.year, movie.rating)], removed=[before]
+            )
+            bump_versions(USERS_SCOPE, user_scope(movie.user_id))
             db.session.commit()
+            if self.title_index is not None and (old_name, old_year) != (movie.name, movie.year):
+                self.title_index.remove(old_name, old_year)
+                self.title_index.add(movie.name, movie.year, movie.imdb_id)
             return movie
         return None
 
     def delete_movie(self, movie_id):
         """Delete a movie from the SQLite database."""
-        movie = Movie.query.get(movie_id)
+        movie = db.session.get(UserMovie, movie_id)
         if movie:
+            name, year = movie.name, movie.year
             db.session.delete(movie)
+            user_stats.record_changes(
+                movie.user_id, removed=[(movie.director, movie.year, movie.rating)]
+            )
+            bump_versions(USERS_SCOPE, user_scope(movie.user_id))
             db.session.commit()
+            if self.title_index is not None:
+                self.title_index.remove(name, year)
             return True
         return False
 
     def get_movie(self, movie_id):
-        """Retrieve a single movie from the SQLite database."""
-        return Movie.query.get(movie_id)
+        """Retrieve a single library entry from the SQLite database."""
+        rows = self._rows(_movie_rows().where(UserMovie.id == movie_id))
+        return rows[0] if rows else None
@@ -1,32 +1,201 @@
 # models.py
 
+from datetime import datetime, timezone
+
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from models import db 
 
 
+def utcnow():
+    """Naive UTC timestamp, as stored in SQLite DATETIME columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(db.Model):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), unique=True, nullable=False)
 
-    movies = db.relationship("Movie", backref="user", lazy=True)
+    # Library entries; the films themselves live in the shared movies catalog.
+    # Never lazy-loaded: listings use explicit column queries instead.
+    movies = db.relationship("UserMovie", backref="user", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User {self.name}>"
 
 
 class Movie(db.Model):
+    """A film in the shared catalog, stored once however many users save it."""
+
     __tablename__ = "movies"
+    __table_args__ = (
+        Index("ix_movies_name_year", "name", "year"),
+        Index("ix_movies_year", "year"),  # year-range filters
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    imdb_id = Column(String(16), unique=True)  # NULL for hand-entered movies
     name = Column(String(100), nullable=False)
-    director =Column(String(100))
+    director = Column(String(100))
     year = Column(Integer)
-    rating = Column(Float)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Filled in later by the enrichment worker (see models/enrichment.py)
+    genre = Column(String(255))
+    runtime = Column(String(32))
+    plot = Column(Text)
+    poster = Column(String(500))
+    enriched_at = Column(DateTime)
 
     def __repr__(self):
         return f"<Movie {self.name}>"
+
+
+# Director filters match case-insensitively, so the index uses the same collation
+Index("ix_movies_director_year", Movie.director.collate("NOCASE"), Movie.year)
+
+
+class UserMovie(db.Model):
+    """A movie in a user's library, with the user's own rating."""
+
+    __tablename__ = "user_movies"
+    __table_args__ = (
+        Index("ix_user_movies_user_id_added_at", "user_id", "added_at"),
+        Index("ix_user_movies_user_id_rating", "user_id", "rating"),
+        # Joins from a filtered set of films (e.g. one director) into one library
+        Index("ix_user_movies_movie_id_user_id", "movie_id", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
+    rating = Column(Float)
+    added_at = Column(DateTime, nullable=False, default=utcnow)
+
+    movie = db.relationship("Movie", lazy="joined")
+
+    # Catalog fields, so templates and forms can treat an entry like a movie
+    @property
+    def name(self):
+        return self.movie.name
+
+    @property
+    def director(self):
+        return self.movie.director
+
+    @property
+    def year(self):
+        return self.movie.year
+
+    @property
+    def imdb_id(self):
+        return self.movie.imdb_id
+
+    @property
+    def genre(self):
+        return self.movie.genre
+
+    @property
+    def runtime(self):
+        return self.movie.runtime
+
+    @property
+    def plot(self):
+        return self.movie.plot
+
+    @property
+    def poster(self):
+        return self.movie.poster
+
+    def __repr__(self):
+        return f"<UserMovie {self.user_id}:{self.movie_id}>"
+
+
+class CatalogTitle(db.Model):
+    """Reference title loaded from an offline IMDb/OMDb dataset dump."""
+
+    __tablename__ = "catalog_titles"
+    __table_args__ = (Index("ix_catalog_titles_title_key_votes", "title_key", "votes"),)
+
+    imdb_id = Column(String(16), primary_key=True)
+    title = Column(String(255))
+    title_key = Column(String(255))  # normalized title for exact lookups
+    year = Column(Integer)
+    director = Column(String(255))
+    rating = Column(Float)
+    votes = Column(Integer)
+    genre = Column(String(255))
+    runtime = Column(String(32))
+    plot = Column(Text)
+
+    def __repr__(self):
+        return f"<CatalogTitle {self.imdb_id}>"
+
+
+class DataVersion(db.Model):
+    """Counter bumped on every write to a scope, e.g. "users" or "user:42"."""
+
+    __tablename__ = "data_versions"
+
+    scope = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion {self.scope}={self.version}>"
+
+
+class UserStat(db.Model):
+    """Running counters of one user's library, kept in step by every write.
+
+    One row per (kind, key): kind "total" (key ""), "rating" (key "0"-"10"),
+    "decade" (e.g. "1970") or "director" (the director's name).
+    See models/user_stats.py.
+    """
+
+    __tablename__ = "user_stats"
+    __table_args__ = (Index("ix_user_stats_user_id_kind_movies", "user_id", "kind", "movies"),)
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    kind = Column(String(16), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    movies = Column(Integer, nullable=False, default=0)
+    rated = Column(Integer, nullable=False, default=0)  # movies with a rating
+    rating_sum = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<UserStat {self.user_id}:{self.kind}:{self.key}={self.movies}>"
+
+
+class MovieNeighbor(db.Model):
+    """A film often saved together with another: one of its top-K neighbours.
+
+    Rebuilt from the libraries in the background (models/recommendations.py).
+    """
+
+    __tablename__ = "movie_neighbors"
+
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    score = Column(Float, nullable=False)  # cosine similarity of the two films' audiences
+    common = Column(Integer, nullable=False)  # users who saved both
+
+    def __repr__(self):
+        return f"<MovieNeighbor {self.movie_id}->{self.neighbor_id}={self.score:.3f}>"
+
+
+class EnrichmentJob(db.Model):
+    """Pending OMDb detail fetch for a film, one row per imdbID."""
+
+    __tablename__ = "enrichment_jobs"
+    __table_args__ = (Index("ix_enrichment_jobs_status_run_after", "status", "run_after"),)
+
+    imdb_id = Column(String(16), primary_key=True)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False, default=utcnow)  # or lease expiry while running
+    last_error = Column(Text)
+    updated_at = Column(DateTime, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f"<EnrichmentJob {self.imdb_id} {self.status}>"
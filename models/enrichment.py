@@ -0,0 +1,136 @@
+# models/enrichment.py
+"""Fill in plot, genre, poster and runtime for queued films from OMDb."""
+
+import logging
+import time
+
+from sqlalchemy import bindparam, select, update
+
+from models import db
+from models.data_manager import bump_versions, user_scope
+from models.db_models import Movie, UserMovie, utcnow
+from omdb.client import OMDbRefused
+from omdb.ratelimit import BACKGROUND
+
+DETAIL_FIELDS = {"genre": "Genre", "runtime": "Runtime", "plot": "Plot", "poster": "Poster"}
+
+
+def details_from_payload(payload):
+    """Pick the enrichment fields out of an OMDb detail response."""
+    details = {}
+    for column, key in DETAIL_FIELDS.items():
+        value = payload.get(key)
+        details[column] = None if value in (None, "", "N/A") else value
+    return details
+
+
+def apply_details(details_by_imdb_id):
+    """Store fetched details and invalidate the affected libraries (no commit)."""
+    if not details_by_imdb_id:
+        return
+    now = utcnow()
+    movies = Movie.__table__  # core UPDATE, executed once per parameter set
+    db.session.execute(
+        update(movies)
+        .where(movies.c.imdb_id == bindparam("b_imdb_id"))
+        .values(
+            genre=bindparam("genre"),
+            runtime=bindparam("runtime"),
+            plot=bindparam("plot"),
+            poster=bindparam("poster"),
+            enriched_at=now,
+        ),
+        [dict(details, b_imdb_id=imdb_id) for imdb_id, details in details_by_imdb_id.items()],
+    )
+    user_ids = db.session.scalars(
+        select(UserMovie.user_id)
+        .join(Movie, Movie.id == UserMovie.movie_id)
+        .where(Movie.imdb_id.in_(details_by_imdb_id))
+        .distinct()
+    ).all()
+    if user_ids:
+        bump_versions(*(user_scope(user_id) for user_id in user_ids))
+
+
+def _can_fetch(client):
+    """Return True if a background call would be sent rather than refused locally."""
+    return client.available(BACKGROUND) and not client.breaker.is_open()
+
+
+def run_batch(queue, client, batch_size=20):
+    """Claim one batch of jobs, fetch their details and store them.
+
+    Results are written in one transaction. Jobs the quota or the circuit
+    breaker kept from being sent go back to the queue without using up an
+    attempt; only upstream failures count towards ENRICH_MAX_ATTEMPTS.
+    Returns the number of jobs sent upstream, which is 0 while the quota or
+    the breaker holds background work back.
+    """
+    if not _can_fetch(client):
+        return 0
+    jobs = queue.claim(batch_size)
+    if not jobs:
+        return 0
+
+    fetched, not_found, refused = {}, [], []
+    for imdb_id, attempts in jobs:
+        if refused or not _can_fetch(client):
+            refused.append(imdb_id)
+            continue
+        try:
+            payload = client.get_by_id(imdb_id, priority=BACKGROUND, raise_refused=True)
+        except OMDbRefused:
+            refused.append(imdb_id)  # turned away before reaching OMDb
+            continue
+        if payload is None:
+            queue.fail(imdb_id, attempts, "OMDb request failed")
+        elif payload.get("Response") != "True":
+            not_found.append(imdb_id)
+        else:
+            fetched[imdb_id] = details_from_payload(payload)
+
+    try:
+        apply_details(fetched)
+        queue.complete(list(fetched))
+        queue.complete(not_found, error="Not found on OMDb")
+        queue.release(refused)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error storing enrichment batch: {e}")
+        for imdb_id, attempts in jobs:
+            if imdb_id in refused:
+                queue.release([imdb_id])
+            else:
+                queue.fail(imdb_id, attempts, str(e))
+        db.session.commit()
+        return len(jobs) - len(refused)
+
+    logging.info(
+        f"Enriched {len(fetched)} films; {len(not_found)} not found, "
+        f"{len(jobs) - len(fetched) - len(not_found) - len(refused)} to retry, "
+        f"{len(refused)} held back by the quota or circuit breaker."
+    )
+    return len(jobs) - len(refused)
+
+
+def run_worker(queue, client, batch_size=20, poll_interval=2.0, stop=None, once=False):
+    """Process batches until stop (a threading.Event) is set.
+
+    Sleeps poll_interval seconds whenever the queue is empty. With once,
+    returns as soon as no due job is left.
+    """
+    processed = 0
+    while stop is None or not stop.is_set():
+        claimed = run_batch(queue, client, batch_size)
+        processed += claimed
+        db.session.remove()
+        if claimed:
+            continue
+        if once:
+            break
+        if stop is not None:
+            stop.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+    return processed
@@ -0,0 +1,164 @@
+# models/job_queue.py
+
+import logging
+import random
+from datetime import timedelta
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db
+from models.db_models import EnrichmentJob, Movie, utcnow
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """Persistent enrichment job queue stored in the enrichment_jobs table.
+
+    Jobs are keyed by imdbID, so queueing a film twice is a no-op. Workers
+    claim batches under a lease; a worker that dies mid-batch leaves jobs
+    that become claimable again once the lease expires.
+    """
+
+    def __init__(self, max_attempts=5, backoff=30.0, max_backoff=3600.0, lease=300.0):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a queue from a Flask config mapping."""
+        return cls(
+            max_attempts=config.get("ENRICH_MAX_ATTEMPTS", 5),
+            backoff=config.get("ENRICH_BACKOFF", 30.0),
+            max_backoff=config.get("ENRICH_MAX_BACKOFF", 3600.0),
+            lease=config.get("ENRICH_LEASE", 300.0),
+        )
+
+    def enqueue(self, imdb_ids, force=False):
+        """Queue films for enrichment in the current transaction (no commit).
+
+        Films that already have a job are left alone unless force is set,
+        which puts finished or failed jobs back in the queue.
+        """
+        imdb_ids = sorted(set(imdb_ids))
+        if not imdb_ids:
+            return
+        now = utcnow()
+        statement = insert(EnrichmentJob).values(
+            [
+                {"imdb_id": imdb_id, "status": PENDING, "attempts": 0, "run_after": now, "updated_at": now}
+                for imdb_id in imdb_ids
+            ]
+        )
+        if force:
+            statement = statement.on_conflict_do_update(
+                index_elements=[EnrichmentJob.imdb_id],
+                set_={"status": PENDING, "attempts": 0, "run_after": now, "updated_at": now},
+                where=EnrichmentJob.status != RUNNING,
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[EnrichmentJob.imdb_id])
+        db.session.execute(statement)
+
+    def claim(self, limit):
+        """Lease up to limit due jobs; return their (imdb_id, attempts) rows."""
+        now = utcnow()
+        due = (
+            select(EnrichmentJob.imdb_id)
+            .where(
+                EnrichmentJob.status.in_((PENDING, RUNNING)),  # running = expired lease
+                EnrichmentJob.run_after <= now,
+            )
+            .order_by(EnrichmentJob.run_after)
+            .limit(limit)
+        )
+        rows = db.session.execute(
+            update(EnrichmentJob)
+            .where(EnrichmentJob.imdb_id.in_(due.scalar_subquery()))
+            .values(
+                status=RUNNING,
+                attempts=EnrichmentJob.attempts + 1,
+                run_after=now + timedelta(seconds=self.lease),
+                updated_at=now,
+            )
+            .returning(EnrichmentJob.imdb_id, EnrichmentJob.attempts)
+        ).all()
+        db.session.commit()
+        return rows
+
+    def complete(self, imdb_ids, error=None):
+        """Mark jobs as done in the current transaction (no commit)."""
+        if imdb_ids:
+            db.session.execute(
+                update(EnrichmentJob)
+                .where(EnrichmentJob.imdb_id.in_(imdb_ids))
+                .values(status=DONE, last_error=error, updated_at=utcnow())
+            )
+
+    def retry_delay(self, attempts):
+        """Jittered, bounded exponential backoff before the next attempt."""
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempts - 1)))
+        return delay * (0.5 + random.random() / 2)
+
+    def fail(self, imdb_id, attempts, error):
+        """Schedule a retry, or give up after max_attempts (no commit)."""
+        now = utcnow()
+        if attempts >= self.max_attempts:
+            values = {"status": FAILED}
+            logging.warning(f"Giving up enriching {imdb_id} after {attempts} attempts: {error}")
+        else:
+            values = {"status": PENDING, "run_after": now + timedelta(seconds=self.retry_delay(attempts))}
+        db.session.execute(
+            update(EnrichmentJob)
+            .where(EnrichmentJob.imdb_id == imdb_id)
+            .values(last_error=error, updated_at=now, **values)
+        )
+
+    def release(self, imdb_ids):
+        """Return claimed jobs to the queue without using up an attempt (no commit).
+
+        For jobs that were never sent upstream, e.g. because the quota or
+        the circuit breaker refused them.
+        """
+        if imdb_ids:
+            db.session.execute(
+                update(EnrichmentJob)
+                .where(EnrichmentJob.imdb_id.in_(imdb_ids))
+                .values(
+                    status=PENDING,
+                    attempts=EnrichmentJob.attempts - 1,
+                    run_after=utcnow(),
+                    updated_at=utcnow(),
+                )
+            )
+
+    def requeue_stale(self, older_than):
+        """Queue films never enriched or enriched before now - older_than.
+
+        Returns the number of films queued.
+        """
+        cutoff = utcnow() - older_than
+        imdb_ids = db.session.scalars(
+            select(Movie.imdb_id).where(
+                Movie.imdb_id.is_not(None),
+                or_(Movie.enriched_at.is_(None), Movie.enriched_at < cutoff),
+            )
+        ).all()
+        self.enqueue(imdb_ids, force=True)
+        db.session.commit()
+        logging.info(f"Queued {len(imdb_ids)} stale films for enrichment.")
+        return len(imdb_ids)
+
+    def counts(self):
+        """Return the number of jobs in each status."""
+        return dict(
+            db.session.execute(
+                select(EnrichmentJob.status, func.count()).group_by(EnrichmentJob.status)
+            ).all()
+        )
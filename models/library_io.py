@@ -0,0 +1,217 @@
+# models/library_io.py
+"""Bulk import, batched edits and streamed export of user libraries."""
+
+import csv
+import io
+import json
+import logging
+
+from werkzeug.datastructures import MultiDict
+
+from forms.add_movie_form import AddMovieForm
+
+EXPORT_FIELDS = ["name", "director", "year", "rating", "imdb_id", "added_at"]
+FORMATS = ("csv", "json", "ndjson")
+UPDATE_FIELDS = ("name", "director", "year", "rating")
+
+
+def detect_format(filename, default="csv"):
+    """Guess the import format from a file name."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in FORMATS else default
+
+
+def read_rows(stream, fmt):
+    """Yield raw row dicts from a binary stream.
+
+    CSV and NDJSON are read one line at a time; a JSON array is parsed whole.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+    elif fmt == "ndjson":
+        for line in text:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "json":
+        data = json.load(text)
+        if not isinstance(data, list):
+            raise ValueError("JSON imports must be an array of movie objects")
+        yield from data
+    else:
+        raise ValueError(f"Unsupported import format: {fmt!r}")
+
+
+def validate_row(row):
+    """Validate one row with the AddMovieForm rules.
+
+    Returns (movie, None) for a valid row or (None, errors).
+    Must be called inside a request context.
+    """
+    if not isinstance(row, dict):
+        return None, {"row": ["Expected an object with movie fields."]}
+    formdata = MultiDict(
+        {key: "" if value is None else str(value) for key, value in row.items()}
+    )
+    form = AddMovieForm(formdata=formdata, meta={"csrf": False})
+    if not form.validate():
+        return None, form.errors
+    return {
+        "name": form.name.data,
+        "director": form.director.data,
+        "year": form.year.data,
+        "rating": form.rating.data,
+        "imdb_id": form.imdb_id.data or None,
+    }, None
+
+
+def validate_changes(row):
+    """Validate the fields an update gives with the AddMovieForm rules.
+
+    Returns (changes, None), changes holding only the given fields, or
+    (None, errors). Must be called inside a request context.
+    """
+    fields = {key: row[key] for key in UPDATE_FIELDS if row.get(key) not in (None, "")}
+    if not fields:
+        return None, {"row": [f"Expected at least one of {', '.join(UPDATE_FIELDS)}."]}
+    formdata = MultiDict({key: str(value) for key, value in fields.items()})
+    form = AddMovieForm(formdata=formdata, meta={"csrf": False})
+    form.validate()
+    errors = {key: messages for key, messages in form.errors.items() if key in fields}
+    if errors:
+        return None, errors
+    return {key: form[key].data for key in fields}, None
+
+
+def _validate_operation(operation):
+    """Return (kind, payload, errors) for one batch operation."""
+    if not isinstance(operation, dict):
+        return None, None, {"op": ["Expected an object."]}
+    kind = operation.get("op")
+    fields = {key: value for key, value in operation.items() if key != "op"}
+    if kind == "add":
+        movie, errors = validate_row(fields)
+        return kind, movie, errors
+    if kind not in ("update", "delete"):
+        return None, None, {"op": ["Expected add, update or delete."]}
+
+    movie_id = operation.get("id")
+    if not isinstance(movie_id, int) or isinstance(movie_id, bool):
+        return kind, None, {"id": ["Expected an integer movie ID."]}
+    if kind == "delete":
+        return kind, movie_id, None
+    changes, errors = validate_changes(fields)
+    return kind, dict(changes, id=movie_id) if changes else None, errors
+
+
+def apply_batch(data_manager, user_id, operations):
+    """Validate add/update/delete operations and apply them in one transaction.
+
+    Nothing is applied if any operation is invalid. Returns a report with a
+    result per operation (in order) and the HTTP status to answer with.
+    """
+    adds, updates, deletes, plan, errors = [], [], [], [], []
+    seen = set()
+    for index, operation in enumerate(operations):
+        kind, payload, op_errors = _validate_operation(operation)
+        if not op_errors and kind != "add":
+            movie_id = payload if kind == "delete" else payload["id"]
+            if movie_id in seen:
+                op_errors = {"id": ["Each movie may appear only once per batch."]}
+            seen.add(movie_id)
+        if op_errors:
+            errors.append({"index": index, "errors": op_errors})
+            continue
+        batch = {"add": adds, "update": updates, "delete": deletes}[kind]
+        plan.append((index, kind, len(batch)))
+        batch.append(payload)
+    if errors:
+        return {"applied": False, "errors": errors}, 400
+
+    added, updated, deleted = data_manager.apply_movie_changes(user_id, adds, updates, deletes)
+    updated, deleted = set(updated), set(deleted)
+    results = []
+    for index, kind, position in plan:
+        if kind == "add":
+            results.append({"index": index, "op": kind, "status": "added", "id": added[position]})
+            continue
+        movie_id = updates[position]["id"] if kind == "update" else deletes[position]
+        done = movie_id in (updated if kind == "update" else deleted)
+        status = ("updated" if kind == "update" else "deleted") if done else "not_found"
+        results.append({"index": index, "op": kind, "status": status, "id": movie_id})
+    return {"applied": True, "results": results}, 200
+
+
+def import_library(data_manager, user_id, rows, batch_size=1000):
+    """Validate rows and add the valid ones in batched transactions.
+
+    Returns a report with the number imported and per-row errors (rows are
+    numbered from 1). A failed batch is reported against each of its rows.
+    """
+    imported = 0
+    errors = []
+    batch, batch_rows = [], []
+
+    def flush():
+        nonlocal imported
+        try:
+            imported += data_manager.add_movies(user_id, batch)
+        except Exception as e:
+            errors.extend({"row": n, "errors": {"batch": [str(e)]}} for n in batch_rows)
+        batch.clear()
+        batch_rows.clear()
+
+    try:
+        for number, row in enumerate(rows, start=1):
+            movie, row_errors = validate_row(row)
+            if row_errors:
+                errors.append({"row": number, "errors": row_errors})
+                continue
+            batch.append(movie)
+            batch_rows.append(number)
+            if len(batch) >= batch_size:
+                flush()
+    except (ValueError, csv.Error) as e:  # malformed files stop the import here
+        errors.append({"row": None, "errors": {"file": [str(e)]}})
+    if batch:
+        flush()
+
+    logging.info(f"Imported {imported} movies for user ID {user_id}; {len(errors)} errors.")
+    return {"imported": imported, "errors": errors}
+
+
+def _export_record(movie):
+    record = {field: getattr(movie, field) for field in EXPORT_FIELDS}
+    if record["added_at"] is not None:
+        record["added_at"] = record["added_at"].isoformat()
+    return record
+
+
+def iter_library(data_manager, user_id, page_size=1000):
+    """Yield a user's movies page by page, holding one page at a time."""
+    cursor = None
+    while True:
+        page = data_manager.get_user_movies_page(user_id, page_size, cursor)
+        yield from page.items
+        if not page.next_cursor:
+            return
+        cursor = page.next_cursor
+
+
+def export_csv(movies):
+    """Yield a CSV document line by line."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for movie in movies:
+        writer.writerow(_export_record(movie))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson(movies):
+    """Yield one JSON object per line."""
+    for movie in movies:
+        yield json.dumps(_export_record(movie)) + "\n"
@@ -0,0 +1,533 @@
+# models/memory_data_manager.py
+
+import logging
+import string
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict, namedtuple
+
+from sqlalchemy import inspect, select
+
+from models import db, recommendations, user_stats
+from models.caching_data_manager import MovieRecord, UserRecord
+from models.data_management_interface import DataManagerInterface
+from models.data_manager import (
+    MOVIE_SORTS,
+    NULL_SORT_VALUES,
+    USER_SORTS,
+    USERS_SCOPE,
+    _parse_sort,
+    parse_filters,
+    user_scope,
+)
+from models.db_models import Movie, User, UserMovie, utcnow
+from models.pagination import paginate_sorted
+
+UserStatsRecord = namedtuple("UserStatsRecord", ["id", "name", "movie_count", "average_rating"])
+RecommendationRecord = namedtuple(
+    "RecommendationRecord",
+    ["id", "imdb_id", "name", "director", "year", "poster", "score", "because"],
+)
+
+# SQLite's NOCASE and LIKE fold ASCII letters only
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _fold(text):
+    return text.translate(_ASCII_LOWER)
+
+
+# Python counterparts of data_manager.MOVIE_FILTERS; NULLs never match, as in SQL
+MOVIE_PREDICATES = {
+    "director": lambda value: (
+        lambda entry: entry.film.director is not None
+        and _fold(entry.film.director) == _fold(value)
+    ),
+    "year_min": lambda value: lambda entry: entry.film.year is not None and entry.film.year >= value,
+    "year_max": lambda value: lambda entry: entry.film.year is not None and entry.film.year <= value,
+    "min_rating": lambda value: lambda entry: entry.rating is not None and entry.rating >= value,
+    "title": lambda value: lambda entry: _fold(value) in _fold(entry.film.name),
+}
+
+
+class StoredUser:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class StoredFilm:
+    """A film in the catalog, shared by every library entry that saves it."""
+
+    __slots__ = ("id", "imdb_id", "name", "director", "year", "genre", "runtime", "plot", "poster")
+
+    def __init__(self, id, imdb_id, name, director, year, genre=None, runtime=None, plot=None, poster=None):
+        self.id = id
+        self.imdb_id = imdb_id
+        self.name = name
+        self.director = director
+        self.year = year
+        self.genre = genre
+        self.runtime = runtime
+        self.plot = plot
+        self.poster = poster
+
+
+class StoredEntry:
+    """A film in one user's library, with the user's rating."""
+
+    __slots__ = ("id", "user_id", "film", "rating", "added_at")
+
+    def __init__(self, id, user_id, film, rating, added_at):
+        self.id = id
+        self.user_id = user_id
+        self.film = film
+        self.rating = rating
+        self.added_at = added_at
+
+    @property
+    def order_key(self):
+        return (self.added_at, self.id)
+
+    def stats_entry(self):
+        return (self.film.director, self.film.year, self.rating)
+
+    def record(self):
+        film = self.film
+        return MovieRecord(
+            self.id, self.user_id, film.id, film.imdb_id, film.name, film.director, film.year,
+            self.rating, self.added_at, film.genre, film.runtime, film.plot, film.poster,
+        )
+
+
+class InMemoryDataManager(DataManagerInterface):
+    """DataManagerInterface kept entirely in process memory.
+
+    Users, films and library entries are slotted records behind hash
+    indexes (id -> record, user -> entries, imdbID/details -> film) and two
+    sorted indexes: users by (name, id) and each library by (added_at, id),
+    which default listings page through by bisection. Statistics counters
+    and data versions are kept as SQLiteDataManager keeps them, so both pass
+    the same contract tests. Nothing is written back to the database; use it
+    for tests and to measure the app without database cost.
+    """
+
+    def __init__(self, title_index=None, recommend_seeds=200, recommend_params=None):
+        self.title_index = title_index
+        self.recommend_seeds = recommend_seeds
+        self.recommend_params = recommend_params or {}
+        self._lock = threading.RLock()
+
+        self.users = {}  # id -> StoredUser
+        self.films = {}  # id -> StoredFilm
+        self.entries = {}  # id -> StoredEntry
+        self._user_ids_by_name = {}
+        self._users_by_name = []  # sorted (name, id)
+        self._films_by_imdb_id = {}
+        self._films_by_details = defaultdict(list)  # (name, director, year) -> [StoredFilm]
+        self._libraries = defaultdict(dict)  # user_id -> {entry id: StoredEntry}
+        self._library_order = defaultdict(list)  # user_id -> sorted (added_at, id)
+        self._stats = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0]))  # user_id -> {(kind, key): [movies, rated, rating_sum]}
+        self._versions = {}
+        self._next_ids = {"user": 1, "film": 1, "entry": 1}
+        self._neighbors = None  # (library version, {film id: [(neighbor id, score)]})
+
+    @classmethod
+    def from_config(cls, config, title_index=None):
+        return cls(
+            title_index=title_index,
+            recommend_seeds=config.get("RECOMMEND_SEEDS", 200),
+            recommend_params={
+                "top_k": config.get("RECOMMEND_TOP_K", 20),
+                "min_common": config.get("RECOMMEND_MIN_COMMON", 2),
+                "max_library": config.get("RECOMMEND_MAX_LIBRARY", 500),
+            },
+        )
+
+    def load_database(self):
+        """Copy users, films and libraries from the app's database, if it has them.
+
+        Must be called inside an application context.
+        """
+        if not all(inspect(db.engine).has_table(table) for table in ("users", "movies", "user_movies")):
+            return 0
+        started = time.perf_counter()
+        with self._lock:
+            for user_id, name in db.session.execute(select(User.id, User.name)):
+                self._store_user(user_id, name)
+            for row in db.session.execute(
+                select(
+                    Movie.id, Movie.imdb_id, Movie.name, Movie.director, Movie.year,
+                    Movie.genre, Movie.runtime, Movie.plot, Movie.poster,
+                )
+            ):
+                self._store_film(StoredFilm(*row))
+            rows = db.session.execute(
+                select(UserMovie.id, UserMovie.user_id, UserMovie.movie_id, UserMovie.rating, UserMovie.added_at)
+            ).all()
+            for entry_id, user_id, movie_id, rating, added_at in rows:
+                self._store_entry(StoredEntry(entry_id, user_id, self.films[movie_id], rating, added_at))
+            for user_id, library in self._libraries.items():
+                user_stats.aggregate((entry.stats_entry() for entry in library.values()), into=self._stats[user_id])
+            if self.title_index is not None:
+                saves = Counter(entry.film.id for entry in self.entries.values())
+                self.title_index.load(
+                    (film.name, film.year, film.imdb_id, saves[film.id])
+                    for film in self.films.values()
+                    if saves[film.id]
+                )
+        logging.info(f"Loaded {len(rows)} library entries into memory in {time.perf_counter() - started:.2f}s.")
+        return len(rows)
+
+    # Index maintenance; callers hold the lock
+
+    def _next_id(self, kind, taken=None):
+        if taken is not None:
+            self._next_ids[kind] = max(self._next_ids[kind], taken + 1)
+            return taken
+        new_id = self._next_ids[kind]
+        self._next_ids[kind] += 1
+        return new_id
+
+    def _store_user(self, user_id, name):
+        user = StoredUser(self._next_id("user", user_id), name)
+        self.users[user.id] = user
+        self._user_ids_by_name[name] = user.id
+        insort(self._users_by_name, (name, user.id))
+        return user
+
+    def _store_film(self, film):
+        self._next_id("film", film.id)
+        self.films[film.id] = film
+        if film.imdb_id:
+            self._films_by_imdb_id[film.imdb_id] = film
+        self._films_by_details[(film.name, film.director, film.year)].append(film)
+        return film
+
+    def _store_entry(self, entry):
+        self._next_id("entry", entry.id)
+        self.entries[entry.id] = entry
+        self._libraries[entry.user_id][entry.id] = entry
+        insort(self._library_order[entry.user_id], entry.order_key)
+        return entry
+
+    def _drop_entry(self, entry):
+        del self.entries[entry.id]
+        del self._libraries[entry.user_id][entry.id]
+        order = self._library_order[entry.user_id]
+        del order[bisect_left(order, entry.order_key)]
+
+    def _resolve_film(self, name, director, year, imdb_id=None):
+        """Return the catalog film for these details, creating it if needed."""
+        if imdb_id and imdb_id in self._films_by_imdb_id:
+            return self._films_by_imdb_id[imdb_id]
+        # Like SQLiteDataManager, prefer a matching film that has an imdbID
+        matches = sorted(self._films_by_details.get((name, director, year), ()), key=lambda f: f.imdb_id is None)
+        film = matches[0] if matches else None
+        if film and imdb_id:
+            if film.imdb_id is None:
+                film.imdb_id = imdb_id  # Hand-entered film now matched to OMDb
+                self._films_by_imdb_id[imdb_id] = film
+            elif film.imdb_id != imdb_id:
+                film = None  # A different film that shares name, director and year
+        if film is None:
+            film = self._store_film(StoredFilm(self._next_id("film"), imdb_id or None, name, director, year))
+        return film
+
+    def _record_stats(self, user_id, added=(), removed=()):
+        counters = self._stats[user_id]
+        user_stats.aggregate(added, into=counters)
+        user_stats.aggregate(removed, sign=-1, into=counters)
+        for bucket in [bucket for bucket, counter in counters.items() if counter[0] <= 0]:
+            del counters[bucket]
+
+    def _bump_versions(self, *scopes):
+        first = time.time_ns() // 1000
+        for scope in scopes:
+            self._versions[scope] = self._versions[scope] + 1 if scope in self._versions else first
+
+    def _user_stats_record(self, user):
+        movies, rated, rating_sum = self._stats.get(user.id, {}).get((user_stats.TOTAL, ""), (0, 0, 0.0))
+        return UserStatsRecord(user.id, user.name, movies, rating_sum / rated if rated else None)
+
+    # Reads
+
+    def get_all_users(self):
+        """Retrieve all users, by id."""
+        with self._lock:
+            return [UserRecord(user.id, user.name) for _, user in sorted(self.users.items())]
+
+    def get_user(self, user_id):
+        """Retrieve a single user."""
+        with self._lock:
+            user = self.users.get(user_id)
+            return UserRecord(user.id, user.name) if user else None
+
+    def get_users_with_stats(self):
+        """Retrieve every user with their movie count and average rating."""
+        with self._lock:
+            return [self._user_stats_record(self.users[user_id]) for _, user_id in self._users_by_name]
+
+    def get_user_stats(self, user_id):
+        """Summarize a user's incrementally maintained statistics counters."""
+        with self._lock:
+            return user_stats.summarize(self._stats.get(user_id, {}))
+
+    def get_recommendations(self, user_id, limit=20):
+        """Rank unsaved films by similarity to the user's recent saves.
+
+        Neighbours are rebuilt on the first call after a library change,
+        rather than by a background worker.
+        """
+        with self._lock:
+            neighbors = self._current_neighbors()
+            seeds = self._library_order.get(user_id, [])[::-1][: self.recommend_seeds]
+            saved = {entry.film.id for entry in self._libraries.get(user_id, {}).values()}
+            scores, because = defaultdict(float), defaultdict(int)
+            for _, entry_id in seeds:
+                for neighbor_id, score in neighbors.get(self.entries[entry_id].film.id, ()):
+                    if neighbor_id not in saved:
+                        scores[neighbor_id] += score
+                        because[neighbor_id] += 1
+            ranked = sorted(scores, key=lambda film_id: (-scores[film_id], film_id))[:limit]
+            return [
+                RecommendationRecord(
+                    film.id, film.imdb_id, film.name, film.director, film.year, film.poster,
+                    scores[film.id], because[film.id],
+                )
+                for film in (self.films[film_id] for film_id in ranked)
+            ]
+
+    def _current_neighbors(self):
+        version = self._versions.get(USERS_SCOPE, 0)
+        if self._neighbors is None or self._neighbors[0] != version:
+            params = dict(self.recommend_params)
+            max_library = params.pop("max_library", 500)
+            entries = {
+                (user_id, self.entries[entry_id].film.id)
+                for user_id, order in self._library_order.items()
+                for _, entry_id in order[::-1][:max_library]
+            }
+            neighbors = defaultdict(list)
+            for movie_id, neighbor_id, score, _ in recommendations.neighbor_pairs(entries, **params):
+                neighbors[movie_id].append((neighbor_id, score))
+            self._neighbors = (version, neighbors)
+        return self._neighbors[1]
+
+    def get_users_page(self, limit, cursor=None, sort="name"):
+        """Retrieve one keyset-paginated page of users, bisecting the (name, id) index."""
+        _parse_sort(sort, USER_SORTS)
+        descending = sort.startswith("-")
+        with self._lock:
+            keys = self._users_by_name
+            page = paginate_sorted(keys, keys, lambda key: key, limit, cursor, descending)
+            page.items = [self._user_stats_record(self.users[user_id]) for _, user_id in page.items]
+            return page
+
+    def _library(self, user_id, filters, sort):
+        """Return a user's matching entries and their (sort value, id) keys, in ascending order."""
+        name, (attribute, _, parse), descending = _parse_sort(sort, MOVIE_SORTS)
+        predicates = [MOVIE_PREDICATES[key](value) for key, value in parse_filters(filters)]
+        library = self._libraries.get(user_id, {})
+        if name == "added":
+            entries = [library[entry_id] for _, entry_id in self._library_order.get(user_id, [])]
+        else:
+            entries = list(library.values())
+        if predicates:
+            entries = [entry for entry in entries if all(match(entry) for match in predicates)]
+        records = [entry.record() for entry in entries]
+
+        def key(record):
+            value = getattr(record, attribute)
+            return (NULL_SORT_VALUES.get(name) if value is None else value), record.id
+
+        if name != "added":
+            records.sort(key=key)
+        return records, [key(record) for record in records], key, parse, descending
+
+    def get_user_movies(self, user_id, filters=None, sort="added"):
+        """Retrieve a user's movies, optionally filtered and sorted."""
+        with self._lock:
+            records, _, _, _, descending = self._library(user_id, filters, sort)
+        return records[::-1] if descending else records
+
+    def get_user_movies_page(self, user_id, limit, cursor=None, sort="added", filters=None):
+        """Retrieve one keyset-paginated page of a user's movies.
+
+        Unfiltered "added" pages bisect the (added_at, id) index and cost
+        O(log n + limit); other sorts and any filter build and sort the whole
+        library first, so they cost O(n log n) per page.
+        """
+        name, (_, _, parse), descending = _parse_sort(sort, MOVIE_SORTS)
+        with self._lock:
+            if name == "added" and not parse_filters(filters):
+                keys = self._library_order.get(user_id, [])
+                page = paginate_sorted(keys, keys, lambda key: key, limit, cursor, descending, parse)
+                page.items = [self.entries[entry_id].record() for _, entry_id in page.items]
+                return page
+            records, keys, key, parse, descending = self._library(user_id, filters, sort)
+        return paginate_sorted(records, keys, key, limit, cursor, descending, parse)
+
+    def get_data_versions(self, *scopes):
+        """Return the current version of each scope (0 if never written)."""
+        with self._lock:
+            return tuple(self._versions.get(scope, 0) for scope in scopes)
+
+    def get_movie(self, movie_id):
+        """Retrieve a single library entry."""
+        with self._lock:
+            entry = self.entries.get(movie_id)
+            return entry.record() if entry else None
+
+    # Writes
+
+    def add_user(self, user):
+        """Add a user; raise ValueError if the name is taken, as the UNIQUE column would."""
+        with self._lock:
+            if user.name in self._user_ids_by_name:
+                raise ValueError(f"User name already exists: {user.name!r}")
+            user.id = self._store_user(None, user.name).id
+            self._bump_versions(USERS_SCOPE)
+        return user
+
+    def add_movie(self, user_id, name, director, year, rating, imdb_id=None):
+        """Add a new movie to the user's library; return the entry, or None."""
+        with self._lock:
+            if user_id not in self.users:
+                logging.warning(f"User with ID {user_id} not found.")
+                return None
+            try:
+                year = int(year)
+                rating = float(rating)
+            except (TypeError, ValueError):
+                logging.error("Invalid year or rating format.")
+                return None
+            film = self._resolve_film(name, director, year, imdb_id)
+            entry = self._store_entry(StoredEntry(self._next_id("entry"), user_id, film, rating, utcnow()))
+            self._record_stats(user_id, added=[entry.stats_entry()])
+            self._bump_versions(USERS_SCOPE, user_scope(user_id))
+        if self.title_index is not None:
+            self.title_index.add(name, year, film.imdb_id)
+        return entry.record()
+
+    def add_movies(self, user_id, movies):
+        """Add many validated movies; return the number added."""
+        if not movies:
+            return 0
+        return len(self.apply_movie_changes(user_id, adds=movies)[0])
+
+    def apply_movie_changes(self, user_id, adds=(), updates=(), deletes=()):
+        """Add, update and delete movies of one user atomically.
+
+        Every update is parsed before anything changes, so a bad value
+        leaves the library untouched. Returns (new IDs in order, IDs
+        updated, IDs deleted); IDs outside the user's library are skipped.
+        """
+        with self._lock:
+            library = self._libraries.get(user_id, {})
+            changes = []
+            for u in updates:
+                entry = library.get(u["id"])
+                if entry is None:
+                    continue
+                film = entry.film
+                details = (
+                    u.get("name") or film.name,
+                    u.get("director") or film.director,
+                    int(u["year"]) if u.get("year") else film.year,
+                )
+                rating = float(u["rating"]) if u.get("rating") is not None else entry.rating
+                changes.append((entry, details, rating))
+
+            added_at = utcnow()
+            added = [
+                self._store_entry(
+                    StoredEntry(
+                        self._next_id("entry"),
+                        user_id,
+                        self._resolve_film(m["name"], m["director"], m["year"], m["imdb_id"]),
+                        m["rating"],
+                        added_at,
+                    )
+                )
+                for m in adds
+            ]
+            retitled, before, after = [], [], []
+            for entry, details, rating in changes:
+                film = entry.film
+                before.append(entry.stats_entry())
+                if details != (film.name, film.director, film.year):
+                    entry.film = self._resolve_film(*details)
+                    retitled.append(((film.name, film.year), (entry.film.name, entry.film.year)))
+                entry.rating = rating
+                after.append(entry.stats_entry())
+            gone = [library[entry_id] for entry_id in set(deletes) if entry_id in library]
+            for entry in gone:
+                self._drop_entry(entry)
+
+            if added or changes or gone:
+                self._record_stats(
+                    user_id,
+                    added=[entry.stats_entry() for entry in added] + after,
+                    removed=before + [entry.stats_entry() for entry in gone],
+                )
+                self._bump_versions(USERS_SCOPE, user_scope(user_id))
+
+        if self.title_index is not None:
+            for m in adds:
+                self.title_index.add(m["name"], m["year"], m["imdb_id"] or None)
+            for (old_name, old_year), (name, year) in retitled:
+                self.title_index.remove(old_name, old_year)
+                self.title_index.add(name, year)
+            for entry in gone:
+                self.title_index.remove(entry.film.name, entry.film.year)
+        return (
+            [entry.id for entry in added],
+            sorted(entry.id for entry, _, _ in changes),
+            sorted(entry.id for entry in gone),
+        )
+
+    def update_movies(self, user_id, updates):
+        """Update many of a user's movies at once; return the IDs updated."""
+        return self.apply_movie_changes(user_id, updates=updates)[1]
+
+    def delete_movies(self, user_id, movie_ids):
+        """Delete many of a user's movies at once; return the IDs deleted."""
+        return self.apply_movie_changes(user_id, deletes=movie_ids)[2]
+
+    def update_movie(self, movie_id, name=None, director=None, year=None, rating=None):
+        """Update a library entry; return it, or None if it does not exist."""
+        with self._lock:
+            entry = self.entries.get(movie_id)
+            if entry is None:
+                return None
+            film = entry.film
+            before = entry.stats_entry()
+            details = (name or film.name, director or film.director, int(year) if year else film.year)
+            if details != (film.name, film.director, film.year):
+                # The film is shared, so point this entry at another one
+                entry.film = self._resolve_film(*details)
+            if rating:
+                entry.rating = float(rating)
+            self._record_stats(entry.user_id, added=[entry.stats_entry()], removed=[before])
+            self._bump_versions(USERS_SCOPE, user_scope(entry.user_id))
+        if self.title_index is not None and (film.name, film.year) != (entry.film.name, entry.film.year):
+            self.title_index.remove(film.name, film.year)
+            self.title_index.add(entry.film.name, entry.film.year, entry.film.imdb_id)
+        return entry.record()
+
+    def delete_movie(self, movie_id):
+        """Delete a library entry; return True if it existed."""
+        with self._lock:
+            entry = self.entries.get(movie_id)
+            if entry is None:
+                return False
+            self._drop_entry(entry)
+            self._record_stats(entry.user_id, removed=[entry.stats_entry()])
+            self._bump_versions(USERS_SCOPE, user_scope(entry.user_id))
+        if self.title_index is not None:
+            self.title_index.remove(entry.film.name, entry.film.year)
+        return True
@@ -0,0 +1,141 @@
+# models/migrations.py
+
+import logging
+
+from sqlalchemy import inspect, text
+
+from models import db
+from models.db_models import Movie, UserMovie, UserStat
+from models.user_stats import rebuild as rebuild_user_stats
+
+
+def _columns(connection, table):
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+
+def migrate_legacy_movies(engine):
+    """Fold per-user movie rows into the movies catalog + user_movies layout.
+
+    The legacy schema stored name/director/year/rating on every movies row
+    together with its user_id. Identical films are merged into one catalog
+    row, and every legacy row becomes a user_movies entry that keeps its id,
+    so existing /users/<id>/update_movie/<movie_id> links stay valid.
+    Returns True if a migration was applied.
+    """
+    with engine.begin() as connection:
+        tables = inspect(connection).get_table_names()
+        if "movies" not in tables or "user_id" not in _columns(connection, "movies"):
+            return False
+
+        logging.info("Migrating legacy movies table to the catalog layout.")
+        connection.execute(text("ALTER TABLE movies RENAME TO legacy_movies"))
+        db.metadata.create_all(
+            bind=connection, tables=[Movie.__table__, UserMovie.__table__]
+        )
+        connection.execute(
+            text(
+                "INSERT INTO movies (name, director, year) "
+                "SELECT name, director, year FROM legacy_movies "
+                "GROUP BY name, director, year ORDER BY MIN(id)"
+            )
+        )
+        result = connection.execute(
+            text(
+                "INSERT INTO user_movies (id, user_id, movie_id, rating, added_at) "
+                # Same text format SQLAlchemy writes, so timestamps compare correctly
+                "SELECT l.id, l.user_id, m.id, l.rating, CURRENT_TIMESTAMP || '.000000' "
+                "FROM legacy_movies l JOIN movies m "
+                "ON m.name = l.name AND m.director IS l.director AND m.year IS l.year "
+                "ORDER BY l.id"
+            )
+        )
+        connection.execute(text("DROP TABLE legacy_movies"))
+        logging.info(f"Migrated {result.rowcount} library entries.")
+        return True
+
+
+# Columns added to movies after its first release, with their SQL types
+MOVIE_DETAIL_COLUMNS = {
+    "genre": "VARCHAR(255)",
+    "runtime": "VARCHAR(32)",
+    "plot": "TEXT",
+    "poster": "VARCHAR(500)",
+    "enriched_at": "DATETIME",
+}
+
+
+def add_movie_detail_columns(engine):
+    """Add the enrichment columns to an existing movies table.
+
+    Returns True if any column was added.
+    """
+    with engine.begin() as connection:
+        if "movies" not in inspect(connection).get_table_names():
+            return False
+        missing = [name for name in MOVIE_DETAIL_COLUMNS if name not in _columns(connection, "movies")]
+        for name in missing:
+            connection.execute(text(f"ALTER TABLE movies ADD COLUMN {name} {MOVIE_DETAIL_COLUMNS[name]}"))
+        if missing:
+            logging.info(f"Added movie detail columns: {', '.join(missing)}.")
+        return bool(missing)
+
+
+def build_user_stats(engine):
+    """Create and fill the user_stats table for a database that predates it.
+
+    Returns True if the table was built.
+    """
+    with engine.begin() as connection:
+        tables = inspect(connection).get_table_names()
+        if "user_movies" not in tables or "user_stats" in tables:
+            return False
+        UserStat.__table__.create(connection)
+        rebuild_user_stats(bind=connection)
+        return True
+
+
+# Indexes replaced by wider ones in a later release
+OBSOLETE_INDEXES = ("ix_user_movies_movie_id",)
+
+
+def add_library_indexes(engine):
+    """Create the filter and sort indexes of movies and user_movies.
+
+    Drops the indexes they replace and refreshes the planner statistics
+    (ANALYZE), so SQLite can choose between scanning a library and
+    starting from the matching films. Returns True if any index was created.
+    """
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        tables = inspector.get_table_names()
+        if "movies" not in tables or "user_movies" not in tables:
+            return False
+        existing = {
+            index["name"]
+            for table in ("movies", "user_movies")
+            for index in inspector.get_indexes(table)
+        }
+        missing = [
+            index
+            for table in (Movie.__table__, UserMovie.__table__)
+            for index in table.indexes
+            if index.name not in existing
+        ]
+        for index in missing:
+            index.create(connection)
+        for name in OBSOLETE_INDEXES:
+            if name in existing:
+                connection.execute(text(f"DROP INDEX {name}"))
+        if missing:
+            connection.execute(text("ANALYZE movies"))
+            connection.execute(text("ANALYZE user_movies"))
+            logging.info(f"Created library indexes: {', '.join(index.name for index in missing)}.")
+        return bool(missing)
+
+
+def migrate(engine):
+    """Apply every pending schema migration."""
+    applied = migrate_legacy_movies(engine)
+    applied = add_movie_detail_columns(engine) or applied
+    applied = add_library_indexes(engine) or applied
+    return build_user_stats(engine) or applied
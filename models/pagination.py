@@ -0,0 +1,118 @@
+# models/pagination.py
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from sqlalchemy import literal, tuple_
+
+NEXT = "next"
+PREV = "prev"
+
+
+class Page:
+    """One page of keyset-paginated results with cursors to its neighbours."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(direction, value, row_id):
+    """Encode a page boundary as an opaque URL-safe string."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([direction, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (direction, value, row_id); raise ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+    if direction not in (NEXT, PREV) or not isinstance(row_id, int):
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return direction, value, row_id
+
+
+def keyset_paginate(
+    execute, statement, sort_expr, id_column, key_fn, limit, cursor=None, descending=False, parse=None
+):
+    """Return a Page of statement's rows ordered by (sort_expr, id_column).
+
+    Instead of OFFSET, each page continues from the (sort value, id) of the
+    boundary row, so a page costs the same however deep it is. execute runs
+    the final statement and returns a list; key_fn(item) returns the item's
+    (sort value, id); parse converts a sort value read back from a cursor.
+    """
+    direction = NEXT
+    if cursor:
+        direction, value, row_id = decode_cursor(cursor)
+        if parse is not None and value is not None:
+            value = parse(value)
+
+    backwards = direction == PREV
+    ascending = descending == backwards  # scan order in SQL
+    key = tuple_(sort_expr, id_column)
+    if cursor:
+        boundary = tuple_(literal(value, sort_expr.type), literal(row_id))
+        statement = statement.where(key > boundary if ascending else key < boundary)
+
+    if ascending:
+        statement = statement.order_by(sort_expr.asc(), id_column.asc())
+    else:
+        statement = statement.order_by(sort_expr.desc(), id_column.desc())
+
+    items = list(execute(statement.limit(limit + 1)))
+    return _page(items, limit, cursor, backwards, key_fn)
+
+
+def paginate_sorted(items, keys, key_fn, limit, cursor=None, descending=False, parse=None):
+    """In-memory keyset_paginate over items sorted ascending by keys.
+
+    keys[i] is the (sort value, id) of items[i]; the boundary row is found
+    by bisection, so a page costs O(log n + limit) at any depth once items
+    and keys exist. Building them per request is O(n) and dominates.
+    """
+    direction = NEXT
+    if cursor:
+        direction, value, row_id = decode_cursor(cursor)
+        if parse is not None and value is not None:
+            value = parse(value)
+
+    backwards = direction == PREV
+    ascending = descending == backwards
+    if ascending:
+        start = bisect_right(keys, (value, row_id)) if cursor else 0
+        window = items[start : start + limit + 1]
+    else:
+        end = bisect_left(keys, (value, row_id)) if cursor else len(items)
+        window = items[max(0, end - limit - 1) : end][::-1]
+    return _page(window, limit, cursor, backwards, key_fn)
+
+
+def _page(items, limit, cursor, backwards, key_fn):
+    """Build the Page from up to limit + 1 rows fetched in scan order."""
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+
+    has_next = bool(cursor) if backwards else has_more
+    has_prev = has_more if backwards else bool(cursor)
+    return Page(
+        items,
+        next_cursor=encode_cursor(NEXT, *key_fn(items[-1])) if items and has_next else None,
+        prev_cursor=encode_cursor(PREV, *key_fn(items[0])) if items and has_prev else None,
+    )
@@ -0,0 +1,241 @@
+# models/recommendations.py
+"""Item-item recommendations: "users who saved this also saved".
+
+A background build turns the libraries into a sparse user x film matrix X,
+takes the co-occurrence counts X^T X and normalizes them to cosine
+similarity, then keeps each film's top-K neighbours in movie_neighbors.
+Requests only read that table. NumPy/SciPy run the build when installed;
+otherwise a pure-Python pass produces the same neighbours, which is fine
+for small databases.
+"""
+
+import heapq
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # the pure-Python build gives identical results, only slower
+    np = sparse = None
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db
+from models.db_models import DataVersion, Movie, MovieNeighbor, UserMovie
+
+# Data version holding the library version the neighbours were built from
+RECOMMENDATIONS_SCOPE = "recommendations"
+CHUNK_SIZE = 10000
+
+
+def _numpy_neighbors(entries, top_k, min_common):
+    """Vectorized build: sparse X^T X, cosine scores, top-K by one lexsort."""
+    users, films = (np.asarray(column, dtype=np.int64) for column in zip(*entries))
+    _, user_index = np.unique(users, return_inverse=True)
+    film_ids, film_index = np.unique(films, return_inverse=True)
+    x = sparse.csr_matrix(
+        (np.ones(len(film_index), dtype=np.int32), (user_index, film_index)),
+        shape=(user_index.max() + 1, len(film_ids)),
+    )
+    audience = np.asarray(x.sum(axis=0)).ravel().astype(np.float64)  # users per film
+
+    co = (x.T @ x).tocoo()
+    keep = (co.row != co.col) & (co.data >= min_common)
+    rows, cols, common = co.row[keep], co.col[keep], co.data[keep]
+    scores = common / np.sqrt(audience[rows] * audience[cols])
+
+    # Per film: best score first, ties by neighbour id; keep the first top_k
+    order = np.lexsort((film_ids[cols], -scores, rows))
+    rows, cols, common, scores = rows[order], cols[order], common[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+    keep = rank < top_k
+    return list(
+        zip(
+            film_ids[rows[keep]].tolist(),
+            film_ids[cols[keep]].tolist(),
+            scores[keep].tolist(),
+            common[keep].tolist(),
+        )
+    )
+
+
+def _python_neighbors(entries, top_k, min_common):
+    """Same result as _numpy_neighbors, counting co-occurrences per library."""
+    libraries = defaultdict(list)
+    for user_id, movie_id in entries:
+        libraries[user_id].append(movie_id)
+    audience = Counter()
+    co = defaultdict(Counter)
+    for films in libraries.values():
+        audience.update(films)
+        for film in films:
+            co[film].update(films)
+
+    pairs = []
+    for film in sorted(co):
+        candidates = [
+            (common / math.sqrt(audience[film] * audience[other]), other, common)
+            for other, common in co[film].items()
+            if other != film and common >= min_common
+        ]
+        for score, other, common in heapq.nsmallest(top_k, candidates, key=lambda c: (-c[0], c[1])):
+            pairs.append((film, other, score, common))
+    return pairs
+
+
+def neighbor_pairs(entries, top_k=20, min_common=2):
+    """Return (movie_id, neighbor_id, score, common) for distinct (user_id, movie_id) entries.
+
+    score is the cosine similarity of the two films' audiences; only pairs
+    saved together by at least min_common users count.
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+    if np is not None:
+        return _numpy_neighbors(entries, top_k, min_common)
+    return _python_neighbors(entries, top_k, min_common)
+
+
+def library_entries(max_library=500):
+    """Select each user's distinct films, at most max_library of the most recently saved.
+
+    Capping very large libraries keeps the co-occurrence matrix (which grows
+    with the square of a library) bounded, at little cost to quality.
+    """
+    position = func.row_number().over(
+        partition_by=UserMovie.user_id, order_by=(UserMovie.added_at.desc(), UserMovie.id.desc())
+    )
+    recent = select(UserMovie.user_id, UserMovie.movie_id, position.label("position")).subquery()
+    return (
+        select(recent.c.user_id, recent.c.movie_id)
+        .where(recent.c.position <= max_library)
+        .distinct()
+    )
+
+
+def built_version():
+    """Return the library version the stored neighbours were built from, or None."""
+    return db.session.scalar(
+        select(DataVersion.version).where(DataVersion.scope == RECOMMENDATIONS_SCOPE)
+    )
+
+
+def rebuild(bind=None, top_k=20, min_common=2, max_library=500, version=None):
+    """Replace movie_neighbors with a fresh build from the libraries.
+
+    Runs in the current transaction of bind (default: db.session), so
+    readers keep the old neighbours until the caller commits. version, if
+    given, is recorded as the library version this build reflects.
+    Returns the number of neighbour rows written.
+    """
+    bind = bind if bind is not None else db.session
+    started = time.perf_counter()
+    entries = bind.execute(library_entries(max_library)).all()
+    pairs = neighbor_pairs(entries, top_k, min_common)
+
+    bind.execute(delete(MovieNeighbor))
+    for start in range(0, len(pairs), CHUNK_SIZE):
+        bind.execute(
+            insert(MovieNeighbor),
+            [
+                {"movie_id": movie_id, "neighbor_id": neighbor_id, "score": score, "common": common}
+                for movie_id, neighbor_id, score, common in pairs[start : start + CHUNK_SIZE]
+            ],
+        )
+    if version is not None:
+        statement = sqlite_insert(DataVersion).values(scope=RECOMMENDATIONS_SCOPE, version=version)
+        bind.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DataVersion.scope], set_={"version": statement.excluded.version}
+            )
+        )
+    logging.info(
+        f"Built {len(pairs)} movie neighbours from {len(entries)} library entries "
+        f"in {time.perf_counter() - started:.2f}s ({'numpy' if np is not None else 'python'})."
+    )
+    return len(pairs)
+
+
+def refresh(version, **params):
+    """Rebuild and commit if the neighbours predate library version; return rows written or None."""
+    if built_version() == version:
+        return None
+    count = rebuild(version=version, **params)
+    db.session.commit()
+    return count
+
+
+def run_worker(current_version, poll_interval=300.0, stop=None, once=False, **params):
+    """Rebuild whenever current_version() (the library version) moves on.
+
+    Checks every poll_interval seconds until stop (a threading.Event) is
+    set; with once, returns after the first check. Returns the number of
+    rebuilds.
+    """
+    rebuilds = 0
+    while stop is None or not stop.is_set():
+        try:
+            if refresh(current_version(), **params) is not None:
+                rebuilds += 1
+        except Exception as e:
+            logging.error(f"Error building movie neighbours: {e}")
+            db.session.rollback()
+        db.session.remove()
+        if once:
+            break
+        if stop is not None:
+            stop.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+    return rebuilds
+
+
+def recommendations_query(user_id, limit=20, seeds=200):
+    """Select films the user has not saved, ranked by summed similarity to their recent saves.
+
+    Only the seeds most recently saved films are looked up, so the cost is
+    bounded by seeds x K neighbour rows however large the library.
+    """
+    seed_films = (
+        select(UserMovie.movie_id)
+        .where(UserMovie.user_id == user_id)
+        .order_by(UserMovie.added_at.desc(), UserMovie.id.desc())
+        .limit(seeds)
+        .subquery()
+    )
+    # Probed per candidate through ix_user_movies_movie_id_user_id, rather
+    # than listing a possibly huge library up front
+    saved = (
+        select(UserMovie.id)
+        .where(UserMovie.movie_id == MovieNeighbor.neighbor_id, UserMovie.user_id == user_id)
+        .exists()
+    )
+    score = func.sum(MovieNeighbor.score).label("score")
+    ranked = (
+        select(MovieNeighbor.neighbor_id, score, func.count().label("because"))
+        .join(seed_films, seed_films.c.movie_id == MovieNeighbor.movie_id)
+        .where(~saved)
+        .group_by(MovieNeighbor.neighbor_id)
+        .order_by(score.desc(), MovieNeighbor.neighbor_id)
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select(
+            Movie.id,
+            Movie.imdb_id,
+            Movie.name,
+            Movie.director,
+            Movie.year,
+            Movie.poster,
+            ranked.c.score,
+            ranked.c.because,
+        )
+        .join(ranked, ranked.c.neighbor_id == Movie.id)
+        .order_by(ranked.c.score.desc(), Movie.id)
+    )
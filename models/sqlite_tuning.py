@@ -0,0 +1,48 @@
+# models/sqlite_tuning.py
+
+import logging
+import weakref
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+# PRAGMAs that change the database file rather than the connection
+FILE_PRAGMAS = {"journal_mode"}
+
+# Engines that already run the PRAGMAs on connect
+_tuned_engines = weakref.WeakSet()
+
+
+def apply_pragmas(engine, pragmas):
+    """Run the given PRAGMAs on every new connection the engine opens."""
+    if not pragmas or engine.dialect.name != "sqlite" or engine in _tuned_engines:
+        return
+    _tuned_engines.add(engine)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    logging.info(f"SQLite PRAGMAs enabled: {pragmas}")
+
+
+def create_read_only_engine(uri, pragmas=None, **options):
+    """Open a second engine on the same SQLite file in read-only mode.
+
+    Reads from GET routes then use their own pool and never hold a
+    connection that a writer is waiting for.
+    """
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError(f"A read-only engine needs a SQLite file database, got {uri!r}")
+
+    engine = create_engine(f"sqlite:///file:{url.database}?mode=ro&uri=true", **options)
+    apply_pragmas(
+        engine, {name: value for name, value in (pragmas or {}).items() if name not in FILE_PRAGMAS}
+    )
+    return engine
@@ -0,0 +1,219 @@
+# models/title_index.py
+
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+_WORD = re.compile(r"\w+")
+SHORT_PREFIX = 3  # word prefixes up to this long are kept ranked by popularity
+
+
+def normalize_title(text):
+    """Lower-case a title and reduce it to space-separated word tokens."""
+    return " ".join(_WORD.findall(str(text).lower()))
+
+
+def _short_prefixes(norm):
+    """Return every word prefix of a normalized title up to SHORT_PREFIX characters."""
+    return {token[:size] for token in norm.split() for size in range(1, SHORT_PREFIX + 1)}
+
+
+def _year_sort_value(year):
+    """Return the first four-digit year in an OMDb year string, or 0."""
+    match = re.match(r"\d{4}", str(year or ""))
+    return int(match.group()) if match else 0
+
+
+class TitleEntry:
+    """One indexed title with its popularity (number of libraries it is in)."""
+
+    __slots__ = ("title", "year", "year_value", "imdb_id", "popularity", "norm")
+
+    def __init__(self, title, year, imdb_id, norm):
+        self.title = title
+        self.year = year
+        self.year_value = _year_sort_value(year)
+        self.imdb_id = imdb_id
+        self.popularity = 0
+        self.norm = norm
+
+    @property
+    def rank(self):
+        """Sort key: most popular first, then newest, then by title."""
+        return (-self.popularity, -self.year_value, self.norm, (self.norm, self.year))
+
+    def to_suggestion(self):
+        return {"title": self.title, "year": self.year, "imdbID": self.imdb_id}
+
+
+class TitleIndex:
+    """In-memory prefix and token index over movie titles.
+
+    Titles and their individual word tokens are kept in sorted arrays so a
+    prefix query is a binary search plus a short scan. Short word prefixes
+    ("a", "the") match too many titles for that, so each also keeps its
+    titles ranked by popularity and a query walks them best first. Entries
+    are keyed by normalized title and year, so a movie saved by users and
+    the same film seen in an OMDb search result share one entry.
+    """
+
+    def __init__(self, max_candidates=500):
+        self.max_candidates = max_candidates
+        self._entries = {}
+        self._titles = []  # sorted (normalized title, key)
+        self._tokens = []  # sorted (token, key)
+        self._ranked = defaultdict(list)  # short word prefix -> sorted entry ranks
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, rows):
+        """Bulk-add (title, year, imdb_id, popularity) rows, sorting once."""
+        with self._lock:
+            for title, year, imdb_id, popularity in rows:
+                norm = normalize_title(title)
+                if not norm:
+                    continue
+                key = (norm, str(year or ""))
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = TitleEntry(title, str(year or ""), imdb_id, norm)
+                    self._titles.append((norm, key))
+                    self._tokens.extend((token, key) for token in set(norm.split()))
+                entry.popularity += popularity
+                if imdb_id and not entry.imdb_id:
+                    entry.imdb_id = imdb_id
+            self._titles.sort()
+            self._tokens.sort()
+            self._ranked.clear()
+            for entry in self._entries.values():
+                for prefix in _short_prefixes(entry.norm):
+                    self._ranked[prefix].append(entry.rank)
+            for ranks in self._ranked.values():
+                ranks.sort()
+
+    def add(self, title, year, imdb_id=None, popularity=1):
+        """Add a title, or raise the popularity of an existing one."""
+        norm = normalize_title(title)
+        if not norm:
+            return
+        key = (norm, str(year or ""))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = TitleEntry(title, str(year or ""), imdb_id, norm)
+                insort(self._titles, (norm, key))
+                for token in set(norm.split()):
+                    insort(self._tokens, (token, key))
+                self._rerank(entry, None)
+            if popularity:
+                before = entry.rank
+                entry.popularity += popularity
+                self._rerank(entry, before)
+            if imdb_id and not entry.imdb_id:
+                entry.imdb_id = imdb_id
+
+    def remove(self, title, year, popularity=1):
+        """Lower a title's popularity, dropping it once nothing references it.
+
+        Titles known to OMDb (with an imdbID) stay indexed for suggestions.
+        """
+        norm = normalize_title(title)
+        key = (norm, str(year or ""))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            before = entry.rank
+            entry.popularity = max(0, entry.popularity - popularity)
+            if entry.popularity == 0 and not entry.imdb_id:
+                del self._entries[key]
+                self._discard(self._titles, (norm, key))
+                for token in set(norm.split()):
+                    self._discard(self._tokens, (token, key))
+                for prefix in _short_prefixes(norm):
+                    self._discard(self._ranked[prefix], before)
+            else:
+                self._rerank(entry, before)
+
+    def _rerank(self, entry, before):
+        """Move an entry from its old rank (None if new) in every short-prefix list."""
+        if entry.rank == before:
+            return
+        for prefix in _short_prefixes(entry.norm):
+            ranks = self._ranked[prefix]
+            if before is not None:
+                self._discard(ranks, before)
+            insort(ranks, entry.rank)
+
+    @staticmethod
+    def _discard(items, item):
+        position = bisect_left(items, item)
+        if position < len(items) and items[position] == item:
+            del items[position]
+
+    def add_search_results(self, payload):
+        """Index the titles from an OMDb search ("s=") payload."""
+        if payload and payload.get("Response") == "True":
+            for item in payload.get("Search", []):
+                self.add(item.get("Title", ""), item.get("Year"), item.get("imdbID"), popularity=0)
+
+    def add_details(self, payload):
+        """Index the title from an OMDb title or imdbID payload."""
+        if payload and payload.get("Response") == "True":
+            self.add(payload.get("Title", ""), payload.get("Year"), payload.get("imdbID"), popularity=0)
+
+    def _scan(self, items, prefix):
+        """Yield keys whose sort value starts with prefix."""
+        position = bisect_left(items, (prefix,))
+        end = min(len(items), position + self.max_candidates)
+        while position < end and items[position][0].startswith(prefix):
+            yield items[position][1]
+            position += 1
+
+    def _best_ranked(self, prefix, required, require_id, limit):
+        """Yield up to limit matching keys for a short word prefix, most popular first."""
+        found = 0
+        for rank in self._ranked.get(prefix, ()):
+            if found == limit:
+                return
+            key = rank[-1]
+            if required.issubset(key[0].split()) and (self._entries[key].imdb_id or not require_id):
+                found += 1
+                yield key
+
+    def search(self, query, limit=10, require_id=False):
+        """Return suggestions whose title or any word starts with the query.
+
+        Earlier words of a multi-word query must appear in the title; the
+        last word may be partial. Results are ranked by popularity, then year.
+        Longer prefixes rank their first max_candidates matches in title
+        order; short ones rank every match.
+        """
+        norm = normalize_title(query)
+        if not norm:
+            return []
+        words = norm.split()
+        required = set(words[:-1])
+
+        with self._lock:
+            keys = set()
+            if len(norm) > SHORT_PREFIX:  # shorter titles are found by their first word below
+                keys.update(self._scan(self._titles, norm))
+            if len(words[-1]) > SHORT_PREFIX:
+                tokens = self._scan(self._tokens, words[-1])
+            else:
+                tokens = self._best_ranked(words[-1], required, require_id, limit)
+            for key in tokens:
+                if required.issubset(key[0].split()):
+                    keys.add(key)
+
+            entries = [self._entries[key] for key in keys]
+
+        if require_id:
+            entries = [entry for entry in entries if entry.imdb_id]
+        ranked = heapq.nsmallest(limit, entries, key=lambda e: e.rank)
+        return [entry.to_suggestion() for entry in ranked]
@@ -0,0 +1,201 @@
+# models/user_stats.py
+"""Per-user library statistics, maintained incrementally in user_stats.
+
+Every write to a library passes the (director, year, rating) of the
+entries it adds and removes to record_changes, which folds them into a few
+counter rows with one upsert. Reading the statistics then touches those
+rows only, however large the library is.
+"""
+
+import heapq
+import logging
+from collections import defaultdict
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db
+from models.db_models import Movie, UserMovie, UserStat
+
+TOTAL = "total"
+RATING = "rating"
+DECADE = "decade"
+DIRECTOR = "director"
+
+
+def _buckets(director, year, rating):
+    """Return the (kind, key) counters one library entry counts towards."""
+    buckets = [(TOTAL, "")]
+    if rating is not None:
+        buckets.append((RATING, str(int(rating))))  # 8.5 counts as an 8
+    if year:
+        buckets.append((DECADE, str(int(year) // 10 * 10)))
+    if director:
+        buckets.append((DIRECTOR, director[:100]))
+    return buckets
+
+
+def aggregate(entries, sign=1, into=None):
+    """Sum (director, year, rating) entries into {bucket: [movies, rated, rating_sum]}."""
+    counters = into if into is not None else defaultdict(lambda: [0, 0, 0.0])
+    for director, year, rating in entries:
+        for bucket in _buckets(director, year, rating):
+            counter = counters[bucket]
+            counter[0] += sign
+            if rating is not None:
+                counter[1] += sign
+                counter[2] += sign * float(rating)
+    return counters
+
+
+def is_zero(counter):
+    return counter[0] == 0 and counter[1] == 0 and abs(counter[2]) < 1e-9
+
+
+def _upsert(bind, user_id, counters, chunk_size=1000):
+    """Add counters to the stored ones, a chunk of rows per statement."""
+    rows = [
+        {
+            "user_id": user_id,
+            "kind": kind,
+            "key": key,
+            "movies": movies,
+            "rated": rated,
+            "rating_sum": rating_sum,
+        }
+        for (kind, key), (movies, rated, rating_sum) in counters.items()
+    ]
+    for start in range(0, len(rows), chunk_size):
+        statement = insert(UserStat).values(rows[start : start + chunk_size])
+        bind.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UserStat.user_id, UserStat.kind, UserStat.key],
+                set_={
+                    "movies": UserStat.movies + statement.excluded.movies,
+                    "rated": UserStat.rated + statement.excluded.rated,
+                    "rating_sum": UserStat.rating_sum + statement.excluded.rating_sum,
+                },
+            )
+        )
+
+
+def record_changes(user_id, added=(), removed=()):
+    """Fold added and removed (director, year, rating) entries into the counters.
+
+    Runs in the current transaction (no commit): one upsert, plus one
+    delete of emptied counters when something was removed.
+    """
+    counters = aggregate(added)
+    aggregate(removed, sign=-1, into=counters)
+    counters = {bucket: counter for bucket, counter in counters.items() if not is_zero(counter)}
+    if not counters:
+        return
+    _upsert(db.session, user_id, counters)
+    if removed:
+        db.session.execute(
+            delete(UserStat).where(
+                UserStat.user_id == user_id,
+                UserStat.movies <= 0,
+                tuple_(UserStat.kind, UserStat.key).in_(list(counters)),
+            )
+        )
+
+
+def get_stats(user_id, top_directors=5):
+    """Return a user's movie count, average rating, rating and decade
+    distributions and most-watched directors."""
+    counters = {
+        (kind, key): (movies, rated, rating_sum)
+        for kind, key, movies, rated, rating_sum in db.session.execute(
+            select(UserStat.kind, UserStat.key, UserStat.movies, UserStat.rated, UserStat.rating_sum)
+            .where(UserStat.user_id == user_id, UserStat.kind != DIRECTOR)
+        )
+    }
+    for key, movies in db.session.execute(
+        select(UserStat.key, UserStat.movies)
+        .where(UserStat.user_id == user_id, UserStat.kind == DIRECTOR)
+        .order_by(UserStat.movies.desc(), UserStat.key)
+        .limit(top_directors)
+    ):
+        counters[(DIRECTOR, key)] = (movies, 0, 0.0)
+    return summarize(counters, top_directors)
+
+
+def summarize(counters, top_directors=5):
+    """Shape {(kind, key): (movies, rated, rating_sum)} counters as get_stats returns them."""
+    directors = heapq.nsmallest(
+        top_directors,
+        ((key, counter[0]) for (kind, key), counter in counters.items() if kind == DIRECTOR),
+        key=lambda director: (-director[1], director[0]),
+    )
+    movies, rated, rating_sum = counters.get((TOTAL, ""), (0, 0, 0.0))
+    return {
+        "movie_count": movies,
+        "rated_count": rated,
+        "average_rating": rating_sum / rated if rated else None,
+        "ratings": {
+            score: counters.get((RATING, str(score)), (0,))[0] for score in range(11)
+        },
+        "decades": dict(
+            sorted(
+                (int(key), counter[0]) for (kind, key), counter in counters.items() if kind == DECADE
+            )
+        ),
+        "top_directors": directors,
+    }
+
+
+def _library_counters(bind, user_ids=None):
+    """Recompute every user's counters from their library rows."""
+    statement = (
+        select(UserMovie.user_id, Movie.director, Movie.year, UserMovie.rating)
+        .join(Movie, Movie.id == UserMovie.movie_id)
+        .order_by(UserMovie.user_id)
+    )
+    if user_ids is not None:
+        statement = statement.where(UserMovie.user_id.in_(user_ids))
+    by_user = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0]))
+    for user_id, director, year, rating in bind.execute(statement):
+        aggregate([(director, year, rating)], into=by_user[user_id])
+    return by_user
+
+
+def rebuild(user_ids=None, bind=None):
+    """Recompute the counters of the given users (default: everyone) from scratch.
+
+    Runs in the current transaction of bind (default: db.session); returns
+    the number of users with a non-empty library.
+    """
+    bind = bind if bind is not None else db.session
+    clear = delete(UserStat)
+    if user_ids is not None:
+        clear = clear.where(UserStat.user_id.in_(user_ids))
+    bind.execute(clear)
+    by_user = _library_counters(bind, user_ids)
+    for user_id, counters in by_user.items():
+        _upsert(bind, user_id, counters)
+    logging.info(f"Rebuilt library statistics for {len(by_user)} users.")
+    return len(by_user)
+
+
+def check(user_ids=None):
+    """Return the IDs of users whose stored counters disagree with their library."""
+    expected = _library_counters(db.session, user_ids)
+    statement = select(
+        UserStat.user_id, UserStat.kind, UserStat.key, UserStat.movies, UserStat.rated, UserStat.rating_sum
+    )
+    if user_ids is not None:
+        statement = statement.where(UserStat.user_id.in_(user_ids))
+    stored = defaultdict(dict)
+    for user_id, kind, key, movies, rated, rating_sum in db.session.execute(statement):
+        stored[user_id][(kind, key)] = [movies, rated, rating_sum]
+
+    mismatched = []
+    for user_id in sorted(set(expected) | set(stored)):
+        want, have = expected.get(user_id, {}), stored.get(user_id, {})
+        if set(want) != set(have) or any(
+            want[bucket][:2] != have[bucket][:2] or abs(want[bucket][2] - have[bucket][2]) > 1e-6
+            for bucket in want
+        ):
+            mismatched.append(user_id)
+    return mismatched
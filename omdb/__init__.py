@@ -0,0 +1,6 @@
+from omdb.cache import OMDbCache
+from omdb.client import CircuitBreaker, OMDbClient, OMDbRefused
+from omdb.ratelimit import RateLimiter
+from omdb.singleflight import SingleFlight
+
+__all__ = ["CircuitBreaker", "OMDbCache", "OMDbClient", "OMDbRefused", "RateLimiter", "SingleFlight"]
@@ -0,0 +1,160 @@
+# omdb/async_client.py
+
+import asyncio
+import time
+
+try:
+    import httpx
+except ImportError:  # only the ASGI proxy routes need it
+    httpx = None
+
+from omdb.cache import IMDB_ID, SEARCH, TITLE, make_key
+from omdb.client import OMDB_URL, RETRY, BaseOMDbClient, CircuitBreaker, OMDbRefused
+from omdb.ratelimit import INTERACTIVE, SUGGEST
+
+
+class AsyncOMDbClient(BaseOMDbClient):
+    """asyncio counterpart of OMDbClient for the ASGI proxy routes.
+
+    One pooled httpx.AsyncClient serves every in-flight lookup, so a
+    single worker can wait on hundreds of upstream calls at once. It shares
+    the response cache and rate limiter of the sync client, and its
+    retry/breaker decisions through BaseOMDbClient. The limiter and the
+    cache's SQLite tier block on disk, so every call into them runs in a
+    worker thread to keep the event loop free.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=OMDB_URL,
+        cache=None,
+        connect_timeout=3.05,
+        read_timeout=5.0,
+        max_retries=2,
+        backoff=0.2,
+        max_backoff=2.0,
+        max_connections=100,
+        breaker=None,
+        on_call=None,
+        limiter=None,
+    ):
+        if httpx is None:
+            raise RuntimeError("The async OMDb client needs httpx (pip install httpx).")
+        super().__init__(
+            api_key, base_url, cache, max_retries, backoff, max_backoff, breaker, on_call, limiter
+        )
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+        self._in_flight = {}  # (cache key, priority) -> Future shared by identical lookups
+        self.coalesced_calls = 0
+
+    @classmethod
+    def from_config(cls, config, cache=None, on_call=None, limiter=None):
+        """Create a client from a Flask config mapping."""
+        return cls(
+            api_key=config.get("OMDB_API_KEY"),
+            base_url=config.get("OMDB_BASE_URL", OMDB_URL),
+            cache=cache,
+            connect_timeout=config.get("OMDB_CONNECT_TIMEOUT", 3.05),
+            read_timeout=config.get("OMDB_READ_TIMEOUT", 5.0),
+            max_retries=config.get("OMDB_MAX_RETRIES", 2),
+            backoff=config.get("OMDB_BACKOFF", 0.2),
+            max_backoff=config.get("OMDB_MAX_BACKOFF", 2.0),
+            max_connections=config.get("OMDB_ASYNC_MAX_CONNECTIONS", 100),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get("OMDB_BREAKER_THRESHOLD", 5),
+                reset_timeout=config.get("OMDB_BREAKER_RESET", 30.0),
+            ),
+            on_call=on_call,
+            limiter=limiter,
+        )
+
+    async def available(self, priority=INTERACTIVE):
+        """Return True if the quota would allow a call at this priority now."""
+        if self.limiter is None:
+            return True
+        return await asyncio.to_thread(self.limiter.has_budget, priority)
+
+    async def _acquire(self, priority):
+        if self.limiter is None:
+            return True
+        # acquire() may sleep waiting for a token; keep that off the event loop
+        return await asyncio.to_thread(self.limiter.acquire, priority)
+
+    async def _request(self, params, priority=INTERACTIVE):
+        """Send one logical request upstream; return the JSON payload or None.
+
+        Raises OMDbRefused if the breaker or the quota keeps it from OMDb.
+        """
+        self._start()
+        params = dict(params, apikey=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            if not await self._acquire(priority):
+                self._refuse()
+            started = time.perf_counter()
+            try:
+                response = await self.http.get(self.base_url, params=params)
+            except httpx.HTTPError as e:
+                result = self._settle(started, error=e)
+            else:
+                result = self._settle(started, response)
+            if result is not RETRY:
+                return result
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff_delay(attempt))
+        return self._give_up()
+
+    async def _fetch(self, kind, value, priority, params):
+        payload = await self._request({kind: value, **params}, priority)
+        if payload is not None and self.cache is not None:
+            await asyncio.to_thread(self.cache.set, kind, value, payload)
+        return payload
+
+    async def lookup(self, kind, value, priority=INTERACTIVE, raise_refused=False, **params):
+        """Query OMDb by search (s), title (t) or imdbID (i).
+
+        Returns the decoded JSON payload, or None if OMDb is unavailable or
+        the quota refuses the call; with raise_refused, a call never sent
+        raises OMDbRefused instead. Concurrent identical queries await a
+        single upstream request, as long as they share a priority.
+        """
+        if self.cache is not None:
+            payload = await asyncio.to_thread(self.cache.get, kind, value)
+            if payload is not None:
+                return payload
+
+        key = (make_key(kind, value), priority)  # never share a refusal with another priority
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced_calls += 1
+        else:
+            future = asyncio.ensure_future(self._fetch(kind, value, priority, params))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        try:
+            return await asyncio.shield(future)
+        except OMDbRefused:
+            if raise_refused:
+                raise
+            return None
+
+    async def search(self, query, priority=SUGGEST):
+        """Search titles matching a partial query."""
+        return await self.lookup(SEARCH, query, priority)
+
+    async def get_by_title(self, title, priority=INTERACTIVE):
+        """Fetch full details for an exact title."""
+        return await self.lookup(TITLE, title, priority, plot="full")
+
+    async def get_by_id(self, imdb_id, priority=INTERACTIVE, raise_refused=False):
+        """Fetch full details for an imdbID."""
+        return await self.lookup(IMDB_ID, imdb_id, priority, raise_refused, plot="full")
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.http.aclose()
@@ -0,0 +1,255 @@
+# omdb/cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Query kinds understood by the OMDb API
+SEARCH = "s"
+TITLE = "t"
+IMDB_ID = "i"
+
+_MISSING = object()
+
+
+def make_key(kind, value):
+    """Build a normalized cache key for an OMDb query."""
+    return f"{kind}:{' '.join(str(value).lower().split())}"
+
+
+class LRUCache:
+    """Size-bounded in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds, evicting the oldest entries."""
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def items(self):
+        """Return a snapshot of (key, value) pairs, expired entries included."""
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent cache tier stored in a small SQLite table."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS omdb_cache ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Return the stored payload for key, or default if missing or expired."""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return (payload, expires_at) for key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM omdb_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, expires_at = row
+            if expires_at <= time.time():
+                self._conn.execute("DELETE FROM omdb_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(payload), expires_at
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO omdb_cache (key, payload, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+
+    def values(self, prefix=""):
+        """Return every unexpired payload whose key starts with prefix."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM omdb_cache WHERE key LIKE ? AND expires_at > ?",
+                (prefix + "%", time.time()),
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def purge_expired(self):
+        """Delete expired rows and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM omdb_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove all rows."""
+        with self._lock:
+            self._conn.execute("DELETE FROM omdb_cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM omdb_cache").fetchone()[0]
+
+
+class OMDbCache:
+    """Two-tier (memory + SQLite) cache for raw OMDb responses."""
+
+    def __init__(self, max_size=1024, path=None, positive_ttl=86400, negative_ttl=3600):
+        self.memory = LRUCache(max_size)
+        self.disk = SQLiteCache(path) if path else None
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a cache from a Flask config mapping."""
+        return cls(
+            max_size=config.get("OMDB_CACHE_SIZE", 1024),
+            path=config.get("OMDB_CACHE_PATH"),
+            positive_ttl=config.get("OMDB_CACHE_TTL", 86400),
+            negative_ttl=config.get("OMDB_CACHE_NEGATIVE_TTL", 3600),
+        )
+
+    def ttl_for(self, payload):
+        """Return the TTL for a payload; "Response: False" answers expire sooner."""
+        if payload.get("Response") == "True":
+            return self.positive_ttl
+        return self.negative_ttl
+
+    def get(self, kind, value):
+        """Return the cached payload for a query, or None."""
+        key = make_key(kind, value)
+        payload = self.memory.get(key)
+        if payload is not None:
+            return payload
+
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                payload, expires_at = entry
+                # Promote to the memory tier for the remaining lifetime only
+                self.memory.set(key, payload, expires_at - time.time())
+                return payload
+        return None
+
+    def set(self, kind, value, payload):
+        """Store an OMDb payload in both tiers."""
+        key = make_key(kind, value)
+        ttl = self.ttl_for(payload)
+        self.memory.set(key, payload, ttl)
+        if self.disk is not None:
+            self.disk.set(key, payload, ttl)
+
+    def get_or_fetch(self, kind, value, fetch):
+        """Return the cached payload or call fetch() and cache its result.
+
+        fetch() returns the decoded OMDb JSON, or None when the upstream
+        request failed; failures are never cached.
+        """
+        payload = self.get(kind, value)
+        if payload is not None:
+            return payload
+
+        payload = fetch()
+        if payload is not None:
+            self.set(kind, value, payload)
+        return payload
+
+    def stored_payloads(self, kind):
+        """Return the persisted payloads for one query kind."""
+        if self.disk is None:
+            return []
+        return self.disk.values(f"{kind}:")
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters for both tiers."""
+        stats = {
+            "memory_size": len(self.memory),
+            "memory_max_size": self.memory.max_size,
+            "memory_hits": self.memory.hits,
+            "memory_misses": self.memory.misses,
+            "memory_evictions": self.memory.evictions,
+            "memory_expirations": self.memory.expirations,
+        }
+        if self.disk is not None:
+            stats.update(
+                {
+                    "disk_hits": self.disk.hits,
+                    "disk_misses": self.disk.misses,
+                    "disk_expirations": self.disk.expirations,
+                }
+            )
+        return stats
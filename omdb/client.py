@@ -0,0 +1,304 @@
+# omdb/client.py
+
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from omdb.cache import IMDB_ID, SEARCH, TITLE, make_key
+from omdb.ratelimit import INTERACTIVE, SUGGEST
+from omdb.singleflight import SingleFlight
+
+OMDB_URL = "http://www.omdbapi.com/"
+
+RETRY = object()  # _settle result: the attempt failed in a way worth retrying
+
+
+class OMDbRefused(Exception):
+    """The breaker or the quota kept a call from being sent to OMDb."""
+
+
+class CircuitBreaker:
+    """Stops calling an unhealthy upstream until a cool-down has passed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a request may be sent upstream."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let a single trial request through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def is_open(self):
+        """Return True while requests are refused, without using up the trial request."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at < self.reset_timeout
+            return self.state == self.HALF_OPEN
+
+    def release(self):
+        """Hand back an unused trial request, e.g. one the quota refused."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN  # opened_at is unchanged, so the next call may try
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a failed request, opening the breaker past the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning("OMDb circuit breaker opened.")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class BaseOMDbClient:
+    """Retry, breaker and quota decisions shared by the sync and async clients.
+
+    Subclasses own the transport and run the request loop; every decision
+    about an attempt's outcome is made here, so both clients behave alike.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key,
+        base_url=OMDB_URL,
+        cache=None,
+        max_retries=2,
+        backoff=0.2,
+        max_backoff=2.0,
+        breaker=None,
+        on_call=None,
+        limiter=None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter  # shared RateLimiter, or None for no quota
+        self.on_call = on_call  # called with (seconds, ok) after each upstream attempt
+
+        self.upstream_calls = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.rate_limited = 0
+
+    def _backoff_delay(self, attempt):
+        """Return a jittered, bounded exponential backoff in seconds."""
+        delay = min(self.max_backoff, self.backoff * (2**attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _observe(self, started, ok):
+        if self.on_call is not None:
+            self.on_call(time.perf_counter() - started, ok)
+
+    def _start(self):
+        """Raise OMDbRefused unless the breaker lets this request go upstream."""
+        if not self.breaker.allow():
+            self.short_circuits += 1
+            logging.warning("OMDb circuit breaker is open; skipping upstream call.")
+            raise OMDbRefused("circuit breaker open")
+
+    def _refuse(self):
+        """Give up on a request the quota refused before it reached OMDb."""
+        self.rate_limited += 1
+        self.breaker.release()
+        logging.warning("OMDb quota exhausted; skipping upstream call.")
+        raise OMDbRefused("quota exhausted")
+
+    def _settle(self, started, response=None, error=None):
+        """Judge one attempt: return the payload, None to stop, or RETRY."""
+        self.upstream_calls += 1
+        if error is not None:
+            self._observe(started, False)
+            logging.error(f"OMDb request error: {error!r}")
+            return RETRY
+
+        status = response.status_code
+        self._observe(started, status == 200)
+        if status != 200:
+            logging.error(f"OMDb API request failed with status code {status}")
+            if status in self.RETRY_STATUSES:
+                return RETRY
+            # Client errors (e.g. a bad key or the daily limit) are not
+            # retried, but still settle a half-open trial
+            self.failures += 1
+            self.breaker.record_failure()
+            return None
+        try:
+            payload = response.json()
+        except ValueError:
+            logging.error("OMDb returned an invalid JSON body.")
+            return RETRY
+        self.breaker.record_success()
+        return payload
+
+    def _give_up(self):
+        """Record a request whose every attempt failed."""
+        self.failures += 1
+        self.breaker.record_failure()
+        return None
+
+    def available(self, priority=INTERACTIVE):
+        """Return True if the quota would allow a call at this priority now."""
+        return self.limiter is None or self.limiter.has_budget(priority)
+
+    def stats(self):
+        """Return upstream call counters and the breaker state."""
+        return {
+            "upstream_calls": self.upstream_calls,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            "rate_limited": self.rate_limited,
+            "coalesced_calls": self.coalesced_calls,
+            "breaker_state": self.breaker.state,
+        }
+
+
+class OMDbClient(BaseOMDbClient):
+    """Shared OMDb API client with pooling, timeouts, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        api_key,
+        base_url=OMDB_URL,
+        cache=None,
+        connect_timeout=3.05,
+        read_timeout=5.0,
+        max_retries=2,
+        backoff=0.2,
+        max_backoff=2.0,
+        pool_size=10,
+        breaker=None,
+        on_call=None,
+        limiter=None,
+    ):
+        super().__init__(
+            api_key, base_url, cache, max_retries, backoff, max_backoff, breaker, on_call, limiter
+        )
+        self.timeout = (connect_timeout, read_timeout)
+        self.flight = SingleFlight()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, config, cache=None, on_call=None, limiter=None):
+        """Create a client from a Flask config mapping."""
+        return cls(
+            api_key=config.get("OMDB_API_KEY"),
+            base_url=config.get("OMDB_BASE_URL", OMDB_URL),
+            cache=cache,
+            connect_timeout=config.get("OMDB_CONNECT_TIMEOUT", 3.05),
+            read_timeout=config.get("OMDB_READ_TIMEOUT", 5.0),
+            max_retries=config.get("OMDB_MAX_RETRIES", 2),
+            backoff=config.get("OMDB_BACKOFF", 0.2),
+            max_backoff=config.get("OMDB_MAX_BACKOFF", 2.0),
+            pool_size=config.get("OMDB_POOL_SIZE", 10),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get("OMDB_BREAKER_THRESHOLD", 5),
+                reset_timeout=config.get("OMDB_BREAKER_RESET", 30.0),
+            ),
+            on_call=on_call,
+            limiter=limiter,
+        )
+
+    @property
+    def coalesced_calls(self):
+        return self.flight.saved
+
+    def _request(self, params, priority=INTERACTIVE):
+        """Send one logical request upstream; return the JSON payload or None.
+
+        Raises OMDbRefused if the breaker or the quota keeps it from OMDb.
+        """
+        self._start()
+        params = dict(params, apikey=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None and not self.limiter.acquire(priority):
+                self._refuse()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                result = self._settle(started, error=e)
+            else:
+                result = self._settle(started, response)
+            if result is not RETRY:
+                return result
+            if attempt < self.max_retries:
+                time.sleep(self._backoff_delay(attempt))
+        return self._give_up()
+
+    def lookup(self, kind, value, priority=INTERACTIVE, raise_refused=False, **params):
+        """Query OMDb by search (s), title (t) or imdbID (i).
+
+        Returns the decoded JSON payload, or None if OMDb is unavailable or
+        the quota refuses the call at this priority; with raise_refused, a
+        call never sent raises OMDbRefused instead. Concurrent identical
+        queries at the same priority share a single upstream request; the
+        quota may refuse one priority and not another, so they never mix.
+        """
+
+        def fetch():
+            return self.flight.do(
+                (make_key(kind, value), priority),
+                lambda: self._request({kind: value, **params}, priority),
+            )
+
+        try:
+            if self.cache is None:
+                return fetch()
+            return self.cache.get_or_fetch(kind, value, fetch)
+        except OMDbRefused:
+            if raise_refused:
+                raise
+            return None
+
+    def search(self, query, priority=SUGGEST):
+        """Search titles matching a partial query."""
+        return self.lookup(SEARCH, query, priority)
+
+    def get_by_title(self, title, priority=INTERACTIVE):
+        """Fetch full details for an exact title."""
+        return self.lookup(TITLE, title, priority, plot="full")
+
+    def get_by_id(self, imdb_id, priority=INTERACTIVE, raise_refused=False):
+        """Fetch full details for an imdbID."""
+        return self.lookup(IMDB_ID, imdb_id, priority, raise_refused, plot="full")
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
@@ -0,0 +1,162 @@
+# omdb/ratelimit.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# Call priorities, most important first
+INTERACTIVE = 0  # detail lookups a user is waiting for
+SUGGEST = 1  # autocomplete keystrokes
+BACKGROUND = 2  # enrichment worker
+PRIORITY_NAMES = {INTERACTIVE: "interactive", SUGGEST: "suggest", BACKGROUND: "background"}
+
+# Share of the daily budget each priority must leave for the ones above it
+DEFAULT_RESERVES = {INTERACTIVE: 0.0, SUGGEST: 0.2, BACKGROUND: 0.5}
+# Seconds a caller may wait for a token before giving up
+DEFAULT_MAX_WAITS = {INTERACTIVE: 2.0, SUGGEST: 0.0, BACKGROUND: 30.0}
+
+
+def _today():
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class RateLimiter:
+    """Token bucket plus daily call budget for the OMDb API key.
+
+    State lives in a SQLite file, so every process using the same path
+    shares one bucket and one budget. Lower priorities stop early: they may
+    not dip into the share of the daily budget reserved for higher ones, and
+    they leave part of the bucket's burst for interactive calls.
+    """
+
+    def __init__(self, path, daily_limit=1000, rate=5.0, burst=10, reserves=None, max_waits=None):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.rate = rate
+        self.burst = burst
+        self.reserves = {**DEFAULT_RESERVES, **(reserves or {})}
+        self.max_waits = {**DEFAULT_MAX_WAITS, **(max_waits or {})}
+        # Tokens lower priorities leave in the bucket for higher ones
+        self.headroom = {
+            priority: burst * min(reserve, 0.5) for priority, reserve in self.reserves.items()
+        }
+        self.granted = Counter()
+        self.denied = Counter()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS omdb_quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS omdb_bucket ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO omdb_bucket (id, tokens, updated) VALUES (1, ?, ?)",
+            (burst, time.time()),
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a limiter from a Flask config mapping."""
+        return cls(
+            path=config.get("OMDB_QUOTA_PATH") or config.get("OMDB_CACHE_PATH"),
+            daily_limit=config.get("OMDB_DAILY_LIMIT", 1000),
+            rate=config.get("OMDB_RATE", 5.0),
+            burst=config.get("OMDB_BURST", 10),
+            reserves={
+                SUGGEST: config.get("OMDB_SUGGEST_RESERVE", DEFAULT_RESERVES[SUGGEST]),
+                BACKGROUND: config.get("OMDB_BACKGROUND_RESERVE", DEFAULT_RESERVES[BACKGROUND]),
+            },
+        )
+
+    def _state(self):
+        """Return (tokens now, calls used today); caller holds the lock."""
+        tokens, updated = self._conn.execute(
+            "SELECT tokens, updated FROM omdb_bucket WHERE id = 1"
+        ).fetchone()
+        tokens = min(self.burst, tokens + (time.time() - updated) * self.rate)
+        row = self._conn.execute("SELECT used FROM omdb_quota WHERE day = ?", (_today(),)).fetchone()
+        return tokens, row[0] if row else 0
+
+    def _over_budget(self, priority, used):
+        return self.daily_limit - used <= self.daily_limit * self.reserves[priority]
+
+    def _take(self, priority):
+        tokens, used = self._state()
+        if self._over_budget(priority, used):
+            return None
+        needed = 1 + self.headroom[priority]
+        if tokens < needed:
+            return (needed - tokens) / self.rate
+        self._conn.execute(
+            "UPDATE omdb_bucket SET tokens = ?, updated = ? WHERE id = 1",
+            (tokens - 1, time.time()),
+        )
+        self._conn.execute(
+            "INSERT INTO omdb_quota (day, used) VALUES (?, 1) "
+            "ON CONFLICT (day) DO UPDATE SET used = used + 1",
+            (_today(),),
+        )
+        return 0
+
+    def _try_acquire(self, priority):
+        """Take one token and one call from the budget if allowed.
+
+        Returns 0 on success, the seconds to wait for a token, or None when
+        the daily budget is spent for this priority.
+        """
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, serializing processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = self._take(priority)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def acquire(self, priority=INTERACTIVE, max_wait=None):
+        """Wait for permission to make one upstream call; return True if granted."""
+        if max_wait is None:
+            max_wait = self.max_waits[priority]
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._try_acquire(priority)
+            if wait == 0:
+                self.granted[priority] += 1
+                return True
+            if wait is None or time.monotonic() + wait > deadline:
+                self.denied[priority] += 1
+                return False
+            time.sleep(wait)
+
+    def has_budget(self, priority=INTERACTIVE):
+        """Return True if a call at this priority could be made right now."""
+        with self._lock:
+            tokens, used = self._state()
+        if self._over_budget(priority, used):
+            return False
+        return self.max_waits[priority] > 0 or tokens >= 1 + self.headroom[priority]
+
+    def stats(self):
+        """Return the remaining budget, bucket level and per-priority decisions."""
+        with self._lock:
+            tokens, used = self._state()
+        stats = {
+            "daily_limit": self.daily_limit,
+            "used_today": used,
+            "remaining_today": max(0, self.daily_limit - used),
+            "tokens": tokens,
+        }
+        for priority, name in PRIORITY_NAMES.items():
+            stats[f"{name}_granted"] = self.granted[priority]
+            stats[f"{name}_denied"] = self.denied[priority]
+        return stats
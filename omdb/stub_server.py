@@ -0,0 +1,191 @@
+# omdb/stub_server.py
+"""Local stand-in for the OMDb API, for offline tests and benchmarks.
+
+Run it with ``python -m omdb.stub_server --port 8765`` and point the app at
+it with ``OMDB_BASE_URL=http://127.0.0.1:8765/``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MOVIES = [
+    {
+        "Title": "Alien",
+        "Year": "1979",
+        "imdbID": "tt0078748",
+        "Director": "Ridley Scott",
+        "imdbRating": "8.5",
+        "Genre": "Horror, Sci-Fi",
+        "Runtime": "117 min",
+        "Plot": "The crew of a commercial spacecraft encounter a deadly lifeform.",
+        "Poster": "N/A",
+    },
+    {
+        "Title": "Aliens",
+        "Year": "1986",
+        "imdbID": "tt0090605",
+        "Director": "James Cameron",
+        "imdbRating": "8.4",
+        "Genre": "Action, Adventure, Sci-Fi",
+        "Runtime": "137 min",
+        "Plot": "Ellen Ripley returns to the planet where her crew met the creature.",
+        "Poster": "N/A",
+    },
+    {
+        "Title": "The Matrix",
+        "Year": "1999",
+        "imdbID": "tt0133093",
+        "Director": "Lana Wachowski, Lilly Wachowski",
+        "imdbRating": "8.7",
+        "Genre": "Action, Sci-Fi",
+        "Runtime": "136 min",
+        "Plot": "A computer hacker learns the true nature of his reality.",
+        "Poster": "N/A",
+    },
+    {
+        "Title": "Harry Potter and the Deathly Hallows: Part 2",
+        "Year": "2011",
+        "imdbID": "tt1201607",
+        "Director": "David Yates",
+        "imdbRating": "8.1",
+        "Genre": "Adventure, Family, Fantasy",
+        "Runtime": "130 min",
+        "Plot": "Harry, Ron and Hermione search for Voldemort's remaining Horcruxes.",
+        "Poster": "N/A",
+    },
+]
+
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+
+
+def answer(params, movies=MOVIES):
+    """Build the OMDb-style JSON answer for a parsed query string."""
+    if "s" in params:
+        query = params["s"].lower()
+        matches = [m for m in movies if query in m["Title"].lower()]
+        if not matches:
+            return NOT_FOUND
+        return {
+            "Search": [
+                {"Title": m["Title"], "Year": m["Year"], "imdbID": m["imdbID"], "Type": "movie"}
+                for m in matches
+            ],
+            "totalResults": str(len(matches)),
+            "Response": "True",
+        }
+
+    if "i" in params:
+        matches = [m for m in movies if m["imdbID"] == params["i"]]
+    elif "t" in params:
+        matches = [m for m in movies if m["Title"].lower() == params["t"].lower()]
+    else:
+        return {"Response": "False", "Error": "Incorrect IMDb ID."}
+
+    if not matches:
+        return NOT_FOUND
+    return dict(matches[0], Response="True")
+
+
+class StubOMDbHandler(BaseHTTPRequestHandler):
+    """Serve OMDb-style answers, optionally injecting delays and failures."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            fail = server.fail_remaining > 0
+            if fail:
+                server.fail_remaining -= 1
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        if fail:
+            self.send_response(server.fail_status)
+            self.end_headers()
+            return
+
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        body = json.dumps(answer(params, server.movies)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+
+class StubOMDbServer:
+    """Threaded stub server usable as a context manager."""
+
+    def __init__(self, host="127.0.0.1", port=0, movies=None, delay=0.0):
+        self.httpd = ThreadingHTTPServer((host, port), StubOMDbHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.fail_remaining = 0
+        self.httpd.fail_status = 503
+        self.httpd.delay = delay
+        self.httpd.movies = movies if movies is not None else MOVIES
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    def set_delay(self, seconds):
+        """Delay every response by the given number of seconds."""
+        self.httpd.delay = seconds
+
+    def fail_next(self, count, status=503):
+        """Answer the next count requests with an HTTP error status."""
+        with self.httpd.lock:
+            self.httpd.fail_remaining = count
+            self.httpd.fail_status = status
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub OMDb API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per response")
+    args = parser.parse_args()
+
+    server = StubOMDbServer(args.host, args.port, delay=args.delay)
+    print(f"Stub OMDb API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
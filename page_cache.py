@@ -0,0 +1,75 @@
+"""Conditional GET and rendered-page caching driven by data version stamps.
+
+Write paths bump a version counter stored in the database (see
+SQLiteDataManager.get_data_versions), so every worker process computes the
+same ETag for the same data and a cached page can never outlive its data.
+"""
+
+import hashlib
+import time
+
+from flask import current_app, g, make_response, request, session
+from flask_wtf.csrf import generate_csrf
+
+from omdb.cache import LRUCache
+
+# Stands in for the per-session CSRF token inside cached HTML
+CSRF_PLACEHOLDER = "__CSRF_TOKEN_PLACEHOLDER__"
+
+
+class PageCache:
+    """Serve 304s and cached HTML for pages keyed by data versions."""
+
+    def __init__(self, max_size=256, ttl=3600):
+        self.pages = LRUCache(max_size)
+        self.ttl = ttl
+        self.not_modified = 0
+
+    def etag_for(self, versions):
+        """Build the ETag for the current request and data versions.
+
+        Pages embed a CSRF token bound to the session and valid for
+        WTF_CSRF_TIME_LIMIT seconds, so the tag also changes with the session
+        and every half time limit; a browser never re-uses an expired token.
+        """
+        parts = [request.full_path, repr(versions), session.get("csrf_token", "")]
+        time_limit = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+        if time_limit:
+            parts.append(str(int(time.time() // (time_limit / 2))))
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def respond(self, versions, render):
+        """Answer with 304, cached HTML, or a freshly rendered page.
+
+        render() is only called when no cached copy matches.
+        """
+        etag = self.etag_for(versions)
+        if request.if_none_match.contains(etag):
+            self.not_modified += 1
+            response = make_response("", 304)
+            response.set_etag(etag)
+            return response
+
+        key = (request.full_path, versions)
+        body = self.pages.get(key)
+        if body is None:
+            body = render()
+            token = g.get("csrf_token")
+            cached = body.replace(token, CSRF_PLACEHOLDER) if token else body
+            self.pages.set(key, cached, self.ttl)
+        elif CSRF_PLACEHOLDER in body:
+            body = body.replace(CSRF_PLACEHOLDER, generate_csrf())
+
+        response = make_response(body)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"  # always revalidate
+        return response
+
+    def stats(self):
+        return {
+            "pages": len(self.pages),
+            "hits": self.pages.hits,
+            "misses": self.pages.misses,
+            "evictions": self.pages.evictions,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,38 @@
+"""Check or rebuild the per-user library statistics in user_stats.
+
+Usage:
+    python rebuild_stats.py                 # recompute every user's statistics
+    python rebuild_stats.py --user 3 7      # recompute these users only
+    python rebuild_stats.py --check         # report drifted users, exit 1 if any
+"""
+
+import argparse
+import sys
+
+from app import app, data_manager
+from models import db, user_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", type=int, nargs="+", dest="user_ids", help="user IDs (default: all)")
+    parser.add_argument("--check", action="store_true", help="only compare with the libraries")
+    args = parser.parse_args()
+
+    with app.app_context():
+        data_manager.get_data_versions()  # opening the data manager migrates the schema
+        if args.check:
+            mismatched = user_stats.check(args.user_ids)
+            if mismatched:
+                print(f"Statistics differ from the library for users: {', '.join(map(str, mismatched))}")
+                return 1
+            print("Statistics match the libraries.")
+            return 0
+        count = user_stats.rebuild(args.user_ids)
+        db.session.commit()
+        print(f"Rebuilt statistics for {count} users.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Background worker that rebuilds movie recommendations when libraries change.
+
+Usage:
+    python recommend_worker.py              # check every RECOMMEND_REFRESH_INTERVAL seconds
+    python recommend_worker.py --once       # rebuild if stale, then exit
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from app import app, data_manager
+from models.data_manager import USERS_SCOPE
+from models.recommendations import run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild movie recommendations when libraries change.")
+    parser.add_argument("--once", action="store_true", help="exit after one check")
+    parser.add_argument("--top-k", type=int, default=app.config["RECOMMEND_TOP_K"])
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    with app.app_context():
+        # Every library write bumps the "users" version, so it tells when to rebuild
+        rebuilds = run_worker(
+            lambda: data_manager.get_data_versions(USERS_SCOPE)[0],
+            poll_interval=app.config["RECOMMEND_REFRESH_INTERVAL"],
+            stop=stop,
+            once=args.once,
+            top_k=args.top_k,
+            min_common=app.config["RECOMMEND_MIN_COMMON"],
+            max_library=app.config["RECOMMEND_MAX_LIBRARY"],
+        )
+        logging.info(f"Recommendation worker stopped after {rebuilds} rebuilds.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Per-app services, each built on first use rather than at import time."""
+
+import logging
+import threading
+import time
+
+from models import catalog, db
+from models.caching_data_manager import CachingDataManager
+from models.data_manager import SQLiteDataManager
+from models.db_models import CatalogTitle
+from models.job_queue import JobQueue
+from models.memory_data_manager import InMemoryDataManager
+from models.title_index import TitleIndex
+from omdb import OMDbCache, OMDbClient, RateLimiter
+from omdb.cache import IMDB_ID, SEARCH
+from page_cache import PageCache
+
+EXTENSION = "movieweb"
+
+
+class lazy:
+    """Like functools.cached_property, but builds the value only once under concurrent first use."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
+
+
+class Services:
+    """The data manager, caches and OMDb client of one Flask app."""
+
+    def __init__(self, app, instrumentation=None):
+        self.app = app
+        self.instrumentation = instrumentation
+        self._lock = threading.RLock()  # factories may use other services
+        self._title_index = TitleIndex()
+        self.page_cache = PageCache(app.config["PAGE_CACHE_SIZE"])
+        self.jobs = JobQueue.from_config(app.config)
+
+    @lazy
+    def data_manager(self):
+        """Open the configured backend; for SQLite apply PRAGMAs, migrate and create tables. Loads the title index."""
+        started = time.perf_counter()
+        config = self.app.config
+        backend = config["DATA_MANAGER_BACKEND"]
+        if backend == "memory":
+            manager = InMemoryDataManager.from_config(config, title_index=self._title_index)
+            with self.app.app_context():
+                manager.load_database()
+        elif backend == "sqlite":
+            manager = SQLiteDataManager(
+                self.app,
+                title_index=self._title_index,
+                jobs=self.jobs if config["ENRICH_ON_ADD"] else None,
+            )
+        else:
+            raise ValueError(f"Unknown DATA_MANAGER_BACKEND: {backend!r}")
+        if config["DATA_MANAGER_CACHE"]:
+            manager = CachingDataManager.from_config(manager, config)
+
+        # Titles seen in earlier OMDb answers also feed local suggestions
+        for payload in self.omdb_cache.stored_payloads(SEARCH):
+            self._title_index.add_search_results(payload)
+        for payload in self.omdb_cache.stored_payloads(IMDB_ID):
+            self._title_index.add_details(payload)
+        logging.info(f"Data manager ready in {time.perf_counter() - started:.3f}s.")
+        return manager
+
+    @property
+    def title_index(self):
+        """The title index, loaded with library titles on first use."""
+        self.data_manager
+        return self._title_index
+
+    @lazy
+    def catalog(self):
+        """The offline catalog, once its table exists (the memory backend creates none)."""
+        self.data_manager  # SQLite: migrate and create every table first
+        with self.app.app_context():
+            CatalogTitle.__table__.create(db.engine, checkfirst=True)
+        return catalog
+
+    @lazy
+    def omdb_cache(self):
+        return OMDbCache.from_config(self.app.config)
+
+    @lazy
+    def omdb_limiter(self):
+        return RateLimiter.from_config(self.app.config)
+
+    @lazy
+    def omdb_client(self):
+        on_call = self.instrumentation.record_omdb_call if self.instrumentation else None
+        return OMDbClient.from_config(
+            self.app.config, cache=self.omdb_cache, on_call=on_call, limiter=self.omdb_limiter
+        )
+
+    def _read_engine(self):
+        """Return the data manager's read-only engine, if it was built with one."""
+        manager = self.__dict__.get("data_manager")
+        return getattr(getattr(manager, "backend", manager), "read_engine", None)
+
+    def after_fork(self):
+        """Drop database and OMDb connections inherited from the parent process.
+
+        Call in every forked worker before it serves: SQLite connections
+        must never be used by two processes. Pooled connections are left
+        unclosed for the parent to keep using; the OMDb cache, limiter and
+        client are rebuilt on next use.
+        """
+        self._lock = threading.RLock()  # may have been held by a parent thread
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+        read_engine = self._read_engine()
+        if read_engine is not None:
+            read_engine.dispose(close=False)
+        for name in ("omdb_client", "omdb_limiter", "omdb_cache"):
+            self.__dict__.pop(name, None)
+
+    def close(self):
+        """Close database and OMDb connections at shutdown."""
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        read_engine = self._read_engine()
+        if read_engine is not None:
+            read_engine.dispose()
+        client = self.__dict__.get("omdb_client")
+        if client is not None:
+            client.close()
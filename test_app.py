@@ -1,39 +1,15 @@
 import logging
 import pytest
-from app import app, db
-from models.db_models import User, Movie
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,  # Log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.FileHandler("app.log"),  # Log to file 'app.log'
-        logging.StreamHandler(),  # Continue logging to the terminal
-    ],
-)
-logging.basicConfig(
-    level=logging.ERROR,  # Log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.FileHandler("app.log"),  # Log to file 'app.log'
-        logging.StreamHandler(),  # Continue logging to the terminal
-    ],
-)
-
-
-
-@pytest.fixture
-def client():
-    """Fixture to set up a Flask test client."""
-    app.config["TESTING"] = True
-    app.config["WTF_CSRF_ENABLED"] = False
+from app import create_app
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def client(request):
+    """Fixture to set up a Flask test client on its own in-memory database, for each backend."""
+    app = create_app("config.TestConfig")
+    app.config["DATA_MANAGER_BACKEND"] = request.param
     with app.test_client() as client:
-        with app.app_context():
-            db.create_all()  # Create the database and tables for testing
         yield client
-        with app.app_context():
-            db.drop_all()  # Clean up after tests
 
 
 def test_home_page(client):
@@ -77,7 +53,6 @@ def test_add_movie(client):
         },
         follow_redirects=True
     )
-    print(response.data)  # Log the response data for debugging
     assert response.status_code == 200
     assert b"Test Movie" in response.data  # Check if the movie was added
 
@@ -107,6 +82,18 @@ def test_delete_movie(client):
 
     # Now delete the movie
     response = client.post("/users/1/delete_movie/1", follow_redirects=True)
-    print(response.data)  # Log the response for debugging
     assert response.status_code == 200
     assert b"Test Movie" not in response.data  # Ensure the movie is deleted
+
+
+def test_filter_with_no_matches_keeps_form(client):
+    """Test that an empty filtered page still offers the filters and a way to clear them."""
+    client.post("/add_user", data={"name": "Test User"})
+    movie = {"name": "Alien", "director": "Ridley Scott", "year": "1979", "rating": "8"}
+    client.post("/users/1/add_movie", data=movie)
+
+    response = client.get("/user/1?director=Nobody")
+    assert response.status_code == 200
+    assert b"Alien" not in response.data
+    assert b'name="director"' in response.data
+    assert b">Clear</a>" in response.data
@@ -0,0 +1,45 @@
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from models import db
+from models.db_models import User
+from services import EXTENSION
+
+
+def test_create_app_defers_database_and_omdb_setup():
+    """Test that building an app and serving a static page open nothing."""
+    app = create_app("config.TestConfig")
+    services = app.extensions[EXTENSION]
+    connects = []
+    with app.app_context():
+        event.listen(db.engine, "connect", lambda *args: connects.append(args))
+
+    assert app.test_client().get("/").status_code == 200
+    assert connects == []
+    assert "data_manager" not in vars(services)
+    assert "omdb_client" not in vars(services)
+
+    assert app.test_client().get("/users").status_code == 200
+    assert connects
+    assert "data_manager" in vars(services)
+    assert "omdb_client" not in vars(services)
+
+
+def test_dict_config_overrides_defaults():
+    """Test that a dict config is applied on top of config.Config."""
+    app = create_app({"USERS_PER_PAGE": 7})
+    assert app.config["USERS_PER_PAGE"] == 7
+    assert app.config["MOVIES_PER_PAGE"] == Config.MOVIES_PER_PAGE
+
+
+def test_apps_are_isolated():
+    """Test that each test app has its own database and services."""
+    first, second = create_app("config.TestConfig"), create_app("config.TestConfig")
+
+    first.test_client().post("/add_user", data={"name": "Only In First"})
+    assert b"Only In First" in first.test_client().get("/users").data
+    assert b"Only In First" not in second.test_client().get("/users").data
+    with second.app_context():
+        assert db.session.query(User).count() == 0
+    assert first.extensions[EXTENSION].page_cache is not second.extensions[EXTENSION].page_cache
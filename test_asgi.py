@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from app import create_app
+from asgi import ProxyApp
+from omdb.async_client import AsyncOMDbClient
+from omdb.stub_server import StubOMDbServer
+from services import EXTENSION
+
+
+def call(app, path, query=""):
+    """Send one GET through the ASGI app; return (status, decoded JSON)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query.encode()}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_local_answers_match_flask_views():
+    """Test that answers needing no upstream call match the WSGI routes."""
+    flask_app = create_app("config.TestConfig")
+    flask_app.config["SUGGESTIONS_MIN_LOCAL"] = 1
+    flask_app.extensions[EXTENSION].title_index.add("Alien", 1979, "tt0078748")
+    proxy = ProxyApp(flask_app)
+    client = flask_app.test_client()
+
+    for path, query in [
+        ("/movie_suggestions", "query=ali"),
+        ("/movie_suggestions", ""),
+        ("/movie_details", ""),
+    ]:
+        expected = client.get(f"{path}?{query}")
+        assert call(proxy, path, query) == (expected.status_code, expected.get_json())
+    assert call(proxy, "/users")[0] == 404
+    assert proxy._client is None  # nothing went upstream
+
+
+def test_details_fetched_upstream(app):
+    """Test an upstream lookup through the async client, coalescing duplicates."""
+    pytest.importorskip("httpx")
+    with StubOMDbServer() as stub:
+        app.config["OMDB_BASE_URL"] = stub.url
+        proxy = ProxyApp(app)
+        status, body = call(proxy, "/movie_details", "imdbID=tt0078748")
+        assert status == 200
+        assert body == {
+            "title": "Alien",
+            "director": "Ridley Scott",
+            "year": "1979",
+            "rating": "8.5",
+        }
+
+        async def burst():
+            # A new client: httpx pools are bound to the event loop that used them
+            client = AsyncOMDbClient.from_config(app.config)
+            results = await asyncio.gather(*(client.search("star") for _ in range(20)))
+            await client.aclose()
+            return results
+
+        results = asyncio.run(burst())
+        assert all(result == results[0] for result in results)
+        assert stub.request_count == 2
+
@@ -0,0 +1,84 @@
+import pytest
+
+from models import db
+from models.caching_data_manager import CachingDataManager, MovieRecord
+from models.db_models import User
+from models.enrichment import apply_details
+
+
+@pytest.fixture
+def cached(ctx, data_manager):
+    """A caching manager over a fresh test app's SQLite manager."""
+    return CachingDataManager(data_manager, max_size=8)
+
+
+def test_reads_are_served_from_cache(cached, count_queries):
+    """Test that repeat reads skip SQLite and return immutable records."""
+    user = cached.add_user(User(name="Ann"))
+    entry = cached.add_movie(user.id, "Alien", "Ridley Scott", 1979, 8)
+    first = cached.get_user_movies(user.id)
+    cached.get_movie(entry.id)
+    cached.get_all_users()
+
+    with count_queries() as queries:
+        assert cached.get_user_movies(user.id) == first
+        assert cached.get_movie(entry.id).name == "Alien"
+        assert [u.name for u in cached.get_all_users()] == ["Ann"]
+    assert queries.count == 0
+    assert isinstance(first, tuple) and isinstance(first[0], MovieRecord)
+    stats = cached.stats()
+    assert stats["hit_ratio"] == 0.5
+    assert stats["memory_bytes"] > 0
+
+
+def test_writes_invalidate_affected_keys(cached):
+    """Test that updates and deletes drop only the touched entry and library."""
+    ann = cached.add_user(User(name="Ann")).id
+    bob = cached.add_user(User(name="Bob")).id
+    alien = cached.add_movie(ann, "Alien", "Ridley Scott", 1979, 8).id
+    cached.add_movie(bob, "Heat", "Michael Mann", 1995, 7)
+    cached.get_movie(alien)
+    cached.get_user_movies(ann)
+    bob_movies = cached.get_user_movies(bob)
+
+    cached.update_movie(alien, rating=9)
+    assert cached.get_movie(alien).rating == 9
+    assert cached.get_user_movies(ann)[0].rating == 9
+    assert cached.cache.get(("user_movies", bob)) is bob_movies
+
+    cached.delete_movie(alien)
+    assert cached.get_movie(alien) is None
+    assert cached.get_user_movies(ann) == ()
+
+    cached.add_user(User(name="Cy"))
+    assert [u.name for u in cached.get_all_users()] == ["Ann", "Bob", "Cy"]
+
+
+def test_imdb_match_refreshes_other_libraries(cached):
+    """Test that attaching an imdbID to a shared film drops every copy of it."""
+    ann = cached.add_user(User(name="Ann")).id
+    bob = cached.add_user(User(name="Bob")).id
+    cached.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    assert cached.get_user_movies(ann)[0].imdb_id is None
+
+    cached.add_movie(bob, "Alien", "Ridley Scott", "1979", 9, imdb_id="tt0078748")
+    assert cached.get_user_movies(ann)[0].imdb_id == "tt0078748"
+
+
+def test_pages_see_changes_from_other_writers(cached, count_queries):
+    """Test that cached pages follow data versions, e.g. enrichment worker updates."""
+    ann = cached.add_user(User(name="Ann")).id
+    cached.add_movie(ann, "Alien", "Ridley Scott", 1979, 8, imdb_id="tt0078748")
+    first = cached.get_user_movies_page(ann, 10)
+    assert [user.name for user in cached.get_users_page(10)] == ["Ann"]
+
+    with count_queries() as queries:
+        assert cached.get_user_movies_page(ann, 10).items == first.items
+        cached.get_users_page(10)
+    assert queries.count == 2  # one version lookup each
+    assert first.items[0].genre is None
+
+    # Written behind the cache's back, as the enrichment worker does
+    apply_details({"tt0078748": {"genre": "Horror", "runtime": None, "plot": None, "poster": None}})
+    db.session.commit()
+    assert cached.get_user_movies_page(ann, 10).items[0].genre == "Horror"
@@ -0,0 +1,92 @@
+import pytest
+
+import app as app_module
+from app import create_app
+from models.catalog import find_by_imdb_id, find_by_title, ingest, ingest_directors, is_complete
+from omdb import OMDbClient
+from omdb.stub_server import StubOMDbServer
+
+BASICS = (
+    "tconst\ttitleType\tprimaryTitle\tstartYear\truntimeMinutes\tgenres\n"
+    "tt0133093\tmovie\tThe Matrix\t1999\t136\tAction,Sci-Fi\n"
+    "tt0000002\tshort\tLe clown et ses chiens\t1892\t\\N\t\\N\n"
+)
+RATINGS = "tconst\taverageRating\tnumVotes\ntt0133093\t8.7\t2100000\ntt0000002\t5.6\t200\n"
+CREW = "tconst\tdirectors\twriters\ntt0133093\tnm0905154,nm0905152\tnm0905152\n"
+OMDB_CSV = 'imdbID,Title,Year,Director\ntt0133093,The Matrix,1999,"Lana Wachowski, Lilly Wachowski"\n'
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_layered_dumps_merge_by_imdb_id(tmp_path, ctx):
+    """Test that later dumps fill in columns without erasing earlier ones."""
+    stats = ingest(write(tmp_path, "basics.tsv", BASICS), chunk_size=1)
+    ingest(write(tmp_path, "ratings.tsv", RATINGS))
+    ingest(write(tmp_path, "omdb.csv", OMDB_CSV))
+
+    payload = find_by_imdb_id("tt0133093")
+    assert stats["rows"] == 1  # the short is skipped
+    assert payload["Runtime"] == "136 min"
+    assert payload["imdbRating"] == "8.7"
+    assert payload["Director"] == "Lana Wachowski, Lilly Wachowski"
+    assert find_by_imdb_id("tt0000002") is None
+    assert find_by_title("the matrix")["imdbID"] == "tt0133093"
+
+
+def test_crew_person_ids_are_not_directors(tmp_path, ctx):
+    """Test that title.crew person IDs never become the director."""
+    ingest(write(tmp_path, "basics.tsv", BASICS))
+    ingest(write(tmp_path, "crew.tsv", CREW))
+
+    assert find_by_imdb_id("tt0133093")["Director"] == "N/A"
+
+
+def test_directors_named_from_crew_and_names(tmp_path, ctx):
+    """Test that the IMDb dumps alone give complete catalog entries."""
+    names = (
+        "nconst\tprimaryName\tbirthYear\n"
+        "nm0905154\tLana Wachowski\t1965\n"
+        "nm0905152\tLilly Wachowski\t1967\n"
+        "nm0000001\tFred Astaire\t1899\n"
+    )
+    ingest(write(tmp_path, "basics.tsv", BASICS))
+    ingest(write(tmp_path, "ratings.tsv", RATINGS))
+    crew = CREW + "tt0000002\tnm0000001\t\\N\n"  # not in the catalog
+    stats = ingest_directors(write(tmp_path, "crew.tsv", crew), write(tmp_path, "names.tsv", names))
+
+    payload = find_by_imdb_id("tt0133093")
+    assert stats["rows"] == 1
+    assert payload["Director"] == "Lana Wachowski, Lilly Wachowski"
+    assert payload["Title"] == "The Matrix"
+    assert is_complete(payload)
+    assert find_by_imdb_id("tt0000002") is None
+
+
+def test_movie_details_served_from_catalog(tmp_path, app, ctx, monkeypatch):
+    """Test that complete catalog entries skip the OMDb call."""
+    ingest(write(tmp_path, "omdb.csv", OMDB_CSV))
+    ingest(write(tmp_path, "ratings.tsv", RATINGS))
+
+    with StubOMDbServer() as stub:
+        monkeypatch.setattr(app_module, "omdb_client", OMDbClient("test", base_url=stub.url))
+        response = app.test_client().get("/movie_details?imdbID=tt0133093")
+
+        assert response.get_json()["title"] == "The Matrix"
+        assert stub.request_count == 0
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "memory"])
+def test_details_on_fresh_database(backend, monkeypatch):
+    """Test that a first request for details finds the catalog table in place."""
+    fresh = create_app("config.TestConfig")  # no tables created yet
+    fresh.config["DATA_MANAGER_BACKEND"] = backend
+    with StubOMDbServer() as stub:
+        monkeypatch.setattr(app_module, "omdb_client", OMDbClient("test", base_url=stub.url))
+        response = fresh.test_client().get("/movie_details?imdbID=tt0133093")
+
+    assert response.status_code == 200
+    assert response.get_json()["title"] == "The Matrix"
@@ -0,0 +1,320 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from models import db
+from models.db_models import Movie, User
+from models import user_stats
+from models.migrations import migrate
+
+LEGACY_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL UNIQUE);
+CREATE TABLE movies (
+    id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, director VARCHAR(100),
+    year INTEGER, rating FLOAT, user_id INTEGER NOT NULL REFERENCES users (id)
+);
+INSERT INTO users VALUES (1, 'Ann'), (2, 'Bob');
+INSERT INTO movies VALUES
+    (3, 'Alien', 'Ridley Scott', 1979, 8.0, 1),
+    (7, 'Alien', 'Ridley Scott', 1979, 9.5, 2),
+    (9, 'Heat', 'Michael Mann', 1995, 7.0, 2);
+"""
+
+
+def add_users(data_manager, *names):
+    return [data_manager.add_user(User(name=name)).id for name in names]
+
+
+def test_migrate_folds_duplicate_films(tmp_path):
+    """Test that legacy per-user rows become catalog rows plus library entries."""
+    path = tmp_path / "legacy.db"
+    sqlite3.connect(path).executescript(LEGACY_SCHEMA)
+    engine = create_engine(f"sqlite:///{path}")
+
+    assert migrate(engine) is True
+    assert migrate(engine) is False
+    with engine.connect() as connection:
+        films = connection.execute(text("SELECT name FROM movies ORDER BY id")).scalars().all()
+        entries = connection.execute(
+            text("SELECT id, user_id, rating FROM user_movies ORDER BY id")
+        ).all()
+        totals = connection.execute(
+            text("SELECT user_id, movies FROM user_stats WHERE kind = 'total' ORDER BY user_id")
+        ).all()
+
+    assert films == ["Alien", "Heat"]
+    assert [tuple(row) for row in entries] == [(3, 1, 8.0), (7, 2, 9.5), (9, 2, 7.0)]
+    assert [tuple(row) for row in totals] == [(1, 1), (2, 2)]  # statistics built from the library
+
+
+def test_same_film_is_stored_once(ctx, data_manager):
+    """Test that users saving one imdbID share a catalog row."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    first = data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8, imdb_id="tt0078748")
+    second = data_manager.add_movie(bob, "Alien", "Ridley Scott", "1979", "9.5", imdb_id="tt0078748")
+
+    assert first.movie_id == second.movie_id
+    assert db.session.query(Movie).count() == 1
+    assert [m.rating for m in data_manager.get_user_movies(bob)] == [9.5]
+
+
+def test_update_does_not_change_other_libraries(ctx, data_manager):
+    """Test that editing details re-points only the edited entry."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    entry = data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    data_manager.add_movie(bob, "Alien", "Ridley Scott", 1979, 7)
+
+    data_manager.update_movie(entry.id, name="Aliens", year="1986", rating="9")
+
+    assert [m.name for m in data_manager.get_user_movies(bob)] == ["Alien"]
+    updated = data_manager.get_movie(entry.id)
+    assert (updated.name, updated.year, updated.rating) == ("Aliens", 1986, 9.0)
+
+
+@pytest.mark.parametrize("sort", ["added", "name", "-year", "-rating"])
+def test_keyset_pages_walk_forward_and_back(ctx, data_manager, sort):
+    """Test that next/prev cursors visit every movie exactly once, in order."""
+    (ann,) = add_users(data_manager, "Ann")
+    for i in range(7):
+        data_manager.add_movie(ann, f"Film {i}", "Director", 2000 + i % 3, i % 4)
+
+    full = data_manager.get_user_movies_page(ann, 100, sort=sort).items
+    pages, cursor = [], None
+    while True:
+        page = data_manager.get_user_movies_page(ann, 3, cursor, sort)
+        pages.append([movie.id for movie in page])
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    assert sum(pages, []) == [movie.id for movie in full]
+    back = data_manager.get_user_movies_page(ann, 3, page.prev_cursor, sort)
+    assert [movie.id for movie in back] == pages[-2]
+    assert back.next_cursor is not None
+
+
+def test_migrate_adds_library_indexes(tmp_path):
+    """Test that an existing database gets the filter indexes and planner statistics."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for name in ("ix_movies_director_year", "ix_user_movies_movie_id_user_id"):
+            connection.execute(text(f"DROP INDEX {name}"))
+        connection.execute(text("CREATE INDEX ix_user_movies_movie_id ON user_movies (movie_id)"))
+        connection.execute(text("INSERT INTO users (id, name) VALUES (1, 'Ann')"))
+        connection.execute(text("INSERT INTO movies (id, name, director) VALUES (1, 'Alien', 'Ridley Scott')"))
+        connection.execute(
+            text("INSERT INTO user_movies (user_id, movie_id, added_at) VALUES (1, 1, CURRENT_TIMESTAMP)")
+        )
+
+    assert migrate(engine) is True
+    assert migrate(engine) is False
+    with engine.connect() as connection:
+        indexes = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+        analyzed = connection.execute(text("SELECT DISTINCT tbl FROM sqlite_stat1")).scalars().all()
+    assert {"ix_movies_director_year", "ix_user_movies_movie_id_user_id"} <= set(indexes)
+    assert "ix_user_movies_movie_id" not in indexes
+    assert {"movies", "user_movies"} <= set(analyzed)
+
+
+def test_filters_and_sorts_run_in_sql(app, ctx, data_manager):
+    """Test each library filter, alone and combined, and sorting by director."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    data_manager.add_movie(ann, "Heat", "Michael Mann", 1995, 7)
+    data_manager.add_movie(ann, "100% Wolf", "Alexs Stadermann", 2020, 6)
+    data_manager.add_movie(ann, "Gladiator", "Ridley Scott", 2000, 9)
+    data_manager.add_movie(bob, "Blade Runner", "Ridley Scott", 1982, 10)
+
+    def names(filters, sort="added"):
+        return [m.name for m in data_manager.get_user_movies(ann, filters, sort)]
+
+    assert names({"director": "ridley scott"}) == ["Alien", "Gladiator"]
+    assert names({"year_min": "1990", "year_max": "2010"}) == ["Heat", "Gladiator"]
+    assert names({"min_rating": "7.5"}) == ["Alien", "Gladiator"]
+    assert names({"title": "% "}) == ["100% Wolf"]  # LIKE wildcards match literally
+    assert names({"director": "Ridley Scott", "year_min": 1990, "title": "glad"}) == ["Gladiator"]
+    assert names({"title": "", "director": None}) == names({})
+    assert names({}, "-director") == ["Gladiator", "Alien", "Heat", "100% Wolf"]
+
+    page = data_manager.get_user_movies_page(ann, 1, sort="-year", filters={"director": "Ridley Scott"})
+    assert [m.name for m in page] == ["Gladiator"]
+    page = data_manager.get_user_movies_page(ann, 1, page.next_cursor, "-year", {"director": "Ridley Scott"})
+    assert [m.name for m in page] == ["Alien"] and page.next_cursor is None
+
+    with pytest.raises(ValueError):
+        data_manager.get_user_movies(ann, {"year_min": "soon"})
+    with pytest.raises(ValueError):
+        data_manager.get_user_movies(ann, {"genre": "Horror"})
+
+    client = app.test_client()
+    response = client.get(f"/user/{ann}?director=Michael+Mann&sort=-rating")
+    assert b"Heat" in response.data and b"Alien" not in response.data
+    assert client.get(f"/user/{ann}?year_min=soon").status_code == 400
+
+
+# sqlite_stat1 rows of a large database: 1M library entries, ~100 per user;
+# 200k films, ~20 per director and ~2000 per year
+LARGE_DATABASE_STATS = {
+    "user_movies": {
+        "ix_user_movies_user_id_added_at": "1000000 5000 1",
+        "ix_user_movies_user_id_rating": "1000000 5000 100",
+        "ix_user_movies_movie_id_user_id": "1000000 5 1",
+    },
+    "movies": {
+        "ix_movies_name_year": "200000 2 1",
+        "ix_movies_year": "200000 2000",
+        "ix_movies_director_year": "200000 20 2",
+    },
+}
+
+
+def query_plans(statements):
+    """Return the EXPLAIN QUERY PLAN lines of the captured (SQL, parameters)."""
+    with db.engine.connect() as connection:
+        return [
+            row[3]
+            for statement, parameters in statements
+            for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ]
+
+
+@pytest.mark.parametrize("analyzed", [False, True])
+@pytest.mark.parametrize(
+    "filters, sort",
+    [
+        ({}, "added"),
+        ({"director": "Ridley Scott"}, "added"),
+        ({"year_min": 1990, "year_max": 1999}, "added"),
+        ({"min_rating": 8}, "-rating"),
+        ({"title": "alien"}, "name"),
+        ({"director": "Ridley Scott", "year_min": 1970, "min_rating": 5}, "-year"),
+    ],
+)
+def test_library_filters_never_scan_tables(ctx, data_manager, filters, sort, analyzed):
+    """Test that no common filter or sort makes SQLite scan movies or user_movies."""
+    (ann,) = add_users(data_manager, "Ann")
+    data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    if analyzed:
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+            connection.exec_driver_sql("DELETE FROM sqlite_stat1")
+            for table, indexes in LARGE_DATABASE_STATS.items():
+                for index, stat in indexes.items():
+                    connection.exec_driver_sql(
+                        "INSERT INTO sqlite_stat1 VALUES (?, ?, ?)", (table, index, stat)
+                    )
+            connection.exec_driver_sql("ANALYZE sqlite_schema")  # reload the statistics
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and "FROM user_movies" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        data_manager.get_user_movies_page(ann, 50, sort=sort, filters=filters)
+        data_manager.get_user_movies(ann, filters, sort)
+        plans = query_plans(statements)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+        if analyzed:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql("DROP TABLE sqlite_stat1")
+
+    assert len(statements) == 2 and plans
+    assert not [line for line in plans if line.startswith("SCAN")], plans
+    if analyzed and "director" in filters:
+        # In a big library, one director's few films are the cheaper starting point
+        assert any("ix_movies_director_year" in line for line in plans), plans
+
+
+def test_users_route_paginates(app, ctx, data_manager):
+    """Test that /users shows a page of users with a link to the next one."""
+    add_users(data_manager, "Ann", "Bob", "Cid")
+    client = app.test_client()
+
+    response = client.get("/users?per_page=2")
+    assert b"Ann" in response.data and b"Cid" not in response.data
+    assert b"Next" in response.data
+    assert client.get("/users?cursor=bogus").status_code == 400
+
+
+@pytest.mark.parametrize("library_size", [2, 40])
+def test_list_pages_use_constant_queries(app, ctx, data_manager, count_queries, library_size):
+    """Test that list pages cost a version check plus one query, at any size."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    for i in range(library_size):
+        data_manager.add_movie(ann, f"Film {i}", "Director", 2000, 7)
+    client = app.test_client()
+
+    with count_queries() as queries:
+        response = client.get("/users")
+    assert b"%d movies" % library_size in response.data
+    assert queries.count == 2
+
+    with count_queries() as queries:
+        client.get(f"/user/{ann}")
+    assert queries.count == 2
+
+
+def test_users_with_stats_single_grouped_query(ctx, data_manager, count_queries):
+    """Test the aggregate user listing."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    data_manager.add_movie(ann, "Heat", "Michael Mann", 1995, 6)
+
+    with count_queries() as queries:
+        rows = data_manager.get_users_with_stats()
+
+    assert [(r.name, r.movie_count, r.average_rating) for r in rows] == [
+        ("Ann", 2, 7.0),
+        ("Bob", 0, None),
+    ]
+    assert queries.count == 1
+
+
+def test_user_stats_follow_every_write(ctx, data_manager, count_queries):
+    """Test that each write path keeps the materialized statistics exact."""
+    (ann,) = add_users(data_manager, "Ann")
+    alien = data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8.5)
+    data_manager.add_movies(
+        ann,
+        [
+            {"name": "Heat", "director": "Michael Mann", "year": 1995, "rating": 6, "imdb_id": None},
+            {"name": "Ran", "director": "Akira Kurosawa", "year": 1985, "rating": 9, "imdb_id": None},
+            {"name": "Thief", "director": "Michael Mann", "year": 1981, "rating": 7, "imdb_id": None},
+        ],
+    )
+    data_manager.update_movie(alien.id, name="Aliens", director="James Cameron", year=1986, rating=9)
+    ran = [m.id for m in data_manager.get_user_movies(ann) if m.name == "Ran"]
+    heat = [m.id for m in data_manager.get_user_movies(ann) if m.name == "Heat"]
+    data_manager.delete_movie(ran[0])
+    data_manager.update_movies(ann, [{"id": heat[0], "rating": 8}])
+
+    with count_queries() as queries:
+        stats = data_manager.get_user_stats(ann)
+    assert queries.count == 2
+    assert stats["movie_count"] == 3
+    assert stats["average_rating"] == 8.0
+    assert {score: n for score, n in stats["ratings"].items() if n} == {7: 1, 8: 1, 9: 1}
+    assert stats["decades"] == {1980: 2, 1990: 1}
+    assert stats["top_directors"] == [("Michael Mann", 2), ("James Cameron", 1)]
+    assert user_stats.check() == []
+
+
+def test_user_stats_rebuild(ctx, data_manager):
+    """Test that the consistency check spots drift and rebuild repairs it."""
+    ann, bob = add_users(data_manager, "Ann", "Bob")
+    data_manager.add_movie(ann, "Alien", "Ridley Scott", 1979, 8)
+    data_manager.add_movie(bob, "Heat", "Michael Mann", 1995, 6)
+    db.session.execute(text("UPDATE user_stats SET movies = 5 WHERE user_id = :id"), {"id": bob})
+    db.session.commit()
+
+    assert user_stats.check() == [bob]
+    assert user_stats.rebuild([bob]) == 1
+    db.session.commit()
+    assert user_stats.check() == []
+    assert data_manager.get_user_stats(bob)["movie_count"] == 1
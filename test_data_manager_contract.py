@@ -0,0 +1,180 @@
+"""Behaviour every DataManagerInterface backend must share, run against each one."""
+
+import pytest
+from flask import current_app
+
+from app import create_app
+from models import db, recommendations
+from models.data_manager import USERS_SCOPE, user_scope
+from models.db_models import User
+from services import EXTENSION
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def manager(request):
+    """Yield the configured backend of a fresh test app, inside its app context."""
+    app = create_app("config.TestConfig")
+    app.config["DATA_MANAGER_BACKEND"] = request.param
+    app.config["RECOMMEND_MIN_COMMON"] = 1
+    with app.app_context():
+        yield app.extensions[EXTENSION].data_manager
+        db.session.remove()
+
+
+def add_library(manager, name, movies):
+    user_id = manager.add_user(User(name=name)).id
+    entries = [manager.add_movie(user_id, *movie) for movie in movies]
+    return user_id, [entry.id for entry in entries]
+
+
+def walk(manager, user_id, limit, **kwargs):
+    """Collect the entry IDs of every page, following next cursors."""
+    ids, cursor = [], None
+    while True:
+        page = manager.get_user_movies_page(user_id, limit, cursor, **kwargs)
+        ids.extend(movie.id for movie in page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+
+
+def test_users(manager):
+    """Test adding, reading and listing users."""
+    ann = manager.add_user(User(name="Ann")).id
+    bob = manager.add_user(User(name="Bob")).id
+    manager.add_movie(bob, "Heat", "Michael Mann", 1995, 7)
+    manager.add_movie(bob, "Alien", "Ridley Scott", 1979, 9)
+
+    assert manager.get_user(ann).name == "Ann"
+    assert manager.get_user(999) is None
+    assert [user.name for user in manager.get_all_users()] == ["Ann", "Bob"]
+    assert [(u.name, u.movie_count, u.average_rating) for u in manager.get_users_with_stats()] == [
+        ("Ann", 0, None),
+        ("Bob", 2, 8.0),
+    ]
+    first = manager.get_users_page(1, sort="-name")
+    assert [user.name for user in first] == ["Bob"]
+    assert [user.name for user in manager.get_users_page(1, first.next_cursor, sort="-name")] == ["Ann"]
+    with pytest.raises(Exception):
+        manager.add_user(User(name="Ann"))
+
+
+def test_library_writes_share_catalog_films(manager):
+    """Test single-entry writes, the shared catalog and the statistics they keep."""
+    ann, (alien, heat) = add_library(
+        manager, "Ann", [("Alien", "Ridley Scott", 1979, 8), ("Heat", "Michael Mann", 1995, 6)]
+    )
+    bob, (bobs_alien,) = add_library(manager, "Bob", [("Alien", "Ridley Scott", 1979, 9)])
+
+    assert manager.get_movie(alien).movie_id == manager.get_movie(bobs_alien).movie_id
+    assert manager.add_movie(ann, "Bad", "Nobody", "soon", 5) is None
+    assert manager.add_movie(999, "Heat", "Michael Mann", 1995, 5) is None
+
+    updated = manager.update_movie(heat, name="Heat (1995)", rating=7)
+    assert (updated.name, updated.rating) == ("Heat (1995)", 7.0)
+    assert manager.update_movie(999, rating=1) is None
+    assert manager.delete_movie(alien) is True
+    assert manager.delete_movie(alien) is False
+
+    assert manager.get_movie(bobs_alien).name == "Alien"  # Bob's film is untouched
+    stats = manager.get_user_stats(ann)
+    assert (stats["movie_count"], stats["average_rating"]) == (1, 7.0)
+    assert stats["decades"] == {1990: 1}
+    assert stats["top_directors"] == [("Michael Mann", 1)]
+
+
+def test_batched_changes_and_versions(manager):
+    """Test apply_movie_changes results, skipped IDs and the versions it bumps."""
+    ann, (alien, heat) = add_library(
+        manager, "Ann", [("Alien", "Ridley Scott", 1979, 8), ("Heat", "Michael Mann", 1995, 6)]
+    )
+    bob, (bobs_alien,) = add_library(manager, "Bob", [("Alien", "Ridley Scott", 1979, 9)])
+    before = manager.get_data_versions(USERS_SCOPE, user_scope(ann), user_scope(bob))
+
+    added, updated, deleted = manager.apply_movie_changes(
+        ann,
+        adds=[
+            {"name": "Ran", "director": "Akira Kurosawa", "year": 1985, "rating": 9.0, "imdb_id": None},
+            {"name": "Ikiru", "director": "Akira Kurosawa", "year": 1952, "rating": 8.0, "imdb_id": None},
+        ],
+        updates=[{"id": heat, "rating": 10}, {"id": bobs_alien, "rating": 1}],
+        deletes=[alien, bobs_alien, 999],
+    )
+
+    assert len(added) == 2 and added == sorted(added)
+    assert (updated, deleted) == ([heat], [alien])
+    after = manager.get_data_versions(USERS_SCOPE, user_scope(ann), user_scope(bob))
+    assert after[0] > before[0] and after[1] > before[1] and after[2] == before[2]
+    assert manager.get_movie(bobs_alien).rating == 9.0
+    stats = manager.get_user_stats(ann)
+    assert (stats["movie_count"], stats["average_rating"]) == (3, 9.0)
+    assert stats["top_directors"][0] == ("Akira Kurosawa", 2)
+    assert manager.apply_movie_changes(ann) == ([], [], [])
+    assert manager.get_data_versions("never written") == (0,)
+
+
+@pytest.mark.parametrize(
+    "sort, filters, expected",
+    [
+        ("added", None, ["Alien", "Heat", "Ran", "Ikiru", "Heat 2"]),
+        ("-name", None, ["Ran", "Ikiru", "Heat 2", "Heat", "Alien"]),
+        ("year", None, ["Heat 2", "Ikiru", "Alien", "Ran", "Heat"]),
+        ("-rating", {"director": "akira kurosawa"}, ["Ran", "Ikiru"]),
+        ("director", {"year_min": "1970", "year_max": "1990"}, ["Ran", "Alien"]),
+        ("added", {"title": "HEAT", "min_rating": "5"}, ["Heat"]),
+    ],
+)
+def test_filters_sorts_and_pages_agree(manager, sort, filters, expected):
+    """Test that listings and every page size walk the same rows in the same order."""
+    user_id, _ = add_library(
+        manager,
+        "Ann",
+        [
+            ("Alien", "Ridley Scott", 1979, 8),
+            ("Heat", "Michael Mann", 1995, 6),
+            ("Ran", "Akira Kurosawa", 1985, 9),
+            ("Ikiru", "Akira Kurosawa", 1952, 8),
+        ],
+    )
+    # No director or year: sorts as "" and 0, never matches a filter on them
+    manager.apply_movie_changes(
+        user_id, adds=[{"name": "Heat 2", "director": None, "year": None, "rating": 4.0, "imdb_id": None}]
+    )
+
+    movies = manager.get_user_movies(user_id, filters, sort)
+    assert [movie.name for movie in movies] == expected
+    for limit in (1, 2, 10):
+        assert walk(manager, user_id, limit, sort=sort, filters=filters) == [movie.id for movie in movies]
+
+    last = manager.get_user_movies_page(user_id, 1, sort=sort, filters=filters)
+    while last.next_cursor:
+        last = manager.get_user_movies_page(user_id, 1, last.next_cursor, sort=sort, filters=filters)
+    if last.prev_cursor:
+        previous = manager.get_user_movies_page(user_id, 10, last.prev_cursor, sort=sort, filters=filters)
+        assert [movie.id for movie in previous] == [movie.id for movie in movies][:-1]
+
+    with pytest.raises(ValueError):
+        manager.get_user_movies(user_id, {"year_min": "soon"})
+    with pytest.raises(ValueError):
+        manager.get_user_movies_page(user_id, 10, sort="popularity")
+
+
+def test_recommendations(manager):
+    """Test that both backends rank the same unsaved films."""
+    libraries = {"Ann": [1, 2, 3], "Bob": [1, 2], "Cat": [2, 3], "Dan": [1, 4]}
+    users = {
+        name: add_library(manager, name, [(f"Film {n}", "Director", 2000 + n, 7) for n in films])[0]
+        for name, films in libraries.items()
+    }
+    # The SQLite backend reads neighbours built by the worker
+    if current_app.config["DATA_MANAGER_BACKEND"] == "sqlite":
+        recommendations.refresh(
+            manager.get_data_versions(USERS_SCOPE)[0],
+            top_k=current_app.config["RECOMMEND_TOP_K"],
+            min_common=current_app.config["RECOMMEND_MIN_COMMON"],
+        )
+
+    rows = manager.get_recommendations(users["Bob"])
+    assert [(row.name, row.because) for row in rows] == [("Film 3", 2), ("Film 4", 1)]
+    assert manager.get_recommendations(users["Bob"], limit=1)[0].score == pytest.approx(rows[0].score)
+    assert manager.get_recommendations(999) == []
@@ -0,0 +1,36 @@
+from sqlalchemy import func, select
+
+from benchmarks.common import summarize
+from benchmarks.datagen import create_app, generate
+from models import db
+from models.db_models import UserMovie
+
+
+def library_sizes(database):
+    with create_app(database).app_context():
+        data = generate(users=50, movies=2000, seed=7)
+        sizes = db.session.execute(
+            select(UserMovie.user_id, func.count()).group_by(UserMovie.user_id)
+        ).all()
+        db.session.remove()
+    return data, dict(sizes)
+
+
+def test_generator_is_seeded_and_skewed(tmp_path):
+    """Test that one seed yields one dataset, with a few users owning most movies."""
+    data, first = library_sizes(str(tmp_path / "a.db"))
+    _, second = library_sizes(str(tmp_path / "b.db"))
+
+    assert first == second
+    assert sum(first.values()) == 2000
+    assert first[data["heaviest_user_id"]] == max(first.values())
+    assert max(first.values()) > 10 * (2000 / 50) / 2  # far above an even share
+
+
+def test_summarize_percentiles():
+    """Test the latency summary used in benchmark results."""
+    stats = summarize([float(n) for n in range(1, 101)])
+    assert stats["calls"] == 100
+    assert stats["p50_ms"] == 50.5
+    assert stats["p95_ms"] == 96.0
+    assert stats["p99_ms"] == 100.0
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+
+from models import db
+from models.db_models import EnrichmentJob, Movie, User
+from models.enrichment import run_batch, run_worker
+from models.job_queue import DONE, FAILED, PENDING, JobQueue
+from omdb import CircuitBreaker, OMDbClient, RateLimiter
+from omdb.stub_server import StubOMDbServer
+
+
+@pytest.fixture
+def stub():
+    with StubOMDbServer() as server:
+        yield server
+
+
+def add_alien(data_manager, *names):
+    for name in names:
+        user = data_manager.add_user(User(name=name))
+        data_manager.add_movie(user.id, "Alien", "Ridley Scott", 1979, 8, imdb_id="tt0078748")
+
+
+def test_added_films_are_enriched_in_background(app, ctx, data_manager, stub):
+    """Test that adding queues one job per film and the worker fills in details."""
+    add_alien(data_manager, "Ann", "Bob")
+    assert data_manager.jobs.counts() == {PENDING: 1}
+    assert db.session.get(EnrichmentJob, "tt0078748") is not None
+
+    client = OMDbClient("test", base_url=stub.url)
+    assert run_worker(data_manager.jobs, client, once=True) == 1
+
+    movie = db.session.scalars(db.select(Movie).where(Movie.imdb_id == "tt0078748")).one()
+    assert movie.genre == "Horror, Sci-Fi"
+    assert movie.runtime == "117 min"
+    assert movie.plot.startswith("The crew")
+    assert movie.poster is None  # "N/A" upstream
+    assert data_manager.jobs.counts() == {DONE: 1}
+    ann = db.session.scalars(db.select(User.id).where(User.name == "Ann")).one()
+    assert data_manager.get_user_movies(ann)[0].genre == "Horror, Sci-Fi"
+
+    response = app.test_client().get(f"/user/{ann}")
+    assert b"117 min" in response.data
+
+
+def test_failed_fetches_back_off_then_give_up(ctx, data_manager, stub):
+    """Test that upstream failures are retried later and eventually abandoned."""
+    add_alien(data_manager, "Ann")
+    queue = JobQueue(max_attempts=2, backoff=60)
+    client = OMDbClient("test", base_url=stub.url, max_retries=0)
+    stub.fail_next(10)
+
+    assert run_batch(queue, client) == 1
+    job = db.session.get(EnrichmentJob, "tt0078748")
+    assert (job.status, job.attempts) == (PENDING, 1)
+    assert run_batch(queue, client) == 0  # not due yet
+
+    job.run_after -= timedelta(minutes=5)
+    db.session.commit()
+    assert run_batch(queue, client) == 1
+    db.session.refresh(job)
+    assert job.status == FAILED
+
+
+def test_refused_calls_do_not_use_up_attempts(ctx, data_manager, stub, tmp_path):
+    """Test that jobs held back by the quota or breaker are retried without counting."""
+    user = data_manager.add_user(User(name="Ann")).id
+    for imdb_id in ("tt0078748", "tt0090605", "tt0103644"):
+        data_manager.add_movie(user, imdb_id, "Director", 1980, 8, imdb_id=imdb_id)
+    queue = JobQueue(max_attempts=1)
+    # Background calls may use half of a 4-call budget: two of the three jobs
+    limiter = RateLimiter(str(tmp_path / "quota.db"), daily_limit=4, rate=1000.0, burst=100)
+    client = OMDbClient("test", base_url=stub.url, limiter=limiter)
+
+    assert run_batch(queue, client) == 2
+    assert stub.request_count == 2
+    held_back = [job for job in db.session.scalars(db.select(EnrichmentJob)) if job.status == PENDING]
+    assert [(job.attempts, job.last_error) for job in held_back] == [(0, None)]
+
+    assert run_batch(queue, client) == 0  # nothing is claimed while the quota is spent
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    assert run_batch(queue, OMDbClient("test", base_url=stub.url, breaker=breaker)) == 0
+    db.session.refresh(held_back[0])
+    assert (held_back[0].status, held_back[0].attempts) == (PENDING, 0)
+    assert stub.request_count == 2
+
+    assert run_batch(queue, OMDbClient("test", base_url=stub.url)) == 1
+    assert data_manager.jobs.counts() == {DONE: 3}
+
+
+def test_stale_films_can_be_requeued(ctx, data_manager, stub):
+    """Test that re-enrichment puts finished jobs back in the queue."""
+    add_alien(data_manager, "Ann")
+    run_worker(data_manager.jobs, OMDbClient("test", base_url=stub.url), once=True)
+
+    assert data_manager.jobs.requeue_stale(timedelta(days=30)) == 0
+    assert data_manager.jobs.requeue_stale(timedelta(0)) == 1
+    assert data_manager.jobs.counts() == {PENDING: 1}
@@ -0,0 +1,51 @@
+from flask import Flask
+
+from instrumentation import Histogram, Instrumentation
+from omdb import OMDbClient
+from omdb.stub_server import StubOMDbServer
+
+
+def test_metrics_report_requests_and_sql(app):
+    """Test that a request's latency and SQL statements reach /metrics."""
+    with app.test_client() as client:
+        client.get("/users")
+        body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'app_requests_total{endpoint="list_users",method="GET",status="200"}' in body
+    assert 'app_request_duration_seconds_count{endpoint="list_users",method="GET"}' in body
+    assert 'app_sql_statements_total{endpoint="list_users"}' in body
+    assert 'app_template_render_seconds_total{endpoint="list_users"}' in body
+    assert "# TYPE app_request_duration_seconds histogram" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test the Prometheus bucket layout of a histogram."""
+    histogram = Histogram("h", "Test.", ("path",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(("/x",), value)
+
+    samples = {name + labels: value for name, labels, value in histogram.samples()}
+    assert samples['h_bucket{path="/x",le="0.1"}'] == 1
+    assert samples['h_bucket{path="/x",le="1.0"}'] == 2
+    assert samples['h_bucket{path="/x",le="+Inf"}'] == 3
+    assert samples['h_count{path="/x"}'] == 3
+
+
+def test_omdb_calls_are_attributed_to_endpoint(caplog):
+    """Test that upstream calls count against the endpoint and show in the slow log."""
+    probe = Flask(__name__)
+    metrics = Instrumentation(probe, slow_request_ms=0.001)
+    with StubOMDbServer() as stub:
+        client = OMDbClient("test", base_url=stub.url, on_call=metrics.record_omdb_call)
+
+        @probe.route("/lookup")
+        def lookup():
+            client.get_by_id("tt0078748")
+            return "ok"
+
+        probe.test_client().get("/lookup")
+
+    body = metrics.render()
+    assert 'app_omdb_calls_total{endpoint="lookup",outcome="ok"} 1' in body
+    assert 'app_omdb_call_duration_seconds_count{endpoint="lookup"} 1' in body
+    assert "1 OMDb" in caplog.text
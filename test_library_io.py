@@ -0,0 +1,136 @@
+import io
+import json
+import re
+
+import pytest
+
+from models import db
+from models.db_models import Movie, User
+
+CSV = (
+    "name,director,year,rating,imdb_id\n"
+    "Alien,Ridley Scott,1979,8.5,tt0078748\n"
+    "Heat,Michael Mann,not-a-year,7,\n"
+    "Alien,Ridley Scott,1979,9,tt0078748\n"
+    ",Nobody,2000,5,\n"
+    "Ran,Akira Kurosawa,1985,11,\n"
+    "Ran,Akira Kurosawa,1985,8.2,\n"
+)
+
+
+@pytest.fixture
+def client(app, data_manager):
+    """Test client of a fresh test app with one user (ID 1)."""
+    with app.app_context():
+        data_manager.add_user(User(name="Ann"))
+    with app.test_client() as client:
+        yield client
+
+
+def upload(client, text, filename):
+    return client.post(
+        "/users/1/import",
+        data={"file": (io.BytesIO(text.encode()), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_import_reports_row_errors(app, client, count_queries):
+    """Test batched import with per-row validation errors."""
+    with count_queries() as queries:
+        response = upload(client, CSV, "movies.csv")
+    report = response.get_json()
+
+    assert report["imported"] == 3
+    assert [error["row"] for error in report["errors"]] == [2, 4, 5]
+    assert "year" in report["errors"][0]["errors"]
+    assert queries.count <= 9  # one batch (and one stats upsert), not one transaction per row
+    with app.app_context():
+        assert db.session.query(Movie).count() == 2  # Alien stored once
+
+
+def test_ndjson_import(client):
+    """Test importing newline-delimited JSON."""
+    lines = [{"name": "Alien", "director": "Ridley Scott", "year": 1979, "rating": 8.5}] * 3
+    body = "\n".join(json.dumps(line) for line in lines)
+
+    assert upload(client, body, "movies.ndjson").get_json() == {"imported": 3, "errors": []}
+
+
+def test_export_streams_whole_library(app, client, monkeypatch):
+    """Test that the CSV export walks every page and round-trips."""
+    monkeypatch.setitem(app.config, "EXPORT_PAGE_SIZE", 2)
+    upload(client, CSV, "movies.csv")
+
+    response = client.get("/users/1/export.csv")
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.mimetype == "text/csv"
+    assert lines[0] == "name,director,year,rating,imdb_id,added_at"
+    assert len(lines) == 4
+
+    ndjson = client.get("/users/1/export.ndjson").get_data(as_text=True)
+    assert upload(client, ndjson, "again.ndjson").get_json()["imported"] == 3
+
+
+def test_batch_applies_operations_in_one_transaction(app, client, data_manager, count_queries):
+    """Test a mixed batch: set-based writes and a result per operation."""
+    upload(client, CSV, "movies.csv")  # library entries 1-3: Alien, Alien, Ran
+    operations = [
+        {"op": "add", "name": "Heat", "director": "Michael Mann", "year": 1995, "rating": 8},
+        {"op": "update", "id": 1, "rating": 6.5},
+        {"op": "update", "id": 3, "name": "Ran (Restored)"},
+        {"op": "delete", "id": 2},
+        {"op": "delete", "id": 999},
+    ]
+    with count_queries() as queries:
+        response = client.post("/users/1/movies/batch", json={"operations": operations})
+    results = response.get_json()["results"]
+
+    assert response.status_code == 200
+    assert [(r["op"], r["status"]) for r in results] == [
+        ("add", "added"),
+        ("update", "updated"),
+        ("update", "updated"),
+        ("delete", "deleted"),
+        ("delete", "not_found"),
+    ]
+    assert queries.count <= 16  # a statement per kind of change, not per movie
+    with app.app_context():
+        library = {(m.name, m.rating) for m in data_manager.get_user_movies(1)}
+    assert library == {("Heat", 8.0), ("Alien", 6.5), ("Ran (Restored)", 8.2)}
+
+
+def test_invalid_batch_changes_nothing(app, client, data_manager):
+    """Test that one invalid operation rejects the whole batch."""
+    upload(client, CSV, "movies.csv")
+    operations = [
+        {"op": "delete", "id": 1},
+        {"op": "update", "id": 2, "rating": 42},
+        {"op": "update", "id": 1, "rating": 5},
+        {"op": "rename"},
+    ]
+    response = client.post("/users/1/movies/batch", json={"operations": operations})
+
+    assert response.status_code == 400
+    assert [(e["index"], list(e["errors"])) for e in response.get_json()["errors"]] == [
+        (1, ["rating"]),
+        (2, ["id"]),
+        (3, ["op"]),
+    ]
+    with app.app_context():
+        assert len(data_manager.get_user_movies(1)) == 3
+
+
+def test_batch_requires_csrf_header(app, client):
+    """Test that JSON batch clients pass the session's token in X-CSRFToken."""
+    app.config["WTF_CSRF_ENABLED"] = True  # this test's own app, so nothing to restore
+    operations = [{"op": "add", "name": "Ran", "director": "Akira Kurosawa", "year": 1985, "rating": 8}]
+    assert client.post("/users/1/movies/batch", json={"operations": operations}).status_code == 400
+
+    page = client.get("/users/1/import").get_data(as_text=True)
+    token = re.search(r'name="csrf_token" value="([^"]+)"', page).group(1)
+    response = client.post(
+        "/users/1/movies/batch", json={"operations": operations}, headers={"X-CSRFToken": token}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["results"][0]["status"] == "added"
@@ -0,0 +1,70 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+from flask import g
+
+from logging_setup import DroppingQueueHandler, JsonFormatter, RequestContextFilter, _file_handler
+
+
+def make_record(level=logging.INFO, message="hello %s", args=("world",)):
+    return logging.LogRecord("root", level, __file__, 1, message, args, None)
+
+
+def test_request_id_is_echoed(app):
+    """Test that a caller's request ID is kept and one is made up otherwise."""
+    client = app.test_client()
+    response = client.get("/", headers={"X-Request-ID": "abc123"})
+    assert response.headers["X-Request-ID"] == "abc123"
+    assert client.get("/").headers["X-Request-ID"] != "abc123"
+
+
+def test_records_are_tagged_and_sampled(app):
+    """Test request tagging, and that sampling drops INFO but never warnings."""
+    log_filter = RequestContextFilter()
+    with app.test_request_context("/"):
+        g.request_id = "req-1"
+        g.log_sampled = False
+        info, warning = make_record(), make_record(logging.WARNING)
+        assert log_filter.filter(info) is False
+        assert log_filter.filter(warning) is True
+        assert warning.request_id == "req-1"
+
+    outside = make_record()
+    assert log_filter.filter(outside) is True
+    entry = json.loads(JsonFormatter().format(outside))
+    assert entry["message"] == "hello world"
+    assert entry["request_id"] == "-"
+    assert entry["level"] == "INFO"
+
+
+def test_file_handler_rotation(tmp_path):
+    """Test that LOG_MAX_BYTES=0 leaves rotation to an external tool."""
+    path = str(tmp_path / "app.log")
+    handlers = [
+        _file_handler({"LOG_FILE": path, "LOG_MAX_BYTES": 1024}),
+        _file_handler({"LOG_FILE": path, "LOG_MAX_BYTES": 0}),
+        _file_handler({"LOG_FILE": path, "LOG_MAX_BYTES": 0, "LOG_ROTATE_WHEN": "midnight"}),
+    ]
+    assert [type(handler) for handler in handlers] == [
+        logging.handlers.RotatingFileHandler,
+        logging.handlers.WatchedFileHandler,
+        logging.handlers.TimedRotatingFileHandler,
+    ]
+    for handler in handlers:
+        handler.close()
+    assert _file_handler({"LOG_FILE": None}) is None  # terminal only, as in tests
+
+
+def test_full_queue_sheds_only_low_levels(capsys):
+    """Test that a full queue drops INFO lines but never warnings."""
+    handler = DroppingQueueHandler(queue.Queue(1), wait=0.01)
+    handler.addFilter(RequestContextFilter())
+    handler.handle(make_record())
+    handler.handle(make_record(message="lost", args=()))
+    handler.handle(make_record(logging.ERROR, message="kept %s", args=("anyway",)))
+
+    assert handler.dropped == 1
+    assert handler.queue.qsize() == 1
+    assert "ERROR - [-] kept anyway" in capsys.readouterr().err
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import app as app_module
+from omdb import OMDbClient
+from omdb.cache import IMDB_ID, SEARCH, LRUCache, OMDbCache
+from omdb.stub_server import StubOMDbServer
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the LRU tier evicts the oldest entry and counts it."""
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")  # "b" is now the least recently used entry
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_negative_results_use_shorter_ttl(tmp_path):
+    """Test that "Response: False" payloads expire on the negative TTL."""
+    cache = OMDbCache(path=str(tmp_path / "cache.db"), positive_ttl=60, negative_ttl=0)
+    cache.set(IMDB_ID, "tt0000001", {"Response": "True", "Title": "Found"})
+    cache.set(IMDB_ID, "tt0000002", {"Response": "False"})
+    time.sleep(0.01)
+
+    assert cache.get(IMDB_ID, "tt0000001")["Title"] == "Found"
+    assert cache.get(IMDB_ID, "tt0000002") is None
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    """Test that entries persist in SQLite and keys are normalized."""
+    path = str(tmp_path / "cache.db")
+    OMDbCache(path=path).set(SEARCH, "The  Matrix", {"Response": "True"})
+
+    cache = OMDbCache(path=path)
+    assert cache.get(SEARCH, "the matrix") == {"Response": "True"}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_promoted_entry_keeps_disk_expiry(tmp_path):
+    """Test that a disk hit is kept in memory only until it expires on disk."""
+    path = str(tmp_path / "cache.db")
+    OMDbCache(path=path, positive_ttl=0.2).set(SEARCH, "alien", {"Response": "True"})
+
+    cache = OMDbCache(path=path, positive_ttl=60)
+    assert cache.get(SEARCH, "alien") == {"Response": "True"}
+    time.sleep(0.25)
+    assert cache.get(SEARCH, "alien") is None
+
+
+@pytest.fixture
+def stub_client(monkeypatch, tmp_path):
+    """Point the app at a local stub OMDb with an isolated cache."""
+    with StubOMDbServer() as stub:
+        client = OMDbClient("test", base_url=stub.url, cache=OMDbCache(path=str(tmp_path / "c.db")))
+        monkeypatch.setattr(app_module, "omdb_client", client)
+        yield stub
+
+
+def test_suggestions_served_from_cache(app, stub_client):
+    """Test that repeated suggestion lookups only hit OMDb once."""
+    client = app.test_client()
+    first = client.get("/movie_suggestions?query=Alien")
+    second = client.get("/movie_suggestions?query=alien")
+
+    assert first.get_json() == second.get_json()
+    assert first.get_json()[0]["imdbID"] == "tt0078748"
+    assert stub_client.request_count == 1
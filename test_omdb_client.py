@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from omdb import CircuitBreaker, OMDbClient, OMDbRefused, RateLimiter
+from omdb.cache import SEARCH
+from omdb.ratelimit import BACKGROUND, INTERACTIVE
+from omdb.stub_server import StubOMDbServer
+
+
+@pytest.fixture
+def stub():
+    """Run a local stub OMDb server for the duration of a test."""
+    with StubOMDbServer() as server:
+        yield server
+
+
+def make_client(stub, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return OMDbClient("test", base_url=stub.url, **kwargs)
+
+
+def test_get_by_id_returns_payload(stub):
+    """Test a successful lookup against the stub server."""
+    client = make_client(stub)
+    payload = client.get_by_id("tt0133093")
+
+    assert payload["Title"] == "The Matrix"
+    assert client.get_by_id("tt9999999")["Response"] == "False"
+
+
+def test_retries_transient_errors(stub):
+    """Test that 5xx answers are retried with backoff."""
+    stub.fail_next(2)
+    client = make_client(stub, max_retries=2)
+
+    assert client.search("alien")["Response"] == "True"
+    assert stub.request_count == 3
+
+
+def test_read_timeout_is_honoured(stub):
+    """Test that a slow upstream gives up instead of hanging."""
+    stub.set_delay(0.5)
+    client = make_client(stub, read_timeout=0.05, max_retries=0)
+
+    assert client.search("alien") is None
+    assert client.stats()["failures"] == 1
+
+
+def test_circuit_breaker_fails_fast(stub):
+    """Test that an open breaker skips upstream calls until it resets."""
+    stub.fail_next(10)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = make_client(stub, max_retries=0, breaker=breaker)
+
+    client.search("a")
+    client.search("b")
+    requests_before = stub.request_count
+    assert client.search("c") is None
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert stub.request_count == requests_before
+    assert client.stats()["short_circuits"] == 1
+
+
+def test_client_error_settles_trial_call(stub):
+    """Test that a 4xx answer to the half-open trial re-opens the breaker."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    client = make_client(stub, max_retries=0, breaker=breaker)
+    stub.fail_next(2, status=401)  # OMDb answers 401 once the daily limit is used up
+
+    assert client.search("a") is None
+    assert client.search("b") is None  # the trial call, answered 401
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.search("alien")["Response"] == "True"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_quota_refusal_keeps_trial_call(stub, tmp_path):
+    """Test that a trial call the quota refused leaves the next caller a trial."""
+    limiter = RateLimiter(str(tmp_path / "quota.db"), daily_limit=10, rate=1000.0, burst=100)
+    while limiter.acquire(BACKGROUND, max_wait=0):
+        pass  # background share of the budget used up
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    client = make_client(stub, max_retries=0, breaker=breaker, limiter=limiter)
+    stub.fail_next(1)
+    assert client.search("a") is None
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert client.lookup(SEARCH, "alien", BACKGROUND) is None
+    with pytest.raises(OMDbRefused):
+        client.lookup(SEARCH, "alien", BACKGROUND, raise_refused=True)
+    assert client.stats()["rate_limited"] == 2
+    assert client.search("alien")["Response"] == "True"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_movie_details_route_degrades_when_unavailable(app, stub, monkeypatch):
+    """Test that the details route answers with an empty object on failure."""
+    stub.fail_next(10)
+    monkeypatch.setattr(app_module, "omdb_client", make_client(stub, max_retries=0))
+
+    response = app.test_client().get("/movie_details?imdbID=tt0078748")
+    assert response.get_json() == {}
+
+
+def test_concurrent_identical_queries_are_coalesced(stub):
+    """Test that simultaneous lookups for one key share a single request."""
+    stub.set_delay(0.2)
+    client = make_client(stub)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        results.append(client.search("Alien"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub.request_count == 1
+    assert len(results) == 8 and all(r["Response"] == "True" for r in results)
+    assert client.stats()["coalesced_calls"] == 7
+
+
+def test_refused_background_lookup_is_not_shared(stub):
+    """Test that an interactive lookup never waits on a background call's refusal."""
+    client = make_client(stub)
+    request = client._request
+    started = threading.Event()
+
+    def refuse_background(params, priority=INTERACTIVE):
+        if priority != BACKGROUND:
+            return request(params, priority)
+        started.set()
+        time.sleep(0.2)
+        return None  # as if the quota refused it
+
+    client._request = refuse_background
+    background = threading.Thread(target=client.get_by_id, args=("tt0078748", BACKGROUND))
+    background.start()
+    started.wait()
+    assert client.get_by_id("tt0078748")["Title"] == "Alien"
+    background.join()
@@ -0,0 +1,56 @@
+from omdb.ratelimit import BACKGROUND, INTERACTIVE, SUGGEST, RateLimiter
+from services import EXTENSION
+
+
+def make_limiter(tmp_path, **kwargs):
+    options = {"daily_limit": 10, "rate": 1000.0, "burst": 100}
+    options.update(kwargs)
+    return RateLimiter(str(tmp_path / "quota.db"), **options)
+
+
+def drain(limiter, priority):
+    calls = 0
+    while limiter.acquire(priority, max_wait=0):
+        calls += 1
+    return calls
+
+
+def test_lower_priorities_leave_budget_for_interactive(tmp_path):
+    """Test that background and suggestions stop at their reserved share."""
+    limiter = make_limiter(tmp_path)
+    assert drain(limiter, BACKGROUND) == 5
+    assert drain(limiter, SUGGEST) == 3
+    assert drain(limiter, INTERACTIVE) == 2
+    assert limiter.stats()["remaining_today"] == 0
+    assert not limiter.has_budget(INTERACTIVE)
+
+
+def test_budget_is_shared_through_the_file(tmp_path):
+    """Test that two limiters on one path (e.g. two workers) share the budget."""
+    first, second = make_limiter(tmp_path), make_limiter(tmp_path)
+    first.acquire(INTERACTIVE)
+    first.acquire(INTERACTIVE)
+    assert second.stats()["used_today"] == 2
+
+
+def test_token_bucket_limits_bursts(tmp_path):
+    """Test that calls beyond the burst wait for tokens or are refused."""
+    limiter = make_limiter(tmp_path, daily_limit=1000, rate=20.0, burst=2)
+    assert limiter.acquire(INTERACTIVE, max_wait=0)
+    assert limiter.acquire(INTERACTIVE, max_wait=0)
+    assert not limiter.acquire(INTERACTIVE, max_wait=0)
+    assert limiter.acquire(INTERACTIVE, max_wait=1.0)  # refills at 20/s
+
+
+def test_suggestions_fall_back_to_local_when_quota_is_low(app, tmp_path):
+    """Test that /movie_suggestions answers locally instead of calling OMDb."""
+    limiter = make_limiter(tmp_path, daily_limit=5)
+    drain(limiter, INTERACTIVE)
+    omdb_client = app.extensions[EXTENSION].omdb_client
+    omdb_client.limiter = limiter
+    calls = omdb_client.upstream_calls
+
+    response = app.test_client().get("/movie_suggestions?query=zzqx")
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert omdb_client.upstream_calls == calls
@@ -0,0 +1,57 @@
+import pytest
+
+from models.db_models import User
+from services import EXTENSION
+
+
+@pytest.fixture
+def client(app, data_manager):
+    """Test client of a fresh test app with one user (ID 1)."""
+    with app.app_context():
+        data_manager.add_user(User(name="Ann"))
+    return app.test_client()
+
+
+def test_matching_etag_gets_304(client, count_queries):
+    """Test that an unchanged page is answered with 304 after one version lookup."""
+    first = client.get("/users")
+    etag = first.headers["ETag"]
+
+    with count_queries() as queries:
+        second = client.get("/users", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert queries.count == 1
+
+    client.post("/add_user", data={"name": "Bob"})
+    third = client.get("/users", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert b"Bob" in third.data
+
+
+def test_rendered_page_reused_until_library_changes(client, count_queries):
+    """Test that cached HTML is served until a movie write bumps the version."""
+    movie = {"name": "Alien", "director": "Ridley Scott", "year": "1979", "rating": "8"}
+    client.post("/users/1/add_movie", data=movie)
+    client.get("/user/1")
+
+    with count_queries() as queries:
+        cached = client.get("/user/1")
+    assert queries.count == 1
+    assert b"Alien" in cached.data
+
+    client.post("/users/1/delete_movie/1")
+    assert b"Alien" not in client.get("/user/1").data
+
+
+def test_cached_page_gets_current_csrf_token(app, client):
+    """Test that cached HTML never carries another session's CSRF token."""
+    movie = {"name": "Alien", "director": "Ridley Scott", "year": "1979", "rating": "8"}
+    client.post("/users/1/add_movie", data=movie)
+    app.config["WTF_CSRF_ENABLED"] = True  # this test's own app, so nothing to restore
+    first = client.get("/user/1").get_data(as_text=True)
+    second = app.test_client().get("/user/1").get_data(as_text=True)
+    assert 'name="csrf_token"' in second
+    assert "__CSRF_TOKEN_PLACEHOLDER__" not in second
+    assert first != second  # each session sees its own token
+    with app.app_context():
+        assert app.extensions[EXTENSION].page_cache.stats()["hits"] >= 1
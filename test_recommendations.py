@@ -0,0 +1,72 @@
+import math
+import random
+
+import pytest
+
+from models import db, recommendations
+from models.data_manager import USERS_SCOPE
+from models.db_models import MovieNeighbor, User
+
+# user -> films: 1 and 2 go together, as do 2 and 3
+LIBRARIES = {1: [1, 2, 3], 2: [1, 2], 3: [2, 3], 4: [1, 4]}
+ENTRIES = [(user_id, movie_id) for user_id, films in LIBRARIES.items() for movie_id in films]
+
+
+def test_neighbors_are_top_k_by_cosine():
+    """Test scores, the top-K cut and the min_common threshold."""
+    pairs = recommendations.neighbor_pairs(ENTRIES, top_k=2, min_common=1)
+    neighbors = {(movie_id, neighbor_id): (score, common) for movie_id, neighbor_id, score, common in pairs}
+
+    assert [(m, n) for m, n, _, _ in pairs] == [(1, 2), (1, 4), (2, 3), (2, 1), (3, 2), (3, 1), (4, 1)]
+    assert neighbors[(2, 3)] == (pytest.approx(2 / math.sqrt(3 * 2)), 2)
+    assert neighbors[(1, 4)] == (pytest.approx(1 / math.sqrt(3 * 1)), 1)
+
+    pairs = recommendations.neighbor_pairs(ENTRIES, top_k=2, min_common=2)
+    assert [(m, n) for m, n, _, _ in pairs] == [(1, 2), (2, 3), (2, 1), (3, 2)]
+    assert recommendations.neighbor_pairs([]) == []
+
+
+def test_numpy_build_matches_python_build():
+    """Test that the vectorized build returns exactly the pure-Python result."""
+    pytest.importorskip("numpy")
+    pytest.importorskip("scipy")
+    rng = random.Random(3)
+    entries = sorted({(u, rng.randrange(300)) for u in range(500) for _ in range(rng.randrange(1, 30))})
+
+    assert recommendations._numpy_neighbors(entries, 10, 2) == recommendations._python_neighbors(
+        entries, 10, 2
+    )
+
+
+def test_recommendations_route_reads_the_built_table(app, ctx, data_manager):
+    """Test rebuilding on a library change and ranking unsaved films."""
+    ids = {}
+    for user_id, films in LIBRARIES.items():
+        user = data_manager.add_user(User(name=f"User {user_id}")).id
+        for movie_id in films:
+            entry = data_manager.add_movie(user, f"Film {movie_id}", "Director", 2000 + movie_id, 7)
+            ids[movie_id] = entry.movie_id
+        ids[f"user {user_id}"] = user
+    version = data_manager.get_data_versions(USERS_SCOPE)[0]
+
+    assert recommendations.refresh(version, top_k=5, min_common=1) > 0
+    assert recommendations.refresh(version, top_k=5, min_common=1) is None  # already current
+    assert db.session.query(MovieNeighbor).count() > 0
+
+    # User 2 saved films 1 and 2: film 3 shares users with both, film 4 with film 1 only
+    rows = data_manager.get_recommendations(ids["user 2"])
+    assert [row.id for row in rows] == [ids[3], ids[4]]
+    assert rows[0].because == 2
+
+    client = app.test_client()
+    response = client.get(f"/user/{ids['user 2']}/recommendations")
+    assert b"Film 3" in response.data and b"Film 1" not in response.data
+    assert client.get("/user/999/recommendations").status_code == 404
+
+
+def test_worker_rebuilds_only_when_libraries_change(ctx):
+    """Test that run_worker follows the library version."""
+    version = 1
+    assert recommendations.run_worker(lambda: version, once=True) == 1
+    assert recommendations.run_worker(lambda: version, once=True) == 0
+    assert recommendations.built_version() == version
@@ -0,0 +1,48 @@
+import runpy
+
+from app import create_app
+from models import db
+from services import EXTENSION
+
+
+def test_health_check(tmp_path):
+    """Test that /healthz reports whether the database answers."""
+    assert create_app("config.TestConfig").test_client().get("/healthz").json == {"status": "ok"}
+
+    broken = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/missing/movies.db"})
+    response = broken.test_client().get("/healthz")
+    assert response.status_code == 503
+    assert response.json == {"status": "unavailable"}
+
+
+def test_after_fork_drops_inherited_connections(tmp_path):
+    """Test that a forked worker gets fresh connections and OMDb services."""
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/movies.db",
+            "OMDB_CACHE_PATH": None,
+            "OMDB_QUOTA_PATH": ":memory:",
+        }
+    )
+    services = app.extensions[EXTENSION]
+    client = services.omdb_client
+    with app.app_context():
+        services.data_manager.get_all_users()
+        pool = db.engine.pool
+
+    services.after_fork()
+    assert "omdb_client" not in vars(services)
+    assert services.omdb_client is not client
+    with app.app_context():
+        assert db.engine.pool is not pool
+        assert services.data_manager.get_all_users() == []
+
+
+def test_gunicorn_hooks():
+    """Test that the gunicorn config loads and its worker hooks run."""
+    settings = runpy.run_path("gunicorn.conf.py")
+    assert settings["wsgi_app"] == "wsgi:app"
+    assert settings["workers"] >= 1 and settings["preload_app"]
+    settings["post_fork"](None, None)
+    settings["worker_exit"](None, None)
+    settings["post_fork"](None, None)  # leave logging running for the other tests
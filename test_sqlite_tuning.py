@@ -0,0 +1,61 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import Config
+from models import db
+from models.data_manager import SQLiteDataManager
+from models.db_models import User
+from models.sqlite_tuning import apply_pragmas, create_read_only_engine
+
+
+def test_app_connections_use_performance_profile(tmp_path):
+    """Test that new connections get WAL and the other PRAGMAs."""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+    with app.app_context():
+        with db.engine.connect() as connection:
+
+            def pragma(name):
+                return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == Config.SQLITE_PRAGMAS["busy_timeout"]
+            assert pragma("temp_store") == 2  # MEMORY
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    """Test that the read-only engine can read but never write."""
+    uri = f"sqlite:///{tmp_path / 'ro.db'}"
+    engine = create_engine(uri)
+    apply_pragmas(engine, {"journal_mode": "WAL"})
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+
+    reader = create_read_only_engine(uri, Config.SQLITE_PRAGMAS)
+    with reader.connect() as connection:
+        assert connection.execute(text("SELECT x FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.execute(text("INSERT INTO t VALUES (2)"))
+
+
+def test_get_requests_read_from_read_only_engine(tmp_path):
+    """Test that the data manager routes GET reads to the read-only engine."""
+    other = Flask(__name__)
+    other.config.from_object(Config)
+    other.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'app.db'}"
+    other.config["SQLALCHEMY_READ_ONLY_ENGINE"] = True
+    db.init_app(other)
+    manager = SQLiteDataManager(other)
+
+    reads = []
+    event.listen(manager.read_engine, "before_cursor_execute", lambda *args: reads.append(args[2]))
+    with other.test_request_context("/users", method="POST"):
+        manager.add_user(User(name="Ann"))
+    with other.test_request_context("/users"):
+        assert [user.name for user in manager.get_all_users()] == ["Ann"]
+
+    assert len(reads) == 1
@@ -0,0 +1,64 @@
+import app as app_module
+from models.title_index import TitleIndex
+from omdb import OMDbClient
+from omdb.stub_server import StubOMDbServer
+
+
+def test_prefix_and_token_queries():
+    """Test matching on the title prefix and on any word prefix."""
+    index = TitleIndex()
+    index.add("The Matrix", 1999, "tt0133093")
+    index.add("The Matrix Reloaded", 2003, "tt0234215")
+    index.add("Alien", 1979, "tt0078748")
+
+    assert [m["title"] for m in index.search("the mat")] == ["The Matrix Reloaded", "The Matrix"]
+    assert [m["title"] for m in index.search("reload")] == ["The Matrix Reloaded"]
+    assert index.search("matrix al") == []
+
+
+def test_ranked_by_popularity_then_year():
+    """Test that titles in more libraries rank first."""
+    index = TitleIndex()
+    index.add("Alien", 1979, "tt0078748", popularity=3)
+    index.add("Aliens", 1986, "tt0090605")
+    index.add("Alien: Covenant", 2017, "tt2316204")
+
+    assert [m["year"] for m in index.search("alien")] == ["1979", "2017", "1986"]
+
+
+def test_short_prefix_ranks_every_match():
+    """Test that a popular title past the candidate window still ranks first."""
+    index = TitleIndex(max_candidates=5)
+    index.load((f"A Film {n:02d}", 2000, f"tt00000{n:02d}", 1) for n in range(20))
+    index.add("Avatar", 2009, "tt0499549", popularity=3)
+    index.add("The Avengers", 2012, "tt0848228", popularity=2)
+
+    assert [m["title"] for m in index.search("a", limit=2)] == ["Avatar", "The Avengers"]
+    index.remove("Avatar", 2009, popularity=3)
+    assert [m["title"] for m in index.search("av", limit=2)] == ["The Avengers", "Avatar"]
+
+def test_incremental_remove():
+    """Test that titles only kept by libraries disappear when removed."""
+    index = TitleIndex()
+    index.add("Home Movie", 2020)
+    index.add("Homeward", 1990, "tt0000001")
+    index.remove("Home Movie", 2020)
+    index.remove("Homeward", 1990)
+
+    assert [m["title"] for m in index.search("home")] == ["Homeward"]
+    assert index.search("movie") == []
+
+
+def test_suggestions_answered_locally(app, monkeypatch):
+    """Test that enough local hits skip the OMDb round-trip."""
+    index = TitleIndex()
+    index.add("Alien", 1979, "tt0078748")
+    monkeypatch.setattr(app_module, "title_index", index)
+    app.config["SUGGESTIONS_MIN_LOCAL"] = 1
+
+    with StubOMDbServer() as stub:
+        monkeypatch.setattr(app_module, "omdb_client", OMDbClient("test", base_url=stub.url))
+        response = app.test_client().get("/movie_suggestions?query=ali")
+
+        assert response.get_json() == [{"title": "Alien", "year": "1979", "imdbID": "tt0078748"}]
+        assert stub.request_count == 0